@@ -44,6 +44,10 @@ echo -e "${BLUE}Copying scanner components...${RESET}"
 for distro_dir in ubuntu-20.04 ubuntu-22.04 ubuntu-24.04 debian-11; do
     if [ -d "$distro_dir" ]; then
         cp -r "$distro_dir" "${BUILD_DIR}/usr/share/vijenex-cis/"
+        # Ship precompiled milestones so scans do not have to compile them
+        if grep -q -- '--compile-milestones' "$distro_dir/scripts/vijenex-cis.py" 2>/dev/null; then
+            python3 "${BUILD_DIR}/usr/share/vijenex-cis/$distro_dir/scripts/vijenex-cis.py" --compile-milestones
+        fi
         echo -e "${GREEN}✓ $distro_dir${RESET}"
     fi
 done
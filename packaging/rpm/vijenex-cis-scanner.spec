@@ -35,6 +35,10 @@ mkdir -p %{buildroot}%{_mandir}/man1
 for distro_dir in rhel-8 rhel-9 centos-7; do
     if [ -d "$distro_dir" ]; then
         cp -r "$distro_dir" %{buildroot}%{_datadir}/vijenex-cis/
+        # Ship precompiled milestones so scans do not have to compile them
+        if grep -q -- '--compile-milestones' "$distro_dir/scripts/vijenex-cis.py" 2>/dev/null; then
+            python3 %{buildroot}%{_datadir}/vijenex-cis/$distro_dir/scripts/vijenex-cis.py --compile-milestones
+        fi
     fi
 done
 
@@ -20,7 +20,9 @@
 import os
 import sys
 import json
+import hashlib
 import subprocess
+import signal
 import argparse
 import datetime
 import socket
@@ -28,24 +30,1891 @@ import platform
 import pwd
 import grp
 import re
+import functools
+import threading
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import types
+import errno
+import resource
+import shutil
+import shlex
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor, Executor
 import glob
 
+PROC_SYS = '/proc/sys'
+
+def sysctl_path(parameter: str) -> Optional[str]:
+    """Map a sysctl name (net.ipv4.ip_forward) to its /proc/sys file
+    
+    Like sysctl(8), names containing '/' are taken as already slash
+    separated, which is how dotted interface names (eth0.100) are written.
+    """
+    separator = '/' if '/' in parameter else '.'
+    parts = [part for part in parameter.split(separator) if part]
+    if not parts or any(part in ('.', '..') for part in parts):
+        return None
+    return os.path.join(PROC_SYS, *parts)
+
+SYSTEMD_UNIT_SUFFIXES = ('.service', '.socket', '.target', '.mount', '.automount', '.swap', '.timer', '.path', '.slice', '.scope', '.device')
+
+# `systemctl is-enabled` exits 0 for these unit file states
+SYSTEMD_ENABLED_STATES = ('enabled', 'enabled-runtime', 'static', 'alias', 'indirect', 'generated', 'transient')
+
+def systemd_unit_name(name: str) -> str:
+    """Normalize a unit name the way systemctl does (autofs -> autofs.service)"""
+    return name if name.endswith(SYSTEMD_UNIT_SUFFIXES) else f"{name}.service"
+
+PROC_MOUNTINFO = '/proc/self/mountinfo'
+
+def _unescape_mount_field(field: str) -> str:
+    """Decode the octal escapes (\\040 etc.) the kernel uses in mount tables"""
+    return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), field)
+
+def parse_mountinfo(content: str) -> Dict[str, Dict[str, Any]]:
+    """Index /proc/self/mountinfo by mount point
+    
+    Later entries win, so an overmounted path reports the filesystem that is
+    actually visible there. "root" is the path inside the source filesystem
+    that is mounted, which is what tells a bind mount apart from a real one.
+    """
+    mounts = {}
+    for line in content.splitlines():
+        fields = line.split()
+        if '-' not in fields:
+            continue
+        separator = fields.index('-')
+        if separator < 6 or len(fields) < separator + 3:
+            continue
+        mount_options = fields[5].split(',')
+        super_options = fields[separator + 3].split(',') if len(fields) > separator + 3 else []
+        # Same view as /proc/mounts: per-mount flags first, then superblock options
+        options = mount_options + [opt for opt in super_options if opt not in mount_options and opt not in ('rw', 'ro')]
+        mounts[_unescape_mount_field(fields[4])] = types.MappingProxyType({
+            "mount_id": fields[0],
+            "parent_id": fields[1],
+            "root": _unescape_mount_field(fields[3]),
+            "device": _unescape_mount_field(fields[separator + 2]),
+            "fstype": fields[separator + 1],
+            "options": tuple(options),
+            "propagation": tuple(fields[6:separator]),
+        })
+    return mounts
+
+def parse_proc_mounts(content: str) -> Dict[str, Dict[str, Any]]:
+    """Index /proc/mounts by mount point (fallback when mountinfo is unavailable)"""
+    mounts = {}
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) >= 4:
+            mounts[_unescape_mount_field(parts[1])] = types.MappingProxyType({
+                "mount_id": "",
+                "parent_id": "",
+                "root": "/",
+                "device": _unescape_mount_field(parts[0]),
+                "fstype": parts[2],
+                "options": tuple(parts[3].split(',')),
+                "propagation": (),
+            })
+    return mounts
+
+def is_bind_mount(mount: Dict[str, Any]) -> bool:
+    """True when only a subdirectory of another filesystem is mounted here"""
+    # btrfs reports the subvolume path as root, which is a real separate mount
+    return mount["root"] != "/" and mount["fstype"] != "btrfs"
+
+MODPROBE_DIRS = ['/etc/modprobe.d/', '/lib/modprobe.d/', '/usr/lib/modprobe.d/']
+MODULES_ROOT = '/lib/modules'
+
+def module_key(name: str) -> str:
+    """Canonical kernel module name (the kernel treats - and _ alike)"""
+    return name.strip().replace('-', '_')
+
+def _module_name_from_path(path: str) -> str:
+    """kernel/fs/cramfs/cramfs.ko.zst -> cramfs"""
+    return module_key(os.path.basename(path).split('.ko')[0])
+
+def parse_modprobe_conf(content: str, install: Dict[str, str], blacklist: set) -> None:
+    """Collect install and blacklist directives from one modprobe.d file"""
+    for line in content.replace('\\\n', ' ').splitlines():
+        parts = line.split()
+        if len(parts) < 2 or parts[0].startswith('#'):
+            continue
+        if parts[0] == 'install' and len(parts) >= 3:
+            install.setdefault(module_key(parts[1]), ' '.join(parts[2:]))
+        elif parts[0] == 'blacklist':
+            blacklist.add(module_key(parts[1]))
+
+def is_disabled_install(command: Optional[str]) -> bool:
+    """True when an install directive turns loading the module into a no-op"""
+    return bool(command) and re.match(r'(/usr)?/bin/(true|false)\b', command) is not None
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern: str, flags: int = 0) -> 're.Pattern':
+    """Compile a milestone regex once per run (raises re.error like re.compile)"""
+    return re.compile(pattern, flags)
+
+POSIX_CLASSES = {
+    'alpha': 'a-zA-Z', 'digit': '0-9', 'alnum': 'a-zA-Z0-9', 'upper': 'A-Z', 'lower': 'a-z',
+    'space': r'\s', 'blank': r' \t', 'xdigit': '0-9A-Fa-f', 'word': r'\w',
+    'punct': r'!-/:-@\[-`{-~', 'cntrl': r'\x00-\x1f\x7f', 'print': r'\x20-\x7e', 'graph': r'\x21-\x7e',
+}
+
+def pcre_to_python(pattern: str) -> str:
+    """Translate the PCRE dialect used by milestone patterns (grep -P) to Python re syntax
+    
+    Handles \\h/\\H, \\Q...\\E, \\z, \\x{..}, \\k<name>, POSIX bracket classes, possessive
+    quantifiers and atomic groups (matched greedily), named groups and (?i)
+    flags, which are dropped because matching is always case-insensitive.
+    Raises re.error for constructs Python has no equivalent for.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    quantifiable = False
+    while i < n:
+        c = pattern[i]
+        if c == '\\' and i + 1 < n:
+            e = pattern[i + 1]
+            if e == 'Q':
+                end = pattern.find('\\E', i + 2)
+                end = n if end == -1 else end
+                out.append(re.escape(pattern[i + 2:end]))
+                i = end + 2
+                quantifiable = True
+                continue
+            if e == 'x' and pattern.startswith('{', i + 2):
+                end = pattern.find('}', i + 3)
+                if end == -1:
+                    raise re.error(f"unterminated \\x{{ in {pattern!r}")
+                out.append(f"\\U{int(pattern[i + 3:end], 16):08x}")
+                i = end + 1
+            elif e == 'k' and i + 2 < n and pattern[i + 2] in '<{\'':
+                end = pattern.find({'<': '>', '{': '}', "'": "'"}[pattern[i + 2]], i + 3)
+                if end == -1:
+                    raise re.error(f"unterminated \\k reference in {pattern!r}")
+                out.append(f"(?P={pattern[i + 3:end]})")
+                i = end + 1
+            else:
+                out.append({'h': '[ \\t]', 'H': '[^ \\t]', 'z': '\\Z', 'Z': '\\Z', 'e': '\\x1b'}.get(e, c + e))
+                i += 2
+            quantifiable = e not in 'AzZbBG'
+        elif c == '[':
+            j = i + 1
+            members = ['[']
+            if j < n and pattern[j] == '^':
+                members.append('^')
+                j += 1
+            if j < n and pattern[j] == ']':
+                members.append('\\]')
+                j += 1
+            while j < n and pattern[j] != ']':
+                if pattern[j] == '\\' and j + 1 < n:
+                    e = pattern[j + 1]
+                    if e == 'H':
+                        raise re.error(f"\\H inside a character class is not supported: {pattern!r}")
+                    members.append(' \\t' if e == 'h' else pattern[j:j + 2])
+                    j += 2
+                elif pattern.startswith('[:', j):
+                    end = pattern.find(':]', j + 2)
+                    name = pattern[j + 2:end] if end != -1 else ''
+                    if name not in POSIX_CLASSES:
+                        raise re.error(f"unknown POSIX class in {pattern!r}")
+                    members.append(POSIX_CLASSES[name])
+                    j = end + 2
+                elif pattern[j] == '[':
+                    members.append('\\[')
+                    j += 1
+                else:
+                    members.append(pattern[j])
+                    j += 1
+            if j >= n:
+                raise re.error(f"unterminated character set in {pattern!r}")
+            out.append(''.join(members) + ']')
+            i = j + 1
+            quantifiable = True
+        elif c == '(' and pattern.startswith('(?', i):
+            end = pattern.find(')', i)
+            inline = pattern[i + 2:end] if end != -1 else ''
+            if inline and all(f in 'imsx' for f in inline):
+                # Global flags: case is already ignored, keep the others
+                flags = inline.replace('i', '')
+                if flags:
+                    out.append(f"(?{flags})")
+                i = end + 1
+                quantifiable = False
+                continue
+            m = re.match(r'\(\?([imsx]*)(-[imsx]+)?:', pattern[i:])
+            if m:
+                # Scoped flags like (?i:...) become a plain group
+                out.append('(?:')
+                i += m.end()
+            elif pattern.startswith('(?>', i):
+                out.append('(?:')
+                i += 3
+            elif pattern.startswith('(?<', i) and pattern[i + 3:i + 4] not in ('=', '!'):
+                out.append('(?P<')
+                i += 3
+            elif pattern.startswith("(?'", i):
+                end = pattern.find("'", i + 3)
+                out.append(f"(?P<{pattern[i + 3:end]}>")
+                i = end + 1
+            elif pattern[i + 2:i + 3] in ('|', 'R', '&') or pattern[i + 2:i + 3].isdigit():
+                raise re.error(f"unsupported PCRE group in {pattern!r}")
+            else:
+                out.append('(?')
+                i += 2
+            quantifiable = False
+        elif c in '*+?' or (c == '{' and re.match(r'\{\d+(,\d*)?\}', pattern[i:])):
+            if c == '{':
+                c = re.match(r'\{\d+(,\d*)?\}', pattern[i:]).group(0)
+            out.append(c)
+            i += len(c)
+            if quantifiable and i < n and pattern[i] == '+':
+                # Possessive quantifier: Python before 3.11 only has the greedy form
+                i += 1
+            elif i < n and pattern[i] == '?':
+                out.append('?')
+                i += 1
+            quantifiable = False
+        else:
+            out.append(c)
+            i += 1
+            quantifiable = c not in '(|^'
+    return ''.join(out)
+
+@functools.lru_cache(maxsize=None)
+def compile_pcre(pattern: str) -> 're.Pattern':
+    """Compile a grep -Pi pattern once per run"""
+    return compile_pattern(pcre_to_python(pattern), re.IGNORECASE)
+
+# Characters that make the shell do more than pass a path word through
+SHELL_SPECIAL = set('"\'$`()|;&<> \t\n')
+
+def expand_shell_path(word: str, glob_func=glob.glob) -> Optional[List[str]]:
+    """Files a POSIX shell would pass to grep for one unquoted path word
+    
+    Backslash escapes and globs are expanded like sh does (an unmatched glob
+    stays literal); None means the shell would reject or reinterpret the word.
+    """
+    literal, pattern, has_glob = [], [], False
+    i = 0
+    while i < len(word):
+        c = word[i]
+        if c == '\\' and i + 1 < len(word):
+            literal.append(word[i + 1])
+            pattern.append(glob.escape(word[i + 1]))
+            i += 2
+            continue
+        if c in SHELL_SPECIAL:
+            return None
+        if c in '*?[':
+            has_glob = True
+            pattern.append(c)
+        else:
+            pattern.append(glob.escape(c))
+        literal.append(c)
+        i += 1
+    if has_glob:
+        matches = sorted(glob_func(''.join(pattern)))
+        if matches:
+            return matches
+    return [''.join(literal)]
+
+SSHD_CONFIG_FILE = '/etc/ssh/sshd_config'
+
+# sshd_config keywords whose occurrences add up; every other keyword keeps the
+# first value sshd reads for it (first match wins, Includes read in place)
+SSHD_MULTI_VALUED = frozenset([
+    'acceptenv', 'allowgroups', 'allowusers', 'denygroups', 'denyusers', 'hostcertificate', 'hostkey',
+    'listenaddress', 'port', 'setenv', 'subsystem',
+])
+
+# Nesting limit for Include, as in sshd
+SSHD_INCLUDE_DEPTH = 16
+
+# Keywords taking a time interval, reported in seconds like `sshd -T` does
+SSHD_TIME_KEYWORDS = ('clientaliveinterval', 'logingracetime')
+
+# Compiled-in OpenSSH defaults for keywords the CIS controls check, used when
+# the configuration has to be parsed instead of asking `sshd -T`
+SSHD_DEFAULTS = types.MappingProxyType({
+    'banner': 'none', 'clientalivecountmax': '3', 'clientaliveinterval': '0', 'disableforwarding': 'no',
+    'gssapiauthentication': 'no', 'hostbasedauthentication': 'no', 'ignorerhosts': 'yes', 'logingracetime': '120',
+    'loglevel': 'INFO', 'maxauthtries': '6', 'maxsessions': '10', 'maxstartups': '10:30:100',
+    'permitemptypasswords': 'no', 'permitrootlogin': 'prohibit-password', 'permituserenvironment': 'no',
+    'usepam': 'no', 'x11forwarding': 'no',
+})
+
+# Where the system-wide crypto policy, not compiled-in defaults, supplies
+# Ciphers, MACs and KexAlgorithms that sshd_config leaves unset
+SSHD_CRYPTO_POLICY_FILE = '/etc/crypto-policies/back-ends/opensshserver.config'
+
+# Algorithms the CIS benchmarks require to be disabled
+SSHD_WEAK_ALGORITHMS = types.MappingProxyType({
+    'ciphers': frozenset([
+        '3des-cbc', 'aes128-cbc', 'aes192-cbc', 'aes256-cbc', 'arcfour', 'arcfour128', 'arcfour256',
+        'blowfish-cbc', 'cast128-cbc', 'rijndael-cbc@lysator.liu.se',
+    ]),
+    'macs': frozenset([
+        'hmac-md5', 'hmac-md5-96', 'hmac-ripemd160', 'hmac-sha1-96', 'umac-64@openssh.com',
+        'hmac-md5-etm@openssh.com', 'hmac-md5-96-etm@openssh.com', 'hmac-ripemd160-etm@openssh.com',
+        'hmac-sha1-96-etm@openssh.com', 'umac-64-etm@openssh.com',
+    ]),
+    'kexalgorithms': frozenset([
+        'diffie-hellman-group1-sha1', 'diffie-hellman-group14-sha1', 'diffie-hellman-group-exchange-sha1',
+    ]),
+})
+
+def sshd_seconds(value: str) -> str:
+    """An sshd time interval ("1m30s", "90") in seconds; unparsable values are returned unchanged"""
+    units = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    parts = re.findall(r'(\d+)([smhdw]?)', value.lower())
+    if not parts or ''.join(number + unit for number, unit in parts) != value.lower():
+        return value
+    return str(sum(int(number) * units[unit] for number, unit in parts))
+
+def parse_sshd_t(content: str) -> Dict[str, str]:
+    """Settings printed by `sshd -T` (lowercase keyword -> value, repeated keywords joined by spaces)"""
+    settings = {}
+    for line in content.splitlines():
+        keyword, _, value = line.strip().partition(' ')
+        if not keyword:
+            continue
+        if keyword in settings:
+            settings[keyword] += ' ' + value.strip()
+        else:
+            settings[keyword] = value.strip()
+    return settings
+
+def parse_sshd_config(config_file: str, read_file, glob_func) -> Dict[str, str]:
+    """Global settings of an sshd_config as sshd reads them, with its defaults filled in
+    
+    Include directives are expanded in place (relative paths are taken from
+    the directory of config_file, globs in sorted order), the first value of
+    a keyword wins and Match blocks, which only apply to some connections, are
+    left out; a Match block ends with the file it appears in. Files are read
+    with read_file(path) and patterns expanded with glob_func(pattern).
+    """
+    settings = {}
+    base_dir = os.path.dirname(config_file)
+    
+    def parse(path, depth):
+        if depth > SSHD_INCLUDE_DEPTH:
+            raise ValueError(f"Include nested deeper than {SSHD_INCLUDE_DEPTH} levels in {path}")
+        in_match = False
+        for line in read_file(path).splitlines():
+            line = re.sub(r'\s#.*$', '', line).strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = re.split(r'\s*=\s*|\s+', line, 1)
+            keyword = fields[0].lower()
+            value = fields[1].strip() if len(fields) > 1 else ''
+            if keyword == 'match':
+                in_match = True
+            if in_match:
+                continue
+            if keyword == 'include':
+                for pattern in value.split():
+                    pattern = os.path.join(base_dir, pattern)
+                    for included in sorted(glob_func(pattern)) if glob.has_magic(pattern) else [pattern]:
+                        try:
+                            parse(included, depth + 1)
+                        except OSError:
+                            pass
+                continue
+            
+            value = value.strip('"')
+            if keyword in SSHD_TIME_KEYWORDS:
+                value = sshd_seconds(value)
+            if keyword in SSHD_MULTI_VALUED and keyword in settings:
+                settings[keyword] += ' ' + value
+            else:
+                settings.setdefault(keyword, value)
+    
+    parse(config_file, 0)
+    for keyword, value in SSHD_DEFAULTS.items():
+        settings.setdefault(keyword, value)
+    return settings
+
+# sudo reads SUDOERS_FILE and, through its @includedir, the files in
+# SUDOERS_DIR whose names have no '.' and do not end in '~'
+SUDOERS_FILE = '/etc/sudoers'
+SUDOERS_DIR = '/etc/sudoers.d'
+
+def parse_sudoers_defaults(content: str) -> List[Tuple[str, Optional[str]]]:
+    """Settings of the Defaults lines of a sudoers file, in order, as (name, value)
+    
+    Negated flags keep their '!' ("!authenticate"), flags have the value None
+    and quoted values are unquoted; continued lines are joined. Defaults with
+    a binding (Defaults:user, Defaults@host, ...) count as well.
+    """
+    settings = []
+    for line in content.replace('\\\n', ' ').splitlines():
+        match = re.match(r'\s*Defaults(?:[:@>!]\S*)?\s+(.*)', line)
+        if not match:
+            continue
+        for name, operator, value in re.findall(
+                r'(!*\s*[A-Za-z_]+)\s*(?:([+-]?=)\s*("(?:[^"\\]|\\.)*"|[^,\s#]+))?\s*(?:,|#.*|$)', match.group(1)):
+            settings.append((re.sub(r'\s+', '', name), value.strip('"') if operator else None))
+    return settings
+
+PAM_DIR = '/etc/pam.d'
+
+# Nesting limit for @include, include and substack (PAM itself allows 8 levels
+# of substack; deeper chains here are treated as a loop)
+PAM_INCLUDE_DEPTH = 16
+
+def parse_pam_stack(config_file: str, read_file) -> Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]:
+    """The fully expanded stack of a PAM service as (type, control, module, args) entries
+    
+    `@include` pulls in every line of another service, `include` and
+    `substack` the lines of their own type, in place and recursively; names
+    are relative to PAM_DIR. The module is given by its file name, a leading
+    "-" (skip if the module is missing) is dropped from the type, and bracketed
+    controls and arguments are kept as one field each. Files are read with
+    read_file(path); a missing included service contributes nothing, as with
+    PAM.
+    """
+    entries = []
+    
+    def expand(path, only_type, chain):
+        if path in chain or len(chain) > PAM_INCLUDE_DEPTH:
+            return
+        chain = chain + (path,)
+        for line in read_file(path).replace('\\\n', ' ').splitlines():
+            fields = re.findall(r'\[[^\]]*\]|[^\s#]+|#', line)
+            if '#' in fields:
+                fields = fields[:fields.index('#')]
+            if not fields:
+                continue
+            if fields[0] == '@include':
+                if len(fields) > 1:
+                    include(fields[1], only_type, chain)
+                continue
+            if len(fields) < 3:
+                continue
+            pam_type = fields[0].lstrip('-').lower()
+            if only_type is not None and pam_type != only_type:
+                continue
+            if fields[1] in ('include', 'substack'):
+                include(fields[2], pam_type, chain)
+                continue
+            entries.append((pam_type, fields[1], os.path.basename(fields[2]), tuple(fields[3:])))
+    
+    def include(name, only_type, chain):
+        try:
+            expand(os.path.join(PAM_DIR, name), only_type, chain)
+        except OSError:
+            pass
+    
+    expand(config_file, None, ())
+    return tuple(entries)
+
+def pam_arguments(args: Tuple[str, ...]) -> Dict[str, str]:
+    """Module arguments as name -> value ('' for flags such as use_uid)"""
+    arguments = {}
+    for arg in args:
+        name, _, value = arg.partition('=')
+        arguments[name] = value
+    return arguments
+
+# Files PAM modules read the settings they are not given as arguments from
+PAM_MODULE_CONFIG = types.MappingProxyType({
+    'pam_faillock.so': '/etc/security/faillock.conf',
+    'pam_pwhistory.so': '/etc/security/pwhistory.conf',
+    'pam_pwquality.so': '/etc/security/pwquality.conf',
+})
+
+def parse_pam_module_config(content: str) -> Dict[str, str]:
+    """Settings of a PAM module configuration file (name -> value, '' for flags)"""
+    settings = {}
+    for line in content.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            name, _, value = line.partition('=')
+            settings[name.strip()] = value.strip()
+    return settings
+
+class PAMStack:
+    """A PAM service's expanded stack (see parse_pam_stack), indexed by type and module"""
+    
+    def __init__(self, entries: Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]):
+        self.entries = entries
+        by_type, by_module = {}, {}
+        for entry in entries:
+            by_type.setdefault(entry[0], []).append(entry)
+            by_module.setdefault(entry[2], []).append(entry)
+        self._by_type = {pam_type: tuple(found) for pam_type, found in by_type.items()}
+        self._by_module = {module: tuple(found) for module, found in by_module.items()}
+    
+    def __repr__(self) -> str:
+        # Also what stable_digest fingerprints
+        return f"PAMStack({self.entries!r})"
+    
+    def stack(self, pam_type: str) -> Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]:
+        """Entries of one management group (auth, account, password, session) in order"""
+        return self._by_type.get(pam_type, ())
+    
+    def module(self, module: str, pam_type: Optional[str] = None) -> Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]:
+        """Entries using a module (by file name, e.g. pam_unix.so), optionally of one type only"""
+        found = self._by_module.get(module, ())
+        return found if pam_type is None else tuple(entry for entry in found if entry[0] == pam_type)
+    
+    def arguments(self, module: str, pam_type: Optional[str] = None) -> Dict[str, str]:
+        """Arguments a module is given across its entries (later entries override earlier ones)"""
+        arguments = {}
+        for entry in self.module(module, pam_type):
+            arguments.update(pam_arguments(entry[3]))
+        return arguments
+    
+    def contains(self, pam_type: str, control: str, module: str, args: Tuple[str, ...] = ()) -> bool:
+        """Whether an entry of that type, control and module has at least the given arguments"""
+        return any(entry[1].split() == control.split() and set(args) <= set(entry[3])
+                   for entry in self.module(module, pam_type))
+
+# Milestones are compiled into one file next to the milestones directory (by
+# --compile-milestones at build time, or on first use) and recompiled whenever
+# a milestone file's mtime or size changes, so scans only stat the sources
+MILESTONE_BUNDLE_FILE = 'vijenex-cis-milestones.bundle'
+MILESTONE_BUNDLE_VERSION = 2
+
+# Control fields only the reports read: kept out of the execution table
+NARRATIVE_FIELDS = ('description', 'rationale', 'remediation', 'impact', 'references', 'audit',
+                    'cis_controls', 'reference_note', 'default_value')
+
+def milestone_stamps(milestones_dir: Path) -> Dict[str, List[int]]:
+    """[mtime_ns, size] of every milestone file in a directory, what a bundle is checked against"""
+    stamps = {}
+    for name in sorted(f for f in os.listdir(milestones_dir) if f.endswith('.json')):
+        st = os.stat(os.path.join(milestones_dir, name))
+        stamps[name] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+def milestone_sources(milestones_dir: Path) -> Tuple[Dict[str, List[int]], Dict[str, bytes]]:
+    """Stamps (see milestone_stamps) and raw contents of every milestone file in a directory"""
+    # Stamped before reading: a file changing in between makes the next run recompile
+    stamps = milestone_stamps(milestones_dir)
+    sources = {}
+    for name in stamps:
+        with open(os.path.join(milestones_dir, name), 'rb') as f:
+            sources[name] = f.read()
+    return stamps, sources
+
+def compile_milestones(stamps: Dict[str, List[int]], sources: Dict[str, bytes]) -> Tuple[Dict[str, Any], bytes, List[str]]:
+    """Split milestone sources into an execution table and a narrative store
+    
+    Returns the bundle header (per milestone: its controls without their
+    NARRATIVE_FIELDS and the location of each control's narrative record),
+    the narrative records it indexes, and the problems found while
+    validating: files that do not parse, controls without an id, patterns
+    that do not compile and ids used twice with different narratives.
+    """
+    milestones = {}
+    data = bytearray()
+    problems = []
+    for name, raw in sources.items():
+        try:
+            controls = json.loads(raw.decode('utf-8')).get('controls', [])
+        except Exception as e:
+            milestones[name] = {"error": str(e)}
+            problems.append(f"{name}: {e}")
+            continue
+        
+        table = []
+        narratives = {}
+        for position, control in enumerate(controls):
+            control_id = control.get('id')
+            if not control_id:
+                problems.append(f"{name}: control #{position + 1} has no id")
+            if control.get('type') == 'FileContent' and control.get('pattern'):
+                try:
+                    compile_pcre(control['pattern'])
+                except re.error as e:
+                    problems.append(f"{name}: {control_id}: invalid pattern: {e}")
+            narrative = {field: control[field] for field in NARRATIVE_FIELDS if field in control}
+            if control_id and narratives.setdefault(control_id, narrative) != narrative:
+                problems.append(f"{name}: {control_id}: used by controls with different narratives")
+            table.append({key: value for key, value in control.items() if key not in NARRATIVE_FIELDS})
+        
+        locations = {}
+        for control_id, narrative in narratives.items():
+            record = json.dumps(narrative, separators=(',', ':')).encode()
+            locations[control_id] = [len(data), len(record)]
+            data += record
+        milestones[name] = {"controls": table, "narrative": locations}
+    
+    header = {"version": MILESTONE_BUNDLE_VERSION, "narrative_fields": list(NARRATIVE_FIELDS), "sources": stamps,
+              "milestones": milestones}
+    return header, bytes(data), problems
+
+def write_milestone_bundle(path: Path, header: Dict[str, Any], data: bytes) -> None:
+    """Write a bundle atomically: a JSON header line followed by the narrative records"""
+    temp_path = Path(f"{path}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps(header, separators=(',', ':')).encode() + b'\n')
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+class MilestoneBundle:
+    """Compiled milestones: an execution table in memory, narrative text read on demand
+    
+    Only the header line (the controls as the checks see them) is parsed when
+    a bundle is opened. The narrative fields of a control are read from the
+    rest of the file with os.pread, so reports load the text of the controls
+    they render and nothing else. A bundle compiled in memory (when no cache
+    path was writable) serves the same lookups from its data.
+    """
+    
+    def __init__(self, header: Dict[str, Any], data: Optional[bytes] = None,
+                 fileobj=None, data_offset: int = 0):
+        self.sources = header.get("sources")
+        self.narrative_fields = header.get("narrative_fields")
+        self._milestones = header.get("milestones", {})
+        self._data = data
+        self._file = fileobj
+        self._data_offset = data_offset
+    
+    @classmethod
+    def open(cls, path: Path) -> 'MilestoneBundle':
+        """Open a bundle file (raises OSError, or ValueError if it is not a readable bundle)"""
+        f = open(path, 'rb')
+        try:
+            line = f.readline()
+            header = json.loads(line)
+            if not isinstance(header, dict) or header.get("version") != MILESTONE_BUNDLE_VERSION:
+                raise ValueError(f"{path} is not a version {MILESTONE_BUNDLE_VERSION} milestone bundle")
+        except Exception:
+            f.close()
+            raise
+        return cls(header, fileobj=f, data_offset=len(line))
+    
+    def close(self) -> None:
+        """Release the bundle file (narratives can no longer be read)"""
+        if self._file is not None:
+            self._file.close()
+    
+    def controls(self, milestone_file: str) -> Optional[List[Dict[str, Any]]]:
+        """Controls of a milestone without their narrative fields (None if it has none)"""
+        return self._milestones.get(milestone_file, {}).get("controls")
+    
+    def error(self, milestone_file: str) -> Optional[str]:
+        """Why a milestone could not be compiled, if it could not"""
+        return self._milestones.get(milestone_file, {}).get("error")
+    
+    def narrative(self, milestone_file: str, control_id: str) -> Dict[str, Any]:
+        """Narrative fields of a control ({} if there are none)"""
+        location = self._milestones.get(milestone_file, {}).get("narrative", {}).get(control_id)
+        if location is None:
+            return {}
+        offset, length = location
+        if self._data is not None:
+            record = self._data[offset:offset + length]
+        else:
+            record = os.pread(self._file.fileno(), length, self._data_offset + offset)
+        return json.loads(record)
+
+def load_milestone_bundle(milestones_dir: Path, cache_paths: List[Path]) -> MilestoneBundle:
+    """The compiled bundle of a milestones directory, recompiled if any milestone changed
+    
+    The first cache path holding a bundle whose recorded mtime and size of
+    every milestone file still match is used; the sources themselves are
+    not read. Otherwise the milestones are compiled and written to the first
+    writable cache path, or kept in memory if none is.
+    """
+    stamps = milestone_stamps(milestones_dir)
+    for path in cache_paths:
+        try:
+            bundle = MilestoneBundle.open(path)
+        except (OSError, ValueError):
+            continue
+        if bundle.sources == stamps and bundle.narrative_fields == list(NARRATIVE_FIELDS):
+            return bundle
+        bundle.close()
+    
+    stamps, sources = milestone_sources(milestones_dir)
+    header, data, problems = compile_milestones(stamps, sources)
+    for problem in problems:
+        print(f"Warning: milestone {problem}")
+    for path in cache_paths:
+        try:
+            write_milestone_bundle(path, header, data)
+            return MilestoneBundle.open(path)
+        except (OSError, ValueError):
+            continue
+    return MilestoneBundle(header, data)
+
+# --incremental keeps per-control results and input fingerprints here, next to the reports
+INCREMENTAL_STATE_FILE = 'vijenex-cis-state.json'
+INCREMENTAL_STATE_VERSION = 1
+
+# Fingerprints cover what checks read through ScanContext; as a safety net for
+# anything they miss, an incremental run falls back to a full scan once the
+# state is this old
+INCREMENTAL_MAX_AGE = 24 * 60 * 60
+
+RPM_DB_FILES = ('/var/lib/rpm/rpmdb.sqlite', '/var/lib/rpm/Packages', '/usr/lib/sysimage/rpm/rpmdb.sqlite')
+
+def stable_digest(value: Any) -> str:
+    """Digest of a fact value that does not depend on set ordering or hash seeds"""
+    def canonical(item):
+        if isinstance(item, (dict, types.MappingProxyType)):
+            return {str(key): canonical(val) for key, val in item.items()}
+        if isinstance(item, (set, frozenset)):
+            return sorted((canonical(val) for val in item), key=repr)
+        if isinstance(item, (list, tuple)):
+            return [canonical(val) for val in item]
+        return item
+    return hashlib.sha256(json.dumps(canonical(value), sort_keys=True, default=str).encode()).hexdigest()
+
+def file_signature(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """(st_ino, st_mtime_ns, st_size) of a file, or None if it cannot be stat'ed"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def fact_key_from_json(value: Any) -> Any:
+    """Turn a fact key read back from JSON into its tuple form"""
+    if isinstance(value, list):
+        return tuple(fact_key_from_json(item) for item in value)
+    return value
+
+# Control types whose checks read the system only through ScanContext, so the
+# facts they touched fully describe their inputs and --incremental may reuse them
+INCREMENTAL_CONTROL_TYPES = frozenset([
+    'SysctlParameter', 'PackageInstalled', 'ServiceStatus', 'KernelModule', 'MountOption', 'MountPoint', 'FileContent',
+    'FileExists',
+])
+
+PACKAGE_DB_FILES = RPM_DB_FILES
+
+# --watch: how often controls that depend on runtime state inotify cannot see
+# (sysctl values, mounts, command output, tree walks) are re-checked
+WATCH_INTERVAL = 300
+
+# Quiet period after an inotify event before re-evaluating, so a burst of
+# writes (package upgrade, editor save) triggers one re-check
+WATCH_DEBOUNCE = 1.0
+
+DRIFT_LOG_FILE = 'vijenex-cis-drift.jsonl'
+
+SYSTEMD_UNIT_DIRS = ['/etc/systemd/system', '/lib/systemd/system', '/usr/lib/systemd/system']
+
+class InotifyWatcher:
+    """Minimal inotify binding over ctypes (Linux only, no extra dependencies)
+    
+    Watches are placed on directories so files replaced by rename (editors,
+    package managers) keep being seen. read() returns the changed paths, or
+    None when the kernel event queue overflowed and everything must be
+    re-checked.
+    """
+    
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_CLOEXEC = 0o2000000
+    
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self._dirs = {}
+    
+    def add_directory(self, directory: str) -> bool:
+        """Watch a directory for changes to itself and its entries (False if it cannot be watched)"""
+        if directory in self._dirs.values():
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            return False
+        self._dirs[wd] = directory
+        return True
+    
+    def read(self, timeout: float) -> Optional[List[str]]:
+        """Paths changed within timeout seconds ([] if nothing happened)"""
+        ready, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not ready:
+            return []
+        data = os.read(self._fd, 64 * 1024)
+        paths = []
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _cookie, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + length].split(b'\0', 1)[0]
+            offset += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                del self._dirs[wd]
+            paths.append(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return paths
+    
+    def close(self) -> None:
+        os.close(self._fd)
+
+def watch_targets(key: Any) -> Tuple[List[str], List[str], bool]:
+    """What --watch must observe for one fact key: (files, directories, needs polling)"""
+    kind = key[0] if isinstance(key, tuple) else key
+    if kind in ("file", "exists", "passwd", "group", "shadow"):
+        return [key[1]], [], False
+    if kind == "packages":
+        return list(PACKAGE_DB_FILES), [], False
+    if kind == "glob":
+        literal = re.split(r'[*?\[]', key[1], 1)[0]
+        return [], [os.path.dirname(literal) or '/'], False
+    if kind == "pam_stack":
+        return [key[1]], [PAM_DIR], False
+    if kind == "sshd_config":
+        # Includes may live anywhere, so poll as well
+        return [key[1]], [os.path.join(os.path.dirname(key[1]), 'sshd_config.d')], True
+    if kind == "kernel_modules":
+        # modprobe.d is watchable, the set of loaded modules is not
+        return [], [d.rstrip('/') for d in MODPROBE_DIRS], True
+    if kind == "unit_file_states":
+        dirs = []
+        for unit_dir in SYSTEMD_UNIT_DIRS:
+            dirs.append(unit_dir)
+            dirs.extend(glob.glob(os.path.join(unit_dir, '*.wants')) + glob.glob(os.path.join(unit_dir, '*.requires')))
+        return [], dirs, False
+    return [], [], True
+
+# --low-impact: filesystem walks pause while the host is busier than this.
+# Load is the 1-minute load average per CPU, IO utilisation the share of time
+# the busiest disk spent doing IO since the previous sample.
+LOW_IMPACT_MAX_LOAD = 1.0
+LOW_IMPACT_MAX_IO_UTIL = 50.0
+
+PROC_LOADAVG = '/proc/loadavg'
+PROC_DISKSTATS = '/proc/diskstats'
+
+# Seconds between load samples, per pause, and the longest a walk waits before
+# making progress anyway (a permanently busy host must still get scanned)
+THROTTLE_SAMPLE_INTERVAL = 0.5
+THROTTLE_PAUSE = 1.0
+THROTTLE_MAX_PAUSE = 30.0
+
+def read_loadavg() -> Optional[float]:
+    """1-minute load average, or None if /proc/loadavg is unavailable"""
+    try:
+        with open(PROC_LOADAVG, 'r') as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def read_disk_io_ticks() -> Dict[str, int]:
+    """Milliseconds each whole disk has spent doing IO (field 13 of /proc/diskstats)"""
+    ticks = {}
+    try:
+        with open(PROC_DISKSTATS, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 13:
+                    continue
+                name = fields[2]
+                # Partitions would count the same IO twice; loop and ram devices are not disks
+                if name.startswith(('loop', 'ram')) or not os.path.isdir('/sys/block/' + name.replace('/', '!')):
+                    continue
+                ticks[name] = int(fields[12])
+    except (OSError, ValueError):
+        pass
+    return ticks
+
+class LoadThrottle:
+    """Makes long filesystem walks yield while the host is busy (--low-impact)
+    
+    pause() is meant to be called often from walk loops: it only samples
+    /proc/loadavg and /proc/diskstats every THROTTLE_SAMPLE_INTERVAL seconds,
+    and sleeps while either is above its threshold. The time spent sleeping
+    is accumulated in `throttled`.
+    """
+    
+    def __init__(self, max_load: float = LOW_IMPACT_MAX_LOAD, max_io_util: float = LOW_IMPACT_MAX_IO_UTIL):
+        self.max_load = max_load
+        self.max_io_util = max_io_util
+        self.throttled = 0.0
+        self._cpus = os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._last_ticks = (self._last_check, read_disk_io_ticks())
+    
+    def busy(self) -> bool:
+        now, ticks = time.monotonic(), read_disk_io_ticks()
+        then, previous = self._last_ticks
+        self._last_ticks = (now, ticks)
+        
+        load = read_loadavg()
+        # The walk itself keeps one task runnable; do not throttle on our own load
+        if load is not None and max(0.0, load - 1) / self._cpus > self.max_load:
+            return True
+        if now > then:
+            busiest = max([ticks[disk] - previous[disk] for disk in ticks if disk in previous] or [0])
+            if busiest / ((now - then) * 1000) * 100 > self.max_io_util:
+                return True
+        return False
+    
+    def pause(self) -> None:
+        if time.monotonic() - self._last_check < THROTTLE_SAMPLE_INTERVAL:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_check < THROTTLE_SAMPLE_INTERVAL:
+                return
+            waited = 0.0
+            while waited < THROTTLE_MAX_PAUSE and self.busy():
+                time.sleep(THROTTLE_PAUSE)
+                waited += THROTTLE_PAUSE
+            self.throttled += waited
+            self._last_check = time.monotonic()
+
+# Limits applied to every command a check runs, so a runaway pipeline cannot
+# degrade the workloads on the host being scanned
+COMMAND_TIMEOUT = 30
+COMMAND_CPU_LIMIT = 30
+COMMAND_MEMORY_LIMIT = 1024 * 1024 * 1024
+COMMAND_OUTPUT_LIMIT = 8 * 1024 * 1024
+COMMAND_NICE = 10
+
+# ioprio_set(2) has no libc wrapper; syscall numbers per architecture
+IOPRIO_SYSCALLS = {'x86_64': 251, 'i386': 289, 'i686': 289, 'aarch64': 30, 'armv7l': 314, 'ppc64le': 273, 's390x': 282}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_WHO_PGRP = 2
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+
+def set_io_priority(io_class: int, level: int = 0, who: int = IOPRIO_WHO_PROCESS, target: int = 0) -> bool:
+    """ionice for a process (0 = ourselves) or process group; False where unsupported"""
+    number = IOPRIO_SYSCALLS.get(platform.machine())
+    if number is None:
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        return libc.syscall(number, who, target, (io_class << IOPRIO_CLASS_SHIFT) | level) == 0
+    except (OSError, AttributeError):
+        return False
+
+class CommandExecutor:
+    """Runs check commands in their own process group under hard limits
+    
+    On timeout, or once a stream exceeds output_limit bytes, the whole
+    process group is killed, so pipeline members (find | head) never outlive
+    the shell. Shell commands get RLIMIT_CPU/RLIMIT_AS through ulimit, which
+    every pipeline member inherits; the group is reniced and given a lower IO
+    priority as soon as it starts. Limits are applied without preexec_fn,
+    which is not safe with the --jobs worker threads.
+    
+    run_pipeline() runs argv lists connected by pipes without any shell; each
+    stage gets its own process group and its limits through prlimit(2).
+    """
+    
+    def __init__(self, timeout: int = COMMAND_TIMEOUT, cpu_limit: int = COMMAND_CPU_LIMIT,
+                 memory_limit: int = COMMAND_MEMORY_LIMIT, output_limit: int = COMMAND_OUTPUT_LIMIT,
+                 nice: int = COMMAND_NICE, io_class: int = IOPRIO_CLASS_BE, io_level: int = 7):
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self.output_limit = output_limit
+        self.nice = nice
+        self.io_class = io_class
+        self.io_level = io_level
+    
+    def _limited(self, command: str) -> str:
+        prefix = ''
+        if self.cpu_limit:
+            prefix += f'ulimit -t {self.cpu_limit} 2>/dev/null; '
+        if self.memory_limit:
+            prefix += f'ulimit -v {self.memory_limit // 1024} 2>/dev/null; '
+        return prefix + command
+    
+    def _deprioritize(self, pgid: int) -> None:
+        try:
+            if self.nice:
+                os.setpriority(os.PRIO_PGRP, pgid, min(19, os.getpriority(os.PRIO_PROCESS, 0) + self.nice))
+        except OSError:
+            pass
+        set_io_priority(self.io_class, self.io_level, IOPRIO_WHO_PGRP, pgid)
+    
+    @staticmethod
+    def _kill_group(proc: subprocess.Popen) -> None:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    
+    def _limit(self, pid: int) -> None:
+        for limit, value in ((resource.RLIMIT_CPU, self.cpu_limit), (resource.RLIMIT_AS, self.memory_limit)):
+            if value:
+                try:
+                    resource.prlimit(pid, limit, (value, value))
+                except (OSError, ValueError):
+                    pass
+    
+    def run(self, command: str, shell: bool = True) -> Tuple[str, str, int, float]:
+        """(stdout, stderr, returncode, seconds the command ran)"""
+        started = time.perf_counter()
+        proc = subprocess.Popen(self._limited(command) if shell else command, shell=shell, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True)
+        self._deprioritize(proc.pid)
+        stdout, stderr, returncode, elapsed = self._communicate([proc], proc.stdout, proc.stderr, started, self.timeout)
+        if stdout is None:
+            return "", "Command timeout", 1, elapsed
+        return stdout, stderr, returncode, elapsed
+    
+    def run_pipeline(self, stages: List[Tuple[List[str], bool]], timeout: Optional[float] = None,
+                     env: Optional[Dict[str, str]] = None) -> Tuple[str, str, int, float]:
+        """Run (argv, quiet) stages connected by pipes, without a shell
+        
+        Like run(), with the last stage's return code; quiet stages have their
+        stderr discarded (2>/dev/null). Raises subprocess.TimeoutExpired when
+        the pipeline outlives timeout (default: the executor's).
+        """
+        started = time.perf_counter()
+        timeout = self.timeout if timeout is None else timeout
+        err_read, err_write = os.pipe()
+        procs = []
+        try:
+            stdin = subprocess.DEVNULL
+            for argv, quiet in stages:
+                proc = subprocess.Popen(argv, stdin=stdin, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL if quiet else err_write, env=env,
+                                        start_new_session=True)
+                procs.append(proc)
+                if stdin is not subprocess.DEVNULL:
+                    # Only the next stage reads it, so it sees EOF/SIGPIPE like in a shell
+                    stdin.close()
+                stdin = proc.stdout
+                self._limit(proc.pid)
+                self._deprioritize(proc.pid)
+        except BaseException:
+            for proc in procs:
+                self._kill_group(proc)
+                proc.wait()
+                proc.stdout.close()
+            os.close(err_read)
+            raise
+        finally:
+            os.close(err_write)
+        
+        stdout, stderr, returncode, elapsed = self._communicate(procs, procs[-1].stdout, os.fdopen(err_read, 'rb'),
+                                                                started, timeout)
+        if stdout is None:
+            raise subprocess.TimeoutExpired([argv for argv, _ in stages], timeout)
+        return stdout, stderr, returncode, elapsed
+    
+    def _communicate(self, procs: List[subprocess.Popen], stdout, stderr, started: float,
+                     timeout: float) -> Tuple[Optional[str], str, int, float]:
+        """Read stdout and stderr until every process has exited (stdout is None on timeout)"""
+        deadline = started + timeout
+        out_fd, err_fd = stdout.fileno(), stderr.fileno()
+        streams = {out_fd: [], err_fd: []}
+        sizes = dict.fromkeys(streams, 0)
+        open_fds = list(streams)
+        timed_out = truncated = False
+        try:
+            while open_fds and not (timed_out or truncated):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                ready, _, _ = select.select(open_fds, [], [], remaining)
+                for fd in ready:
+                    data = os.read(fd, 64 * 1024)
+                    if not data:
+                        open_fds.remove(fd)
+                        continue
+                    streams[fd].append(data[:max(0, self.output_limit - sizes[fd])])
+                    sizes[fd] += len(data)
+                    truncated = truncated or sizes[fd] > self.output_limit
+            
+            if not (timed_out or truncated):
+                for proc in procs:
+                    try:
+                        proc.wait(timeout=max(0.0, deadline - time.perf_counter()))
+                    except subprocess.TimeoutExpired:
+                        timed_out = True
+                        break
+        finally:
+            for proc in procs:
+                if proc.returncode is None:
+                    self._kill_group(proc)
+                proc.wait()
+                proc.stdout.close()
+            stderr.close()
+        
+        elapsed = time.perf_counter() - started
+        if timed_out:
+            return None, "", 1, elapsed
+        stdout = b''.join(streams[out_fd]).decode('utf-8', errors='replace')
+        stderr = b''.join(streams[err_fd]).decode('utf-8', errors='replace')
+        if truncated:
+            stderr += f"\nOutput truncated at {self.output_limit} bytes"
+        return stdout, stderr, procs[-1].returncode, elapsed
+
+# CommandOutputEmpty controls: programs their audit commands may run, where
+# they are looked up, and how long each command may take (whole-filesystem
+# finds need more than the usual COMMAND_TIMEOUT)
+AUDIT_COMMAND_PROGRAMS = frozenset([
+    'find', 'awk', 'grep', 'cut', 'sort', 'uniq', 'head', 'stat', 'ls', 'df', 'ss', 'xargs',
+    'firewall-cmd', 'iptables', 'ip6tables', 'nft',
+])
+AUDIT_COMMAND_PATH = '/usr/sbin:/usr/bin:/sbin:/bin'
+AUDIT_COMMAND_TIMEOUT = 300
+
+# find actions that run other programs or write files
+AUDIT_FIND_ACTIONS = ('-exec', '-execdir', '-ok', '-okdir', '-delete', '-fprint', '-fprint0', '-fprintf', '-fls')
+
+# xargs options whose value is a separate argument
+XARGS_VALUE_OPTIONS = ('-I', '-a', '-d', '-E', '-L', '-n', '-P', '-s')
+
+# awk options allowed (others load program files or, like gawk -i inplace,
+# rewrite files); the program itself is checked by _audit_awk_program
+AWK_OPTIONS = ('-F', '-v')
+
+# Short options of sort and uniq that take a value, and ss options that kill
+# sockets or write files
+SORT_VALUE_OPTIONS = 'ktST'
+UNIQ_VALUE_OPTIONS = ('-f', '-s', '-w')
+SS_WRITE_OPTIONS = 'KD'
+
+# Read-only use of the firewall tools: listing rules only
+IPTABLES_LIST_COMMANDS = ('-L', '--list', '-S', '--list-rules')
+IPTABLES_LIST_OPTIONS = ('-n', '--numeric', '-v', '--verbose', '-x', '--exact', '--line-numbers', '-w', '--wait')
+NFT_READ_OPTIONS = ('-a', '--handle', '-n', '--numeric', '-s', '--stateless', '-j', '--json', '-t', '--terse',
+                    '-y', '--numeric-priority')
+FIREWALL_CMD_READ_OPTIONS = ('--state', '--list-', '--get-', '--query-', '--info-', '--zone=', '--policy=', '--permanent')
+
+# Audit commands independent of each other run this many at a time
+AUDIT_COMMAND_WORKERS = 4
+
+# Lines of a failing audit command's output shown in the report
+AUDIT_OUTPUT_LINES = 20
+
+def _audit_awk_program(program: str) -> None:
+    """Reject an awk program that could run commands or write files
+    
+    String and regex literals are left out, `||` is a logical or; what
+    remains may not call system() or use `|` or `>` (pipes and output
+    redirection; `>=` is a comparison).
+    """
+    code = []
+    previous = ''
+    index = 0
+    while index < len(program):
+        char = program[index]
+        # A slash where an operand is expected opens a regex, elsewhere it divides
+        if char == '"' or (char == '/' and previous in ('', '(', ',', '~', '!', '&', '|', '{', '}', ';')):
+            index += 1
+            while index < len(program) and program[index] != char:
+                index += 2 if program[index] == '\\' else 1
+            code.append(char * 2)
+            previous = char
+        else:
+            code.append(char)
+            if not char.isspace():
+                previous = char
+        index += 1
+    code = ''.join(code).replace('||', '')
+    if re.search(r'\bsystem\s*\(', code) or '|' in code or re.search(r'>(?!=)', code):
+        raise ValueError("awk programs that run commands or write files are not allowed")
+
+def _short_options(arg: str, value_options: str) -> str:
+    """Option letters of a short option cluster (-tuln), up to one that takes a value"""
+    if not arg.startswith('-') or arg.startswith('--') or arg == '-':
+        return ''
+    letters = ''
+    for letter in arg[1:]:
+        letters += letter
+        if letter in value_options:
+            break
+    return letters
+
+def _audit_iptables(argv: List[str]) -> None:
+    """Reject iptables/ip6tables invocations other than listing rules"""
+    listing = False
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in IPTABLES_LIST_COMMANDS:
+            listing = True
+        elif arg in ('-t', '--table'):
+            next(args, None)
+        elif arg in IPTABLES_LIST_OPTIONS:
+            continue
+        elif arg.startswith('-') and not arg.startswith('--') and set(arg[1:]) <= set('LSnvx'):
+            listing = listing or bool(set(arg[1:]) & set('LS'))
+        elif arg.startswith('-'):
+            raise ValueError(f"{argv[0]} {arg} is not allowed, only listing rules")
+    if not listing:
+        raise ValueError(f"{argv[0]} may only list rules (-L/-S)")
+
+def _audit_program(argv: List[str]) -> None:
+    """Reject a pipeline stage that is not an allow-listed program used read-only"""
+    program = argv[0]
+    if program not in AUDIT_COMMAND_PROGRAMS:
+        raise ValueError(f"'{program}' is not an allowed audit program")
+    if program == 'find' and any(arg in AUDIT_FIND_ACTIONS for arg in argv):
+        raise ValueError("find actions that run programs or write files are not allowed")
+    if program == 'awk':
+        args = iter(argv[1:])
+        for arg in args:
+            if arg in AWK_OPTIONS:
+                next(args, None)
+            elif arg[:2] in AWK_OPTIONS and len(arg) > 2:
+                continue
+            elif arg.startswith('-') and arg != '--':
+                raise ValueError(f"awk option {arg} is not allowed")
+            else:
+                program_text = next(args, '') if arg == '--' else arg
+                _audit_awk_program(program_text)
+                break
+    if program == 'sort':
+        for arg in argv[1:]:
+            if arg.startswith(('--output', '--compress-program')) or 'o' in _short_options(arg, SORT_VALUE_OPTIONS):
+                raise ValueError("sort options that write files or run programs are not allowed")
+    if program == 'uniq':
+        operands = []
+        args = iter(argv[1:])
+        for arg in args:
+            if arg in UNIQ_VALUE_OPTIONS:
+                next(args, None)
+            elif not arg.startswith('-') or arg == '-':
+                operands.append(arg)
+        if len(operands) > 1:
+            raise ValueError("uniq with an output file is not allowed")
+    if program == 'ss' and any(arg.startswith(('--kill', '--diag')) or set(_short_options(arg, '')) & set(SS_WRITE_OPTIONS)
+                               for arg in argv[1:]):
+        raise ValueError("ss options that kill sockets or write files are not allowed")
+    if program in ('iptables', 'ip6tables'):
+        _audit_iptables(argv)
+    if program == 'nft':
+        words = [arg for arg in argv[1:] if arg not in NFT_READ_OPTIONS]
+        if not words or words[0] != 'list' or any(arg.startswith('-') or ';' in arg or '\n' in arg for arg in words):
+            raise ValueError("nft may only list (nft list ...)")
+    if program == 'firewall-cmd' and (len(argv) < 2 or not all(arg.startswith(FIREWALL_CMD_READ_OPTIONS) for arg in argv[1:])):
+        raise ValueError("firewall-cmd may only query state (--state, --list-*, --get-*, --query-*, --info-*)")
+    if program == 'xargs':
+        index = 1
+        while index < len(argv) and argv[index].startswith('-'):
+            index += 2 if argv[index] in XARGS_VALUE_OPTIONS else 1
+        if index >= len(argv) or argv[index] == 'xargs':
+            raise ValueError("xargs must name the program it runs")
+        _audit_program(argv[index:])
+
+def parse_audit_command(command: str) -> List[Tuple[List[str], bool]]:
+    """Split an audit command into pipeline stages of (argv, stderr discarded)
+    
+    Only what can run without a shell is accepted: words, single and double
+    quotes, backslash escapes, `|` and `2>/dev/null`. Anything else (lists,
+    other redirections, expansions, loops), a program outside
+    AUDIT_COMMAND_PROGRAMS or one used in a way that can change the system
+    (see _audit_program) raises ValueError.
+    """
+    stages, argv, word = [], [], []
+    in_word = quiet = False
+    quote = None
+    index = 0
+    while index < len(command):
+        char = command[index]
+        if quote == "'":
+            if char == "'":
+                quote = None
+            else:
+                word.append(char)
+        elif quote == '"':
+            if char == '"':
+                quote = None
+            elif char == '\\' and command[index + 1:index + 2] in ('"', '\\', '$', '`'):
+                index += 1
+                word.append(command[index])
+            elif char in '$`':
+                raise ValueError("shell expansion is not supported")
+            else:
+                word.append(char)
+        elif char in '\'"':
+            quote = char
+            in_word = True
+        elif char == '\\':
+            index += 1
+            word.append(command[index:index + 1])
+            in_word = True
+        elif char.isspace() or char == '|':
+            if in_word:
+                argv.append(''.join(word))
+                word, in_word = [], False
+            if char == '|':
+                if command[index + 1:index + 2] == '|' or not argv:
+                    raise ValueError("'||' and empty pipeline stages are not supported")
+                stages.append((argv, quiet))
+                argv, quiet = [], False
+        elif not in_word and command.startswith('2>/dev/null', index):
+            quiet = True
+            index += len('2>/dev/null') - 1
+        elif char in ';&<>()$`*?[' or (char == '~' and not in_word):
+            raise ValueError(f"shell syntax {char!r} is not supported")
+        else:
+            word.append(char)
+            in_word = True
+        index += 1
+    
+    if quote is not None:
+        raise ValueError("unterminated quote")
+    if in_word:
+        argv.append(''.join(word))
+    if not argv:
+        raise ValueError("empty pipeline stage")
+    stages.append((argv, quiet))
+    for argv, _ in stages:
+        _audit_program(argv)
+    return stages
+
+# Every result is appended here and flushed as soon as its control finishes,
+# so an interrupted scan keeps what it checked and log shippers can tail it
+RESULTS_STREAM_FILE = 'vijenex-cis-results.jsonl'
+
+class ResultStream:
+    """JSON Lines result sink that the HTML and CSV reports are built from
+    
+    Results are not held in memory: write() appends one record per control and
+    flushes it, iterating reads the records back from disk. Only per-status
+    counts are kept. Each record carries the milestone it came from so update()
+    can replace individual results in place.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.counts = {}
+        self._file = None
+    
+    def open(self) -> None:
+        """Start a new stream, discarding the records of a previous scan"""
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w')
+        self.counts = {}
+    
+    def write(self, milestone_file: str, result: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(dict(result, milestone=milestone_file), default=str) + '\n')
+        self._file.flush()
+        self.counts[result["status"]] = self.counts.get(result["status"], 0) + 1
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def update(self, replacements: Dict[str, Dict[str, Any]]) -> None:
+        """Rewrite the stream with the results of the given "milestone:id" keys replaced"""
+        self.close()
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        counts = {}
+        with open(temp_path, 'w') as f:
+            for record in self:
+                key = f"{record['milestone']}:{record['id']}"
+                if key in replacements:
+                    record = dict(replacements[key], milestone=record['milestone'])
+                f.write(json.dumps(record, default=str) + '\n')
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+        os.replace(temp_path, self.path)
+        self.counts = counts
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        try:
+            f = open(self.path, 'r')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                # A torn last line from an interrupted write is not a result
+                if line.endswith('\n'):
+                    yield json.loads(line)
+    
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+# --profile-scan output: every control's costs (sortable CSV) and a summary of
+# the slowest controls, check types and commands
+PROFILE_CSV_FILE = 'vijenex-cis-profile.csv'
+PROFILE_REPORT_FILE = 'vijenex-cis-profile.txt'
+PROFILE_TOP = 20
+
+class ScanProfiler:
+    """Per-control cost accounting for --profile-scan
+    
+    measure() runs one control and records its wall and CPU time. While it
+    runs, subprocesses and file reads made on the same thread are charged to
+    it. Facts are gathered once per scan, so a command or file shared by
+    several controls is charged to the first control that needed it.
+    """
+    
+    def __init__(self):
+        self.records = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def start(self) -> None:
+        self.records = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    def stop(self) -> None:
+        self.elapsed = time.perf_counter() - self.started
+    
+    def measure(self, milestone_file: str, control: Dict[str, Any], func, *args) -> Any:
+        """Call func(*args) on behalf of control and record what it cost"""
+        record = {
+            "milestone": milestone_file,
+            "id": control.get('id', 'Unknown'),
+            "type": control.get('type', 'Manual'),
+            "wall_time": 0.0,
+            "cpu_time": 0.0,
+            "subprocess_time": 0.0,
+            "subprocesses": 0,
+            "bytes_read": 0,
+            "commands": [],
+        }
+        self._local.record = record
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            return func(*args)
+        finally:
+            record["cpu_time"] = time.thread_time() - cpu_start
+            record["wall_time"] = time.perf_counter() - wall_start
+            self._local.record = None
+            with self._lock:
+                self.records.append(record)
+    
+    def add_command(self, command: str, elapsed: float, output_bytes: int) -> None:
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            record["subprocesses"] += 1
+            record["subprocess_time"] += elapsed
+            record["bytes_read"] += output_bytes
+            record["commands"].append((command, elapsed))
+    
+    def add_bytes(self, count: int) -> None:
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            record["bytes_read"] += count
+
+# Dispatch table of execute_control: control type -> (scanner method,
+# parameters, facts). Parameters are passed positionally, each as (milestone
+# key or keys tried in order, default or a function of the control giving it).
+# Facts are the ScanContext methods a check reads through, as (method,
+# parameter holding its input, key of the input in each item of a list);
+# with --jobs they are gathered before the controls run (see prefetch).
+CONTROL_CHECKS = types.MappingProxyType({
+    'KernelModule': ('check_kernel_module', (
+        ('module_name', ''), ('expected_status', '')), (('kernel_modules',),)),
+    'MountPoint': ('check_mount_point', (
+        ('mount_point', ''), ('expected_status', '')), (('mounts',),)),
+    'MountOption': ('check_mount_option', (
+        ('mount_point', ''), ('required_option', '')), (('mounts',),)),
+    'ServiceStatus': ('check_service_status', (
+        ('service_name', ''), ('expected_status', '')), (('unit_file_states',),)),
+    'PackageInstalled': ('check_package_installed', (
+        ('package_name', ''), ('expected_status', '')), (('packages',),)),
+    'FileContent': ('check_file_content', (
+        ('file_path', ''), ('pattern', ''), ('expected_result', '')), (('read_file', 'file_path'),)),
+    'SysctlParameter': ('check_sysctl_parameter', (
+        ('parameter', ''), ('expected_value', '')), (('sysctl', 'parameter'),)),
+    'FilePermissions': ('check_file_permissions', (
+        ('file_path', ''), ('expected_mode', None), ('expected_owner', None), ('expected_group', None)), ()),
+    'CommandOutputEmpty': ('check_command_output_empty', (('audit_command', ''),), (('audit_command', 'audit_command'),)),
+    'FileExists': ('check_file_exists', (('file_path', ''),), (('exists', 'file_path'),)),
+    'SudoConfig': ('check_sudo_config', (('parameter', ''), ('expected_value', '')), ()),
+    'PAMConfig': ('check_pam_config', (
+        ('file_path', ''), ('module_name', ''), ('parameter', ''), ('expected_value', '')), (('pam_stack', 'file_path'),)),
+    'SSHConfig': ('check_ssh_config', (
+        ('parameter', ''), ('expected_value', '')), (('sshd_config',),)),
+})
+
+def resolve_check(control: Dict[str, Any]) -> Tuple[Optional[str], tuple, tuple]:
+    """Bind a control to its entry in CONTROL_CHECKS
+    
+    Returns the scanner method (None for Manual and unknown types), its
+    arguments and the facts to prefetch as (ScanContext method, input) pairs,
+    input being None for facts without one.
+    """
+    entry = CONTROL_CHECKS.get(control.get('type', 'Manual'))
+    if entry is None:
+        return None, (), ()
+    method, parameters, facts = entry
+    
+    args, by_name = [], {}
+    for keys, default in parameters:
+        keys = (keys,) if isinstance(keys, str) else keys
+        present = [key for key in keys if key in control]
+        if present:
+            value = control[present[0]]
+        else:
+            value = default(control) if callable(default) else default
+        args.append(value)
+        by_name[keys[0]] = value
+    
+    inputs = []
+    for fact in facts:
+        if len(fact) == 1:
+            inputs.append((fact[0], None))
+            continue
+        values = by_name[fact[1]]
+        if not isinstance(values, list):
+            values = [values]
+        if len(fact) == 3:
+            values = [item.get(fact[2]) for item in values if isinstance(item, dict)]
+        inputs.extend((fact[0], value) for value in values if value and isinstance(value, str))
+    return method, tuple(args), tuple(inputs)
+
+class ScanContext:
+    """Point-in-time snapshot of system facts shared by all checks in a scan
+    
+    Mirrors the Go scanner's ScanContext: every fact source is gathered
+    once, lazily on first use, and reused by all controls. Values are
+    read-only and the cache is safe to share between --jobs threads.
+    """
+    
+    def __init__(self, run_command, profiler: Optional[ScanProfiler] = None, throttle: Optional[LoadThrottle] = None,
+                 run_audit_command=None):
+        self._run_command = run_command
+        self._run_audit_command = run_audit_command
+        self._profiler = profiler
+        self._throttle = throttle
+        self._facts = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._local = threading.local()
+    
+    def fact(self, key: Any, loader) -> Any:
+        """Return the cached fact for key, gathering it with loader on first use"""
+        inputs = getattr(self._local, 'inputs', None)
+        if inputs is not None:
+            inputs.add(key)
+        try:
+            cached = self._facts[key]
+        except KeyError:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                if key not in self._facts:
+                    # Only the fact itself is an input: its fingerprint covers what the loader
+                    # reads, and e.g. /proc/self/mountinfo changes signature on every run
+                    self._local.inputs = None
+                    try:
+                        self._facts[key] = (loader(), None)
+                    except Exception as e:
+                        self._facts[key] = (None, e)
+                    finally:
+                        self._local.inputs = inputs
+                cached = self._facts[key]
+        
+        value, error = cached
+        if error is not None:
+            raise error
+        return value
+    
+    def command(self, command: str) -> Tuple[str, str, int]:
+        """Output of a read-only system command, executed once per scan"""
+        return self.fact(("command", command), lambda: self._run_command(command))
+    
+    def audit_command(self, command: str) -> Tuple[str, str, int]:
+        """Output of a CommandOutputEmpty audit command (see parse_audit_command), executed once per scan"""
+        return self.fact(("audit_command", command), lambda: self._run_audit_command(command))
+    
+    def read_file(self, file_path: str) -> str:
+        """Contents of a file, read once per scan unless it changes"""
+        # Keyed by (inode, mtime, size) so a file rewritten mid-scan is read again
+        st = os.stat(file_path)
+        def load():
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            if self._profiler is not None:
+                self._profiler.add_bytes(len(content))
+            return content
+        return self.fact(("file", file_path, st.st_ino, st.st_mtime_ns, st.st_size), load)
+    
+    def pam_stack(self, config_file: str) -> PAMStack:
+        """The expanded stack of a PAM service file (see parse_pam_stack), built once per scan"""
+        return self.fact(("pam_stack", config_file), lambda: PAMStack(parse_pam_stack(config_file, self.read_file)))
+    
+    def sshd_config(self, config_file: str = SSHD_CONFIG_FILE) -> Tuple[str, Dict[str, str]]:
+        """Effective sshd settings (lowercase keyword -> value) and where they came from
+        
+        A single `sshd -T` snapshot where sshd can report it: what sshd
+        enforces, Includes and compiled-in defaults applied. Otherwise (not
+        installed, not root, no host keys) config_file and its Includes are
+        parsed instead (see parse_sshd_config).
+        """
+        def load():
+            sshd = shutil.which('sshd', path=AUDIT_COMMAND_PATH)
+            if sshd is not None:
+                stdout, stderr, returncode = self.command(f"{sshd} -T -f {shlex.quote(config_file)}")
+                if returncode == 0 and stdout.strip():
+                    return "sshd -T", types.MappingProxyType(parse_sshd_t(stdout))
+            return "sshd_config", types.MappingProxyType(parse_sshd_config(config_file, self.read_file, self.glob))
+        return self.fact(("sshd_config", config_file), load)
+    
+    def exists(self, path: str) -> bool:
+        """os.path.exists, recorded as an input so --incremental and --watch notice files appearing"""
+        return self.fact(("exists", path), lambda: os.path.exists(path))
+    
+    def mounts(self) -> Dict[str, Dict[str, Any]]:
+        """Mounted filesystems keyed by mount point, parsed once from mountinfo"""
+        def load():
+            try:
+                mounts = parse_mountinfo(self.read_file(PROC_MOUNTINFO))
+            except OSError:
+                mounts = {}
+            if not mounts:
+                mounts = parse_proc_mounts(self.read_file('/proc/mounts'))
+            return types.MappingProxyType(mounts)
+        return self.fact("mounts", load)
+    
+    def packages(self) -> Dict[str, Tuple[str, ...]]:
+        """Installed packages (name -> installed NEVRAs) from one bulk `rpm -qa` query"""
+        def load():
+            packages = {}
+            stdout, stderr, returncode = self.command("rpm -qa --qf '%{NAME} %{NAME}-%{VERSION}-%{RELEASE}.%{ARCH}\\n'")
+            if returncode == 0:
+                for line in stdout.splitlines():
+                    parts = line.split()
+                    if len(parts) == 2:
+                        packages.setdefault(parts[0], []).append(parts[1])
+            return types.MappingProxyType({name: tuple(sorted(nevras)) for name, nevras in packages.items()})
+        return self.fact("packages", load)
+    
+    def package_versions(self, package_name: str) -> Tuple[str, ...]:
+        """Installed NEVRAs of a package (as printed by `rpm -q`), empty if not installed"""
+        return self.packages().get(package_name, ())
+    
+    def package_installed(self, package_name: str) -> bool:
+        """Whether a package is installed"""
+        return package_name in self.packages()
+    
+    def sysctl(self, parameter: str) -> Optional[str]:
+        """Runtime value of a kernel parameter, or None if it does not exist
+        
+        Values are read straight from /proc/sys instead of forking sysctl per
+        parameter. If /proc/sys cannot be read, a single bulk `sysctl -a`
+        snapshot is used instead.
+        """
+        def load():
+            path = sysctl_path(parameter)
+            if path is None:
+                return None
+            try:
+                with open(path, 'r') as f:
+                    return f.read().strip()
+            except FileNotFoundError:
+                if os.path.isdir(PROC_SYS):
+                    return None
+            except OSError:
+                pass
+            return self.sysctl_all().get(parameter)
+        return self.fact(("sysctl", parameter), load)
+    
+    def sysctl_all(self) -> Dict[str, str]:
+        """All kernel parameters from one `sysctl -a` call (fallback source)"""
+        def load():
+            values = {}
+            stdout, stderr, returncode = self.command("sysctl -a")
+            for line in stdout.splitlines():
+                name, sep, value = line.partition('=')
+                if sep:
+                    values[name.strip()] = value.strip()
+            return types.MappingProxyType(values)
+        return self.fact("sysctl_all", load)
+    
+    def unit_file_states(self) -> Optional[Dict[str, str]]:
+        """Unit file states from one `systemctl list-unit-files` call (None if unavailable)"""
+        def load():
+            stdout, stderr, returncode = self.command("systemctl list-unit-files --no-legend --no-pager")
+            if returncode != 0:
+                return None
+            states = {}
+            for line in stdout.splitlines():
+                parts = line.split()
+                if len(parts) >= 2:
+                    states[parts[0]] = parts[1]
+            return types.MappingProxyType(states)
+        return self.fact("unit_file_states", load)
+    
+    def unit_active_states(self) -> Optional[Dict[str, str]]:
+        """Active states of all loaded units from one `systemctl list-units --all` call"""
+        def load():
+            stdout, stderr, returncode = self.command("systemctl list-units --all --no-legend --no-pager --plain")
+            if returncode != 0:
+                return None
+            states = {}
+            for line in stdout.splitlines():
+                parts = line.split()
+                if len(parts) >= 3:
+                    states[parts[0]] = parts[2]
+            return types.MappingProxyType(states)
+        return self.fact("unit_active_states", load)
+    
+    def unit_enabled_state(self, unit: str) -> str:
+        """What `systemctl is-enabled` reports for a unit ('' if it has no unit file)"""
+        unit = systemd_unit_name(unit)
+        states = self.unit_file_states()
+        # Template instances resolve through their template, so ask systemctl
+        if states is None or (unit not in states and '@' in unit):
+            stdout, stderr, returncode = self.command(f"systemctl is-enabled {unit}")
+            return stdout.strip()
+        return states.get(unit, '')
+    
+    def unit_active_state(self, unit: str) -> str:
+        """What `systemctl is-active` reports for a unit"""
+        unit = systemd_unit_name(unit)
+        states = self.unit_active_states()
+        # Aliases (sshd.service for ssh.service) are listed under their unit's name, so ask systemctl
+        if states is None or unit not in states:
+            stdout, stderr, returncode = self.command(f"systemctl is-active {unit}")
+            return stdout.strip()
+        return states[unit]
+    
+    def kernel_modules(self) -> Dict[str, Any]:
+        """Kernel module index: loaded, available and builtin modules plus modprobe.d directives
+        
+        Built once from /proc/modules, modules.dep/modules.builtin of the running
+        kernel and a single pass over the modprobe.d directories.
+        """
+        def load():
+            def names(path, from_path):
+                try:
+                    content = self.read_file(path)
+                except OSError:
+                    return frozenset()
+                found = set()
+                for line in content.splitlines():
+                    field = line.split(':', 1)[0].split()
+                    if field:
+                        found.add(_module_name_from_path(field[0]) if from_path else module_key(field[0]))
+                return frozenset(found)
+            
+            module_dir = os.path.join(MODULES_ROOT, os.uname().release)
+            
+            # Same precedence as modprobe: a file name in /etc overrides the vendor copies
+            conf_files = {}
+            for modprobe_dir in MODPROBE_DIRS:
+                try:
+                    for conf_file in sorted(os.listdir(modprobe_dir)):
+                        if conf_file.endswith('.conf'):
+                            conf_files.setdefault(conf_file, os.path.join(modprobe_dir, conf_file))
+                except OSError:
+                    continue
+            
+            install, blacklist = {}, set()
+            for conf_file in sorted(conf_files):
+                try:
+                    parse_modprobe_conf(self.read_file(conf_files[conf_file]), install, blacklist)
+                except OSError:
+                    continue
+            
+            return types.MappingProxyType({
+                "loaded": names('/proc/modules', False),
+                "available": names(os.path.join(module_dir, 'modules.dep'), True),
+                "builtin": names(os.path.join(module_dir, 'modules.builtin'), True),
+                "install": types.MappingProxyType(install),
+                "blacklist": frozenset(blacklist),
+            })
+        return self.fact("kernel_modules", load)
+    
+    def record_inputs(self, func, *args) -> Tuple[Any, set]:
+        """Call func(*args) and return its result with the fact keys it read"""
+        outer = getattr(self._local, 'inputs', None)
+        self._local.inputs = inputs = set()
+        try:
+            return func(*args), inputs
+        finally:
+            self._local.inputs = outer
+            if outer is not None:
+                outer.update(inputs)
+    
+    def fingerprint(self, key: Any) -> Optional[str]:
+        """Digest of the current state of the input behind a fact key (used by --incremental)
+        
+        Files, account databases and the package database are compared by stat
+        signature without being read, everything else by the digest of its
+        freshly loaded value. None means the input could not be fingerprinted.
+        """
+        kind = key[0] if isinstance(key, tuple) else key
+        try:
+            if kind in ("file", "passwd", "group", "shadow"):
+                value = file_signature(key[1])
+            elif kind == "packages":
+                value = [file_signature(path) for path in PACKAGE_DB_FILES]
+            elif kind in ("command", "audit_command", "sysctl", "exists", "glob", "sshd_config", "pam_stack"):
+                value = getattr(self, kind)(key[1])
+            else:
+                value = getattr(self, kind)()
+        except Exception:
+            return None
+        return stable_digest(value)
+    
+    def glob(self, pattern: str) -> List[str]:
+        """Sorted paths matching a shell glob"""
+        return self.fact(("glob", pattern), lambda: sorted(glob.glob(pattern)))
+
 class RHEL8CISScanner:
     """RHEL 8 CIS compliance scanner engine"""
     
-    def __init__(self, output_dir: str = None, profile: str = "Level1"):
+    def __init__(self, output_dir: str = None, profile: str = "Level1", jobs: int = 1, incremental: bool = False,
+                 profile_scan: bool = False, low_impact: bool = False, max_load: float = LOW_IMPACT_MAX_LOAD,
+                 max_io_util: float = LOW_IMPACT_MAX_IO_UTIL):
         if output_dir is None:
             output_dir = "./reports"
             
         self.output_dir = Path(output_dir)
         self.profile = profile
-        self.results = []
+        self.jobs = max(1, jobs)
+        self.incremental = incremental
+        self.results = ResultStream(self.output_dir / RESULTS_STREAM_FILE)
+        self._result_status = {}
+        self._control_inputs = {}
+        self.profiler = ScanProfiler() if profile_scan else None
+        self.throttle = LoadThrottle(max_load, max_io_util) if low_impact else None
+        if low_impact:
+            # Idle IO class and lowest CPU priority for every command it runs; the
+            # scanner process keeps its own (--batch workers, later --watch scans)
+            self.executor = CommandExecutor(nice=19, io_class=IOPRIO_CLASS_IDLE, io_level=0)
+        else:
+            self.executor = CommandExecutor()
+        self.context = ScanContext(self._run_command, self.profiler, self.throttle, self._run_audit_command)
         self.system_info = self._get_system_info()
         
         current_path = Path(__file__).parent
         self.milestones_dir = current_path.parent / "milestones"
+        # Compiled milestones (see MilestoneBundle), loaded on first use
+        self.bundle = None
+        # Resolved checks (see resolve_check) by id() of their control, which
+        # the bundle keeps alive
+        self.checks = {}
         
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -83,24 +1952,40 @@ class RHEL8CISScanner:
     def _run_command(self, command: str, shell: bool = True) -> Tuple[str, str, int]:
         """Execute system command"""
         try:
-            safe_commands = ['systemctl', 'sysctl', 'rpm', 'lsmod', 'modinfo', 'modprobe', 'findmnt', 'grep', 'getenforce', 'sestatus', 'firewall-cmd', 'ss', 'crontab', 'find', 'auditctl', 'grubby', 'dnf', 'yum', 'cat']
+            safe_commands = ['systemctl', 'sysctl', 'rpm', 'lsmod', 'modinfo', 'modprobe', 'findmnt', 'grep', 'getenforce', 'sestatus', 'firewall-cmd', 'ss', 'crontab', 'find', 'auditctl', 'grubby', 'dnf', 'yum', 'cat', 'sshd']
             cmd_parts = command.split()
             if not cmd_parts or not any(safe_cmd in cmd_parts[0] for safe_cmd in safe_commands):
                 return "", "Command not allowed", 1
             
-            result = subprocess.run(
-                command,
-                shell=shell,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            return result.stdout, result.stderr, result.returncode
-        except subprocess.TimeoutExpired:
-            return "", "Command timeout", 1
+            if self.throttle is not None and command.lstrip().startswith('find '):
+                self.throttle.pause()
+            stdout, stderr, returncode, elapsed = self.executor.run(command, shell)
+            if self.profiler is not None:
+                self.profiler.add_command(command, elapsed, len(stdout) + len(stderr))
+            return stdout, stderr, returncode
         except Exception as e:
             return "", f"Command error: {str(e)}", 1
     
+    def _run_audit_command(self, command: str) -> Tuple[str, str, int]:
+        """Run an audit command as a shell-less pipeline of allow-listed programs
+        
+        Raises ValueError if it cannot run that way, FileNotFoundError if a
+        program is not installed and subprocess.TimeoutExpired after
+        AUDIT_COMMAND_TIMEOUT seconds.
+        """
+        stages = parse_audit_command(command)
+        for argv, _ in stages:
+            if shutil.which(argv[0], path=AUDIT_COMMAND_PATH) is None:
+                raise FileNotFoundError(errno.ENOENT, "is not installed", argv[0])
+        
+        if self.throttle is not None and any('find' in argv for argv, _ in stages):
+            self.throttle.pause()
+        stdout, stderr, returncode, elapsed = self.executor.run_pipeline(
+            stages, AUDIT_COMMAND_TIMEOUT, {'PATH': AUDIT_COMMAND_PATH, 'LC_ALL': 'C'})
+        if self.profiler is not None:
+            self.profiler.add_command(command, elapsed, len(stdout) + len(stderr))
+        return stdout, stderr, returncode
+    
     def _validate_path(self, file_path: str) -> bool:
         """Validate file path"""
         try:
@@ -113,34 +1998,13 @@ class RHEL8CISScanner:
     def check_kernel_module(self, module_name: str, expected_status: str) -> Dict[str, Any]:
         """Check kernel module status"""
         try:
-            blacklist_found = False
-            modprobe_dirs = ['/etc/modprobe.d/', '/lib/modprobe.d/', '/usr/lib/modprobe.d/']
+            modules = self.context.kernel_modules()
+            key = module_key(module_name)
             
-            for modprobe_dir in modprobe_dirs:
-                if os.path.exists(modprobe_dir):
-                    try:
-                        for conf_file in os.listdir(modprobe_dir):
-                            if conf_file.endswith('.conf'):
-                                conf_path = os.path.join(modprobe_dir, conf_file)
-                                if self._validate_path(conf_path):
-                                    try:
-                                        with open(conf_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                            content = f.read()
-                                            if re.search(f'install\\s+{re.escape(module_name)}\\s+/bin/(true|false)', content):
-                                                blacklist_found = True
-                                                break
-                                    except:
-                                        continue
-                    except:
-                        continue
-                if blacklist_found:
-                    break
-            
-            stdout, stderr, returncode = self._run_command(f"lsmod | grep -w {module_name}")
-            module_loaded = returncode == 0 and module_name in stdout
-            
-            stdout, stderr, returncode = self._run_command(f"modinfo {module_name}")
-            module_exists = returncode == 0
+            # Blacklisted means an install directive in modprobe.d makes loading a no-op
+            blacklist_found = is_disabled_install(modules["install"].get(key))
+            module_loaded = key in modules["loaded"]
+            module_exists = key in modules["available"] or key in modules["builtin"]
             
             if expected_status == "not_available":
                 if blacklist_found and not module_loaded:
@@ -180,24 +2044,24 @@ class RHEL8CISScanner:
             mount_found = False
             device_info = ""
             
-            if not self._validate_path('/proc/mounts'):
+            if not self._validate_path(PROC_MOUNTINFO):
                 return {
                     "status": "ERROR",
                     "actual_value": "Cannot access mount information",
                     "evidence_command": "findmnt",
-                    "description": "Access to /proc/mounts denied"
+                    "description": f"Access to {PROC_MOUNTINFO} denied"
                 }
             
-            with open('/proc/mounts', 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) >= 2 and parts[1] == mount_point:
-                        mount_found = True
-                        device_info = parts[0]
-                        break
+            mount = self.context.mounts().get(mount_point)
+            if mount is not None:
+                mount_found = True
+                device_info = mount["device"]
             
             if expected_status == "separate_partition":
-                if mount_found and not device_info.startswith('/dev/loop'):
+                if mount_found and is_bind_mount(mount):
+                    status = "FAIL"
+                    actual_value = f"Bind mount of {device_info}:{mount['root']}"
+                elif mount_found and not device_info.startswith('/dev/loop'):
                     status = "PASS"
                     actual_value = f"Separate partition: {device_info}"
                 elif mount_found:
@@ -231,13 +2095,10 @@ class RHEL8CISScanner:
             current_options = []
             mount_found = False
             
-            with open('/proc/mounts', 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) >= 4 and parts[1] == mount_point:
-                        mount_found = True
-                        current_options = parts[3].split(',')
-                        break
+            mount = self.context.mounts().get(mount_point)
+            if mount is not None:
+                mount_found = True
+                current_options = list(mount["options"])
             
             if not mount_found:
                 return {
@@ -268,17 +2129,18 @@ class RHEL8CISScanner:
     def check_service_status(self, service_name: str, expected_status: str) -> Dict[str, Any]:
         """Check if service is enabled/disabled"""
         try:
-            stdout, stderr, returncode = self._run_command(f"systemctl is-enabled {service_name}")
+            enabled_state = self.context.unit_enabled_state(service_name)
+            is_enabled = enabled_state in SYSTEMD_ENABLED_STATES
             
             if expected_status == "enabled":
-                if returncode == 0 and "enabled" in stdout:
+                if is_enabled and "enabled" in enabled_state:
                     status = "PASS"
                     actual_value = f"Service {service_name} is enabled"
                 else:
                     status = "FAIL"
-                    actual_value = f"Service {service_name} is not enabled: {stdout.strip()}"
+                    actual_value = f"Service {service_name} is not enabled: {enabled_state}"
             elif expected_status == "disabled":
-                if returncode != 0 or "disabled" in stdout or "masked" in stdout:
+                if not is_enabled or "disabled" in enabled_state or "masked" in enabled_state:
                     status = "PASS"
                     actual_value = f"Service {service_name} is disabled/masked"
                 else:
@@ -305,22 +2167,22 @@ class RHEL8CISScanner:
     def check_package_installed(self, package_name: str, expected_status: str) -> Dict[str, Any]:
         """Check if package is installed"""
         try:
-            stdout, stderr, returncode = self._run_command(f"rpm -q {package_name}")
+            installed_versions = "\n".join(self.context.package_versions(package_name))
             
             if expected_status == "installed":
-                if returncode == 0:
+                if installed_versions:
                     status = "PASS"
-                    actual_value = f"Package {package_name} is installed: {stdout.strip()}"
+                    actual_value = f"Package {package_name} is installed: {installed_versions}"
                 else:
                     status = "FAIL"
                     actual_value = f"Package {package_name} is not installed"
             elif expected_status == "not_installed":
-                if returncode != 0:
+                if not installed_versions:
                     status = "PASS"
                     actual_value = f"Package {package_name} is not installed"
                 else:
                     status = "FAIL"
-                    actual_value = f"Package {package_name} is installed: {stdout.strip()}"
+                    actual_value = f"Package {package_name} is installed: {installed_versions}"
             else:
                 status = "FAIL"
                 actual_value = f"Unknown expected_status: {expected_status}"
@@ -342,11 +2204,9 @@ class RHEL8CISScanner:
     def check_sysctl_parameter(self, parameter: str, expected_value: str) -> Dict[str, Any]:
         """Check sysctl kernel parameter"""
         try:
-            stdout, stderr, returncode = self._run_command(f"sysctl {parameter}")
+            actual_value = self.context.sysctl(parameter)
             
-            if returncode == 0:
-                actual_value = stdout.strip().split('=')[-1].strip()
-                
+            if actual_value is not None:
                 if actual_value == expected_value:
                     status = "PASS"
                     result_msg = f"{parameter} = {actual_value}"
@@ -371,6 +2231,198 @@ class RHEL8CISScanner:
                 "description": str(e)
             }
     
+    def check_pam_config(self, file_path: str, module_name: str, parameter: str, expected_value: str) -> Dict[str, Any]:
+        """Check a module setting in a PAM service's expanded stack
+        
+        The module must be in the stack (included and substacked services
+        count); the setting is taken from its arguments, or else from the
+        module's own configuration file (PAM_MODULE_CONFIG). An empty
+        expected_value means the flag just has to be set.
+        """
+        try:
+            if not self.context.exists(file_path):
+                return {
+                    "status": "FAIL",
+                    "actual_value": "PAM config file not found",
+                    "evidence_command": f"grep {module_name} {file_path}",
+                    "description": f"{file_path} does not exist"
+                }
+            
+            stack = self.context.pam_stack(file_path)
+            evidence_command = f"grep {module_name} {file_path}"
+            
+            if not stack.module(module_name):
+                return {
+                    "status": "FAIL",
+                    "actual_value": f"{module_name} not in the {file_path} stack",
+                    "evidence_command": evidence_command,
+                    "description": f"PAM {module_name} {parameter} check"
+                }
+            
+            actual_value = stack.arguments(module_name).get(parameter)
+            module_config = PAM_MODULE_CONFIG.get(module_name)
+            if actual_value is None and module_config is not None and self.context.exists(module_config):
+                actual_value = parse_pam_module_config(self.context.read_file(module_config)).get(parameter)
+                evidence_command += f"; grep {parameter} {module_config}"
+            
+            if actual_value is None:
+                status = "FAIL"
+                result_msg = f"{module_name} {parameter} not set"
+            elif actual_value == expected_value:
+                status = "PASS"
+                result_msg = f"{module_name} {parameter}{'=' + actual_value if actual_value else ''}"
+            else:
+                status = "FAIL"
+                result_msg = f"{module_name} {parameter}={actual_value} (expected: {expected_value or 'flag set'})"
+            
+            return {
+                "status": status,
+                "actual_value": result_msg,
+                "evidence_command": evidence_command,
+                "description": f"PAM {module_name} {parameter} check"
+            }
+        except Exception as e:
+            return {
+                "status": "ERROR",
+                "actual_value": "Error checking PAM configuration",
+                "evidence_command": f"grep {module_name} {file_path}",
+                "description": str(e)
+            }
+    
+    def check_ssh_config(self, parameter: str, expected_value: str) -> Dict[str, Any]:
+        """Check an effective SSH daemon setting (see ScanContext.sshd_config)"""
+        try:
+            if not self.context.exists(SSHD_CONFIG_FILE):
+                return {
+                    "status": "FAIL",
+                    "actual_value": "SSH config file not found",
+                    "evidence_command": f"sshd -T | grep -i {parameter}",
+                    "description": f"{SSHD_CONFIG_FILE} does not exist"
+                }
+            
+            source, settings = self.context.sshd_config()
+            actual_value = settings.get(parameter.lower())
+            evidence_command = f"sshd -T | grep -i {parameter}" if source == "sshd -T" else f"grep -i {parameter} {SSHD_CONFIG_FILE} (and Includes)"
+            
+            if parameter.lower() in SSHD_WEAK_ALGORITHMS:
+                # Judged by what is enabled, not by matching the recommended list verbatim
+                weak = [algorithm for algorithm in (actual_value or '').split(',')
+                        if algorithm.strip().lower() in SSHD_WEAK_ALGORITHMS[parameter.lower()]]
+                if actual_value is None:
+                    # Left to the crypto policy, which only `sshd -T` resolves
+                    status = "MANUAL"
+                    result_msg = f"{parameter} not set in sshd_config; effective value comes from {SSHD_CRYPTO_POLICY_FILE}"
+                    evidence_command = f"sshd -T | grep -i {parameter}"
+                elif weak:
+                    status = "FAIL"
+                    result_msg = f"{parameter} = {actual_value} (weak: {', '.join(weak)})"
+                else:
+                    status = "PASS"
+                    result_msg = f"{parameter} = {actual_value}"
+            elif actual_value is None:
+                status = "FAIL"
+                result_msg = f"{parameter} not set"
+            elif expected_value == '*' or actual_value.lower() == expected_value.lower():
+                status = "PASS"
+                result_msg = f"{parameter} = {actual_value}"
+            else:
+                status = "FAIL"
+                result_msg = f"{parameter} = {actual_value} (expected: {expected_value})"
+            
+            return {
+                "status": status,
+                "actual_value": result_msg,
+                "evidence_command": evidence_command,
+                "description": f"SSH daemon parameter {parameter} check ({source})"
+            }
+        except Exception as e:
+            return {
+                "status": "ERROR",
+                "actual_value": "Error checking SSH configuration",
+                "evidence_command": f"sshd -T | grep -i {parameter}",
+                "description": str(e)
+            }
+    
+    def check_sudo_config(self, parameter: str, expected_value: str) -> Dict[str, Any]:
+        """Check a sudoers Defaults setting: a flag that must be 'enabled', one that must be
+        'not_found' (e.g. !authenticate), or a value (e.g. logfile)"""
+        evidence_command = f"grep -Ei '^\\s*Defaults' {SUDOERS_FILE} {SUDOERS_DIR}/*"
+        try:
+            if not self.context.exists(SUDOERS_FILE):
+                return {
+                    "status": "FAIL",
+                    "actual_value": "sudoers file not found",
+                    "evidence_command": evidence_command,
+                    "description": f"{SUDOERS_FILE} does not exist"
+                }
+            
+            files = [SUDOERS_FILE] + [path for path in self.context.glob(f"{SUDOERS_DIR}/*")
+                                      if '.' not in os.path.basename(path) and not path.endswith('~')]
+            settings = []
+            for path in files:
+                settings.extend(parse_sudoers_defaults(self.context.read_file(path)))
+            name = parameter.lstrip('!')
+            # The last Defaults entry for a setting is the one sudo applies
+            entries = [(setting, value) for setting, value in settings if setting.lstrip('!') == name]
+            
+            if expected_value == 'not_found':
+                found = [setting for setting, _ in entries if setting == parameter]
+                status = "FAIL" if found else "PASS"
+                actual_value = f"Defaults {parameter} is set" if found else f"Defaults {parameter} not set"
+            elif expected_value == 'enabled':
+                status = "PASS" if entries and not entries[-1][0].startswith('!') else "FAIL"
+                actual_value = f"Defaults {entries[-1][0]}" if entries else f"Defaults {parameter} not set"
+            else:
+                value = entries[-1][1] if entries else None
+                status = "PASS" if value == expected_value else "FAIL"
+                actual_value = f"Defaults {parameter}={value}" if value is not None else f"Defaults {parameter} not set"
+            
+            return {
+                "status": status,
+                "actual_value": actual_value,
+                "evidence_command": evidence_command,
+                "description": f"sudo Defaults {parameter} (expected: {expected_value}) in {len(files)} sudoers files"
+            }
+        except Exception as e:
+            return {
+                "status": "ERROR",
+                "actual_value": "Error checking sudo configuration",
+                "evidence_command": evidence_command,
+                "description": str(e)
+            }
+    
+    def check_file_exists(self, file_path: str) -> Dict[str, Any]:
+        """Check that a file exists"""
+        try:
+            if not self._validate_path(file_path):
+                return {
+                    "status": "ERROR",
+                    "actual_value": "Invalid file path",
+                    "evidence_command": f"ls -l {file_path}",
+                    "description": "File path validation failed"
+                }
+            
+            if self.context.exists(file_path):
+                status = "PASS"
+                actual_value = "File exists"
+            else:
+                status = "FAIL"
+                actual_value = "File does not exist"
+            
+            return {
+                "status": status,
+                "actual_value": actual_value,
+                "evidence_command": f"ls -l {file_path}",
+                "description": f"File {file_path} check"
+            }
+        except Exception as e:
+            return {
+                "status": "ERROR",
+                "actual_value": "Error checking file",
+                "evidence_command": f"ls -l {file_path}",
+                "description": str(e)
+            }
+    
     def check_file_permissions(self, file_path: str, expected_mode: str = None, expected_owner: str = None, expected_group: str = None) -> Dict[str, Any]:
         """Check file permissions, owner, and group"""
         try:
@@ -382,7 +2434,7 @@ class RHEL8CISScanner:
                     "description": "File path validation failed"
                 }
             
-            if not os.path.exists(file_path):
+            if not self.context.exists(file_path):
                 return {
                     "status": "FAIL",
                     "actual_value": "File does not exist",
@@ -424,6 +2476,27 @@ class RHEL8CISScanner:
                 "description": str(e)
             }
     
+    def _grep_file(self, file_path: str, pattern: str) -> Tuple[str, int]:
+        """Output and exit status `grep -Pi -- pattern file_path` would give, without forking grep"""
+        regex = compile_pcre(pattern)
+        files = expand_shell_path(file_path, self.context.glob)
+        if files is None:
+            return "", 2
+        
+        matches, failed = [], False
+        for path in files:
+            try:
+                lines = self.context.read_file(path).split('\n')
+            except OSError:
+                failed = True
+                continue
+            if lines and lines[-1] == '':
+                lines.pop()
+            prefix = f"{path}:" if len(files) > 1 else ""
+            matches.extend(prefix + line for line in lines if regex.search(line))
+        # Like grep, an unreadable file makes the exit status 2 even if others matched
+        return "\n".join(matches), 2 if failed else (0 if matches else 1)
+    
     def check_file_content(self, file_path: str, pattern: str, expected_result: str) -> Dict[str, Any]:
         """Check file content using grep pattern"""
         try:
@@ -443,7 +2516,7 @@ class RHEL8CISScanner:
                     "description": "File path validation failed"
                 }
             
-            stdout, stderr, returncode = self._run_command(f"grep -Pi -- '{pattern}' {file_path}")
+            stdout, returncode = self._grep_file(file_path, pattern)
             
             if expected_result == "found":
                 if returncode == 0 and stdout.strip():
@@ -477,21 +2550,115 @@ class RHEL8CISScanner:
                 "description": str(e)
             }
     
-    def load_milestone(self, milestone_file: str) -> List[Dict[str, Any]]:
-        """Load controls from milestone file"""
-        milestone_path = self.milestones_dir / milestone_file
+    def check_command_output_empty(self, audit_command: str) -> Dict[str, Any]:
+        """Check that an audit command prints nothing (see parse_audit_command for what it may run)"""
+        try:
+            stdout, stderr, returncode = self.context.audit_command(audit_command)
+        except ValueError as e:
+            return {
+                "status": "MANUAL",
+                "actual_value": f"Audit command not run: {e}",
+                "evidence_command": audit_command
+            }
+        except subprocess.TimeoutExpired:
+            return {
+                "status": "ERROR",
+                "actual_value": f"Audit command timed out after {AUDIT_COMMAND_TIMEOUT}s",
+                "evidence_command": audit_command
+            }
+        except OSError as e:
+            return {
+                "status": "ERROR",
+                "actual_value": f"Could not run audit command: {e.filename or ''} {e.strerror or e}".strip(),
+                "evidence_command": audit_command
+            }
         
-        if not milestone_path.exists():
-            print(f"Warning: Milestone file {milestone_file} not found")
-            return []
+        lines = [line for line in stdout.splitlines() if line.strip()]
+        errors = [line for line in stderr.splitlines() if line.strip()]
+        if not lines and errors:
+            # A failing first stage leaves nothing for the rest of the pipeline to print
+            return {
+                "status": "ERROR",
+                "actual_value": f"Audit command failed (exit status {returncode}): {errors[0]}",
+                "evidence_command": audit_command
+            }
         
+        if not lines:
+            return {
+                "status": "PASS",
+                "actual_value": "No output (as expected)",
+                "evidence_command": audit_command
+            }
+        return {
+            "status": "FAIL",
+            "actual_value": f"Found {len(lines)} line(s): {'; '.join(lines[:AUDIT_OUTPUT_LINES])}{'...' if len(lines) > AUDIT_OUTPUT_LINES else ''}",
+            "evidence_command": audit_command
+        }
+    
+    def milestone_bundle(self) -> MilestoneBundle:
+        """Compiled milestones, recompiled first if the milestone files changed"""
+        if self.bundle is None:
+            self.bundle = load_milestone_bundle(self.milestones_dir, [
+                self.milestones_dir.parent / MILESTONE_BUNDLE_FILE, self.output_dir / MILESTONE_BUNDLE_FILE])
+        return self.bundle
+    
+    def close_milestone_bundle(self) -> None:
+        """Close the bundle once reports are written (it is reopened if needed again)"""
+        if self.bundle is not None:
+            self.bundle.close()
+            self.bundle = None
+    
+    def load_milestone(self, milestone_file: str) -> List[Dict[str, Any]]:
+        """Load controls from milestone file (execution fields only, see narrative())"""
         try:
-            with open(milestone_path, 'r') as f:
-                milestone_data = json.load(f)
-            return milestone_data.get('controls', [])
+            bundle = self.milestone_bundle()
         except Exception as e:
             print(f"Error loading milestone {milestone_file}: {e}")
             return []
+        controls = bundle.controls(milestone_file)
+        if controls is None:
+            if bundle.error(milestone_file) is not None:
+                print(f"Error loading milestone {milestone_file}: {bundle.error(milestone_file)}")
+            else:
+                print(f"Warning: Milestone file {milestone_file} not found")
+            return []
+        
+        # Resolve every control's check and translate and compile FileContent
+        # patterns up front; bad patterns are reported by the check
+        unresolved = {}
+        for control in controls:
+            method, _, _ = self.control_check(control)
+            control_type = control.get('type', 'Manual')
+            if method is None and control_type != 'Manual':
+                unresolved.setdefault(control_type, []).append(control.get('id', 'Unknown'))
+            if control_type == 'FileContent' and control.get('pattern'):
+                try:
+                    compile_pcre(control['pattern'])
+                except re.error:
+                    pass
+        for control_type, control_ids in unresolved.items():
+            print(f"Warning: {milestone_file}: no check for control type {control_type} "
+                  f"({', '.join(control_ids)}), reported as MANUAL")
+        return controls
+    
+    def control_check(self, control: Dict[str, Any]) -> Tuple[Optional[str], tuple, tuple]:
+        """resolve_check(control), resolved once per control"""
+        entry = self.checks.get(id(control))
+        if entry is None or entry[0] is not control:
+            entry = self.checks[id(control)] = (control,) + resolve_check(control)
+        return entry[1:]
+    
+    def narrative(self, milestone_file: Optional[str], control_id: str) -> Dict[str, Any]:
+        """Narrative fields of a control (description, remediation, ...), read from the bundle when needed"""
+        if milestone_file is None:
+            return {}
+        return self.milestone_bundle().narrative(milestone_file, control_id)
+    
+    def _report_field(self, result: Dict[str, Any], field: str, default: str = '') -> str:
+        """A narrative field for the reports: what the check reported, else the control's own text"""
+        if field in result:
+            return result[field]
+        return self.narrative(result.get('milestone'), result['id']).get(field, default)
     
     def execute_control(self, control: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single CIS control"""
@@ -503,8 +2670,6 @@ class RHEL8CISScanner:
             "title": control.get('title', ''),
             "section": control.get('section', ''),
             "cis_reference": control.get('cis_reference', ''),
-            "remediation": control.get('remediation', 'Refer to CIS Benchmark documentation'),
-            "description": control.get('description', ''),
             "profile": control.get('profile', 'Level1'),
             "status": "MANUAL",
             "actual_value": "",
@@ -517,49 +2682,9 @@ class RHEL8CISScanner:
             return result
         
         try:
-            if control_type == "KernelModule":
-                check_result = self.check_kernel_module(
-                    control.get('module_name', ''),
-                    control.get('expected_status', '')
-                )
-            elif control_type == "MountPoint":
-                check_result = self.check_mount_point(
-                    control.get('mount_point', ''),
-                    control.get('expected_status', '')
-                )
-            elif control_type == "MountOption":
-                check_result = self.check_mount_option(
-                    control.get('mount_point', ''),
-                    control.get('required_option', '')
-                )
-            elif control_type == "ServiceStatus":
-                check_result = self.check_service_status(
-                    control.get('service_name', ''),
-                    control.get('expected_status', '')
-                )
-            elif control_type == "PackageInstalled":
-                check_result = self.check_package_installed(
-                    control.get('package_name', ''),
-                    control.get('expected_status', '')
-                )
-            elif control_type == "FileContent":
-                check_result = self.check_file_content(
-                    control.get('file_path', ''),
-                    control.get('pattern', ''),
-                    control.get('expected_result', '')
-                )
-            elif control_type == "SysctlParameter":
-                check_result = self.check_sysctl_parameter(
-                    control.get('parameter', ''),
-                    control.get('expected_value', '')
-                )
-            elif control_type == "FilePermissions":
-                check_result = self.check_file_permissions(
-                    control.get('file_path', ''),
-                    control.get('expected_mode', None),
-                    control.get('expected_owner', None),
-                    control.get('expected_group', None)
-                )
+            method, args, _ = self.control_check(control)
+            if method is not None:
+                check_result = getattr(self, method)(*args)
             elif control_type == "Manual" or control_type == "ServiceConfig" or control_type == "ServiceUser":
                 check_result = {
                     "status": "MANUAL",
@@ -583,11 +2708,256 @@ class RHEL8CISScanner:
         
         return result
     
+    def _incremental_config(self) -> Dict[str, Any]:
+        """Settings an incremental state must have been recorded with to be reused"""
+        with open(__file__, 'rb') as f:
+            scanner_digest = hashlib.sha256(f.read()).hexdigest()
+        return {"scanner": scanner_digest, "profile": self.profile}
+    
+    def _load_incremental_state(self) -> None:
+        """Load the previous run's state, or start a full scan if it is missing, stale or incompatible"""
+        self._previous_state = {}
+        self._next_state = {}
+        self._reused = set()
+        self._full_scan_at = datetime.datetime.now().timestamp()
+        if not self.incremental:
+            return
+        
+        try:
+            with open(self.output_dir / INCREMENTAL_STATE_FILE, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        if (state.get("version") != INCREMENTAL_STATE_VERSION or state.get("config") != self._incremental_config()
+                or self._full_scan_at - state.get("full_scan_at", 0) > INCREMENTAL_MAX_AGE):
+            return
+        self._previous_state = state.get("controls", {})
+        self._next_state = dict(self._previous_state)
+        self._full_scan_at = state["full_scan_at"]
+    
+    def _save_incremental_state(self) -> None:
+        """Write the control results and input fingerprints for the next --incremental run"""
+        state = {
+            "version": INCREMENTAL_STATE_VERSION,
+            "config": self._incremental_config(),
+            "full_scan_at": self._full_scan_at,
+            "controls": self._next_state,
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        state_path = self.output_dir / INCREMENTAL_STATE_FILE
+        temp_path = state_path.with_name(state_path.name + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, state_path)
+    
+    def _evaluate_control(self, milestone_file: str, control: Dict[str, Any]) -> Dict[str, Any]:
+        """execute_control, recording its inputs and, with --incremental, reusing unchanged results"""
+        state_key = f"{milestone_file}:{control.get('id', 'Unknown')}"
+        if not self.incremental:
+            result, inputs = self.context.record_inputs(self.execute_control, control)
+            self._control_inputs[state_key] = (milestone_file, control, inputs)
+            return result
+        
+        control_digest = stable_digest(control)
+        previous = self._previous_state.get(state_key)
+        if (previous and previous["control"] == control_digest and previous["inputs"]
+                and all(self._input_unchanged(key, digest) for key, digest in previous["inputs"])):
+            self._reused.add(state_key)
+            inputs = set(fact_key_from_json(key) for key, _ in previous["inputs"])
+            self._control_inputs[state_key] = (milestone_file, control, inputs)
+            return previous["result"]
+        
+        result, inputs = self.context.record_inputs(self.execute_control, control)
+        self._control_inputs[state_key] = (milestone_file, control, inputs)
+        fingerprints = []
+        if control.get('type', 'Manual') in INCREMENTAL_CONTROL_TYPES:
+            fingerprints = [[key, self.context.fingerprint(key)] for key in inputs]
+        # An input that cannot be fingerprinted cannot be compared next run either
+        if fingerprints and all(digest is not None for _, digest in fingerprints):
+            self._next_state[state_key] = {
+                "control": control_digest,
+                "result": result,
+                "inputs": fingerprints,
+            }
+        else:
+            self._next_state.pop(state_key, None)
+        return result
+    
+    def _input_unchanged(self, key: Any, digest: Optional[str]) -> bool:
+        """Whether a recorded input still has its fingerprint (one that cannot be taken counts as changed)"""
+        current = self.context.fingerprint(fact_key_from_json(key))
+        return current is not None and current == digest
+    
+    def watch(self, milestone_files: List[str] = None, interval: int = WATCH_INTERVAL,
+              drift_log: str = None, on_change=None) -> None:
+        """Scan once, then re-evaluate controls as their inputs change and log status drift
+        
+        Files, package databases, modprobe.d and systemd unit directories read by
+        a control are watched with inotify; controls that also depend on runtime
+        state are re-checked every `interval` seconds. Every status change is
+        appended to drift_log as one JSON object per line. on_change() is called
+        after each batch that changed a status. Runs until interrupted.
+        """
+        self.scan_milestones(milestone_files)
+        if on_change is not None:
+            on_change()
+        
+        drift_path = Path(drift_log) if drift_log else self.output_dir / DRIFT_LOG_FILE
+        watcher = InotifyWatcher()
+        print(f"👀 Watching {len(self._control_inputs)} controls, drift events: {drift_path}")
+        
+        try:
+            file_interest, dir_interest, polled = self._arm_watches(watcher)
+            next_poll = time.monotonic() + interval
+            while True:
+                changed = watcher.read(next_poll - time.monotonic())
+                if changed:
+                    # Let a burst of writes settle before re-checking
+                    while True:
+                        more = watcher.read(WATCH_DEBOUNCE)
+                        if not more:
+                            break
+                        changed.extend(more)
+                    if more is None:
+                        changed = None
+                
+                if changed is None:
+                    affected = set(self._control_inputs)
+                else:
+                    affected = set()
+                    for path in changed:
+                        affected |= file_interest.get(path, set())
+                        affected |= dir_interest.get(os.path.dirname(path), set())
+                        affected |= dir_interest.get(path, set())
+                if time.monotonic() >= next_poll:
+                    affected |= polled
+                    next_poll = time.monotonic() + interval
+                if not affected:
+                    continue
+                
+                if self._reevaluate(affected, drift_path) and on_change is not None:
+                    on_change()
+                file_interest, dir_interest, polled = self._arm_watches(watcher)
+        finally:
+            watcher.close()
+    
+    def _arm_watches(self, watcher: InotifyWatcher) -> Tuple[Dict[str, set], Dict[str, set], set]:
+        """Map watched paths to the controls that read them and make sure each directory is watched"""
+        file_interest, dir_interest, polled = {}, {}, set()
+        for state_key, (milestone_file, control, inputs) in self._control_inputs.items():
+            for key in inputs:
+                files, dirs, needs_polling = watch_targets(key)
+                for path in files:
+                    file_interest.setdefault(path, set()).add(state_key)
+                    watcher.add_directory(os.path.dirname(path))
+                for path in dirs:
+                    dir_interest.setdefault(path, set()).add(state_key)
+                    if not watcher.add_directory(path):
+                        # Not there yet: watch the parent so its creation is noticed
+                        dir_interest.setdefault(os.path.dirname(path), set()).add(state_key)
+                        watcher.add_directory(os.path.dirname(path))
+                if needs_polling:
+                    polled.add(state_key)
+        return file_interest, dir_interest, polled
+    
+    def _reevaluate(self, state_keys: set, drift_path: Path) -> bool:
+        """Re-run the given controls on a fresh snapshot and log those whose status changed"""
+        self.context = ScanContext(self._run_command, self.profiler, self.throttle, self._run_audit_command)
+        drifted = False
+        replacements = {}
+        for state_key in [key for key in self._control_inputs if key in state_keys]:
+            milestone_file, control, _ = self._control_inputs[state_key]
+            result = self._evaluate_control(milestone_file, control)
+            old_status = self._result_status[state_key]
+            self._result_status[state_key] = result["status"]
+            replacements[state_key] = result
+            if result["status"] == old_status:
+                continue
+            
+            drifted = True
+            event = {
+                "timestamp": datetime.datetime.now().isoformat(),
+                "hostname": self.system_info['hostname'],
+                "milestone": milestone_file,
+                "control": result["id"],
+                "title": result["title"],
+                "old_status": old_status,
+                "new_status": result["status"],
+                "evidence": result.get("evidence", result.get("actual_value", "")),
+            }
+            drift_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(drift_path, 'a') as f:
+                f.write(json.dumps(event) + '\n')
+            print(f"⚡ {result['id']}: {old_status} -> {result['status']}", flush=True)
+        
+        if drifted:
+            self.results.update(replacements)
+        if self.incremental:
+            self._save_incremental_state()
+        return drifted
+    
+    def prefetch(self, milestone_files: List[str], executor: Executor, methods: Optional[Tuple[str, ...]] = None) -> None:
+        """Queue the facts declared by the controls about to run (see CONTROL_CHECKS) on the pool
+        
+        Submitted ahead of the controls, so distinct facts (package index,
+        unit states, kernel module index, mount table, audit commands...) load
+        side by side instead of one at a time as workers first ask for them.
+        methods limits this to some ScanContext methods. Failures are left for
+        the check reading the fact to report.
+        """
+        try:
+            bundle = self.milestone_bundle()
+        except Exception:
+            # load_milestone reports it
+            return
+        wanted = {}
+        for milestone_file in milestone_files:
+            for control in bundle.controls(milestone_file) or []:
+                if self.profile == "Level1" and control.get('profile') == "Level2":
+                    continue
+                for fact in self.control_check(control)[2]:
+                    if methods is None or fact[0] in methods:
+                        wanted.setdefault(fact, None)
+        
+        def gather(method, value):
+            try:
+                if value is None:
+                    getattr(self.context, method)()
+                else:
+                    getattr(self.context, method)(value)
+            except Exception:
+                pass
+        
+        for method, value in wanted:
+            executor.submit(gather, method, value)
+    
+    def _measured_control(self, milestone_file: str, control: Dict[str, Any]) -> Dict[str, Any]:
+        """_evaluate_control, with its cost recorded when --profile-scan is on"""
+        if self.profiler is None:
+            return self._evaluate_control(milestone_file, control)
+        return self.profiler.measure(milestone_file, control, self._evaluate_control, milestone_file, control)
+    
+    def _execute_controls(self, milestone_file: str, controls: List[Dict[str, Any]],
+                          executor: Optional[Executor] = None) -> Iterator[Dict[str, Any]]:
+        """Execute controls, optionally on a worker pool, in input order"""
+        if executor is None:
+            for control in controls:
+                yield self._measured_control(milestone_file, control)
+            return
+        
+        futures = [executor.submit(self._measured_control, milestone_file, control) for control in controls]
+        for future in futures:
+            yield future.result()
+    
     def scan_milestones(self, milestone_files: List[str] = None) -> None:
         """Scan milestone files"""
         if milestone_files is None:
             milestone_files = sorted([f for f in os.listdir(self.milestones_dir) if f.endswith('.json')])
         
+        self.context = ScanContext(self._run_command, self.profiler, self.throttle, self._run_audit_command)
+        self._load_incremental_state()
+        
         GREEN = '\033[92m'
         BLUE = '\033[94m'
         YELLOW = '\033[93m'
@@ -611,30 +2981,58 @@ class RHEL8CISScanner:
         print(f"{BLUE}📁 Milestones:{RESET} {CYAN}{len(milestone_files)}{RESET}")
         print(f"{CYAN}─" * 60 + f"{RESET}")
         
-        for milestone_file in milestone_files:
-            print(f"{BOLD}{BLUE}📄 Processing {milestone_file}...{RESET}")
-            controls = self.load_milestone(milestone_file)
-            
-            for control in controls:
-                result = self.execute_control(control)
-                self.results.append(result)
-                
-                if result["status"] == "PASS":
-                    status_symbol = f"{GREEN}✓{RESET}"
-                elif result["status"] == "FAIL":
-                    status_symbol = f"{RED}✗{RESET}"
-                elif result["status"] == "MANUAL":
-                    status_symbol = f"{YELLOW}⚠{RESET}"
-                else:
-                    status_symbol = f"{CYAN}?{RESET}"
+        # Independent controls run on a shared thread pool when --jobs > 1;
+        # results are consumed in milestone order so output stays deterministic
+        executor = ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        audit_executor = None
+        # With --profile-scan, facts stay charged to the first control reading them
+        if executor is not None and self.profiler is None:
+            self.prefetch(milestone_files, executor)
+        elif self.profiler is None and self.throttle is None:
+            # Audit commands are independent of each other, so they run side by side even without --jobs
+            audit_executor = ThreadPoolExecutor(max_workers=AUDIT_COMMAND_WORKERS)
+            self.prefetch(milestone_files, audit_executor, ('audit_command',))
+        
+        self.results.open()
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            for milestone_file in milestone_files:
+                print(f"{BOLD}{BLUE}📄 Processing {milestone_file}...{RESET}")
+                controls = self.load_milestone(milestone_file)
                 
-                print(f"  {status_symbol} {CYAN}{result['id']}{RESET}: {result['title'][:50]}...")
+                for result in self._execute_controls(milestone_file, controls, executor):
+                    self.results.write(milestone_file, result)
+                    self._result_status[f"{milestone_file}:{result['id']}"] = result["status"]
+                    
+                    if result["status"] == "PASS":
+                        status_symbol = f"{GREEN}✓{RESET}"
+                    elif result["status"] == "FAIL":
+                        status_symbol = f"{RED}✗{RESET}"
+                    elif result["status"] == "MANUAL":
+                        status_symbol = f"{YELLOW}⚠{RESET}"
+                    else:
+                        status_symbol = f"{CYAN}?{RESET}"
+                    
+                    print(f"  {status_symbol} {CYAN}{result['id']}{RESET}: {result['title'][:50]}...")
+        finally:
+            self.results.close()
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if audit_executor is not None:
+                audit_executor.shutdown(wait=True)
+        
+        if self.profiler is not None:
+            self.profiler.stop()
+        
+        if self.incremental:
+            self._save_incremental_state()
         
         print(f"{CYAN}─" * 60 + f"{RESET}")
         
-        pass_count = sum(1 for r in self.results if r["status"] == "PASS")
-        fail_count = sum(1 for r in self.results if r["status"] == "FAIL")
-        manual_count = sum(1 for r in self.results if r["status"] == "MANUAL")
+        pass_count = self.results.counts.get("PASS", 0)
+        fail_count = self.results.counts.get("FAIL", 0)
+        manual_count = self.results.counts.get("MANUAL", 0)
         
         success_rate = round((pass_count / len(self.results)) * 100, 1) if self.results else 0
         
@@ -647,9 +3045,88 @@ class RHEL8CISScanner:
         print(f"Failed: {RED}{fail_count}{RESET}")
         print(f"Manual: {YELLOW}{manual_count}{RESET}")
         print(f"Success Rate: {YELLOW}{success_rate}%{RESET}")
+        if self.incremental:
+            print(f"Reused: {CYAN}{len(self._reused)}{RESET} unchanged results")
+        if self.throttle is not None:
+            print(f"Throttled: {CYAN}{self.throttle.throttled:.1f}s{RESET} waiting for load to drop")
         print(f"{CYAN}============================================================={RESET}")
         print()
     
+    def generate_profile_report(self) -> str:
+        """Write the --profile-scan timing table and a summary of where scan time went"""
+        import csv
+        
+        records = sorted(self.profiler.records, key=lambda r: r["wall_time"], reverse=True)
+        
+        with open(self.output_dir / PROFILE_CSV_FILE, 'w', newline='') as csvfile:
+            fieldnames = ['Id', 'Milestone', 'Type', 'WallTime', 'CpuTime', 'SubprocessTime', 'Subprocesses', 'BytesRead', 'Commands']
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            
+            writer.writeheader()
+            for r in records:
+                writer.writerow({
+                    'Id': r['id'],
+                    'Milestone': r['milestone'],
+                    'Type': r['type'],
+                    'WallTime': f"{r['wall_time']:.6f}",
+                    'CpuTime': f"{r['cpu_time']:.6f}",
+                    'SubprocessTime': f"{r['subprocess_time']:.6f}",
+                    'Subprocesses': r['subprocesses'],
+                    'BytesRead': r['bytes_read'],
+                    'Commands': '; '.join(command for command, _ in r['commands']),
+                })
+        
+        wall_total = sum(r["wall_time"] for r in records)
+        subprocess_total = sum(r["subprocess_time"] for r in records)
+        python_total = max(0.0, wall_total - subprocess_total)
+        
+        def share(seconds):
+            return f"{seconds:.3f}s ({round(seconds / wall_total * 100, 1) if wall_total else 0}%)"
+        
+        by_type = {}
+        for r in records:
+            entry = by_type.setdefault(r["type"], {"controls": 0, "wall": 0.0, "max": 0.0, "subprocesses": 0})
+            entry["controls"] += 1
+            entry["wall"] += r["wall_time"]
+            entry["max"] = max(entry["max"], r["wall_time"])
+            entry["subprocesses"] += r["subprocesses"]
+        
+        commands = sorted(((elapsed, command, r["id"]) for r in records for command, elapsed in r["commands"]), reverse=True)
+        
+        lines = [
+            f"Vijenex CIS scan profile - {self.system_info['hostname']} - {self.system_info['scan_date']}",
+            "",
+            f"Controls:              {len(records)}",
+            f"Scan elapsed time:     {self.profiler.elapsed:.3f}s (jobs: {self.jobs})",
+            f"Control time:          {wall_total:.3f}s",
+            f"  in subprocesses:     {share(subprocess_total)}",
+            f"  in Python:           {share(python_total)}",
+            f"Python CPU time:       {sum(r['cpu_time'] for r in records):.3f}s",
+            f"Subprocesses spawned:  {sum(r['subprocesses'] for r in records)}",
+            f"Bytes read:            {sum(r['bytes_read'] for r in records)}",
+            "",
+            f"Slowest controls (top {PROFILE_TOP})",
+            f"{'Wall(s)':>9} {'CPU(s)':>9} {'Subproc(s)':>10} {'Procs':>5} {'Bytes':>9}  {'Id':<12} Type",
+        ]
+        for r in records[:PROFILE_TOP]:
+            lines.append(f"{r['wall_time']:9.4f} {r['cpu_time']:9.4f} {r['subprocess_time']:10.4f} {r['subprocesses']:5d} "
+                         f"{r['bytes_read']:9d}  {r['id']:<12} {r['type']}")
+        
+        lines += ["", "Slowest check types", f"{'Total(s)':>9} {'Mean(s)':>9} {'Max(s)':>9} {'Controls':>8} {'Procs':>5}  Type"]
+        for check_type, entry in sorted(by_type.items(), key=lambda item: item[1]["wall"], reverse=True):
+            lines.append(f"{entry['wall']:9.4f} {entry['wall'] / entry['controls']:9.4f} {entry['max']:9.4f} "
+                         f"{entry['controls']:8d} {entry['subprocesses']:5d}  {check_type}")
+        
+        lines += ["", f"Slowest commands (top {PROFILE_TOP})", f"{'Wall(s)':>9}  {'Control':<12} Command"]
+        for elapsed, command, control_id in commands[:PROFILE_TOP]:
+            lines.append(f"{elapsed:9.4f}  {control_id:<12} {command}")
+        
+        report_path = self.output_dir / PROFILE_REPORT_FILE
+        with open(report_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        
+        return str(report_path)
+    
     def generate_csv_report(self) -> str:
         """Generate CSV report"""
         import csv
@@ -668,18 +3145,18 @@ class RHEL8CISScanner:
                     'Section': result['section'],
                     'Status': result['status'],
                     'CISReference': result.get('cis_reference', 'Refer to CIS Benchmark documentation'),
-                    'Remediation': result.get('remediation', 'Refer to CIS Benchmark documentation'),
-                    'Description': result.get('description', 'Security control verification')
+                    'Remediation': self._report_field(result, 'remediation', 'Refer to CIS Benchmark documentation'),
+                    'Description': self._report_field(result, 'description', 'Security control verification')
                 })
         
         return str(report_path)
     
     def generate_html_report(self) -> str:
         """Generate HTML report"""
-        pass_count = sum(1 for r in self.results if r["status"] == "PASS")
-        fail_count = sum(1 for r in self.results if r["status"] == "FAIL")
-        manual_count = sum(1 for r in self.results if r["status"] == "MANUAL")
-        skipped_count = sum(1 for r in self.results if r["status"] == "SKIPPED")
+        pass_count = self.results.counts.get("PASS", 0)
+        fail_count = self.results.counts.get("FAIL", 0)
+        manual_count = self.results.counts.get("MANUAL", 0)
+        skipped_count = self.results.counts.get("SKIPPED", 0)
         
         # Calculate severity breakdown for failures
         severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0, "unknown": 0}
@@ -869,7 +3346,7 @@ class RHEL8CISScanner:
                     </div>
                     <div class="detail-section">
                         <div class="detail-label">Description</div>
-                        <div class="detail-content">{result.get('description', 'N/A')}</div>
+                        <div class="detail-content">{self._report_field(result, 'description')}</div>
                     </div>"""
             
             if result['status'] == 'FAIL':
@@ -880,7 +3357,7 @@ class RHEL8CISScanner:
                     </div>
                     <div class="detail-section">
                         <div class="detail-label">Remediation</div>
-                        <div class="remediation-box">{result.get('remediation', 'Refer to CIS Benchmark documentation')}</div>
+                        <div class="remediation-box">{self._report_field(result, 'remediation', 'Refer to CIS Benchmark documentation')}</div>
                     </div>"""
             
             if has_warning:
@@ -920,9 +3397,44 @@ def main():
     parser.add_argument('--milestones', nargs='+', help='Specific milestone files to scan')
     parser.add_argument('--format', choices=['html', 'csv', 'both'], default='both', help='Report format')
     parser.add_argument('--read-only', action='store_true', help='Read-only mode (safe for production)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of controls to execute in parallel (default: 1)')
+    parser.add_argument('--incremental', action='store_true', help='Re-evaluate only controls whose inputs changed since the last run')
+    parser.add_argument('--watch', action='store_true', help='Keep running and re-check controls when their inputs change, logging drift as JSON Lines')
+    parser.add_argument('--watch-interval', type=int, default=WATCH_INTERVAL,
+                        help=f'Seconds between re-checks of controls that depend on runtime state in --watch mode (default: {WATCH_INTERVAL})')
+    parser.add_argument('--profile-scan', action='store_true', help='Write per-control timing and subprocess statistics next to the reports')
+    parser.add_argument('--low-impact', action='store_true',
+                        help='Run commands at idle IO and lowest CPU priority, pausing find walks while the host is busy')
+    parser.add_argument('--max-load', type=float, default=LOW_IMPACT_MAX_LOAD,
+                        help=f'--low-impact: 1-minute load average per CPU above which walks pause (default: {LOW_IMPACT_MAX_LOAD})')
+    parser.add_argument('--max-io-util', type=float, default=LOW_IMPACT_MAX_IO_UTIL,
+                        help=f'--low-impact: busiest-disk utilisation percent above which walks pause (default: {LOW_IMPACT_MAX_IO_UTIL})')
+    parser.add_argument('--compile-milestones', action='store_true',
+                        help=f'Validate the milestones and compile them into {MILESTONE_BUNDLE_FILE}, then exit')
+    parser.add_argument('--drift-log', help=f'Drift event log for --watch (default: <output-dir>/{DRIFT_LOG_FILE})')
     
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.watch_interval < 1:
+        parser.error("--watch-interval must be at least 1")
+    if args.max_load <= 0 or args.max_io_util <= 0:
+        parser.error("--max-load and --max-io-util must be positive")
+    
+    if args.compile_milestones:
+        milestones_dir = Path(__file__).parent.parent / "milestones"
+        stamps, sources = milestone_sources(milestones_dir)
+        header, data, problems = compile_milestones(stamps, sources)
+        for problem in problems:
+            print(f"Error: milestone {problem}")
+        if problems:
+            sys.exit(1)
+        bundle_path = milestones_dir.parent / MILESTONE_BUNDLE_FILE
+        write_milestone_bundle(bundle_path, header, data)
+        print(f"Compiled {len(sources)} milestones into {bundle_path}")
+        return
+    
     if args.read_only:
         print("\n⚠️  READ-ONLY MODE: Scanner will only read system state, no changes will be made.\n")
     
@@ -931,23 +3443,41 @@ def main():
         print("For complete scanning, run with: sudo vijenex-cis")
         print()
     
-    scanner = RHEL8CISScanner(args.output_dir, args.profile)
-    scanner.scan_milestones(args.milestones)
+    scanner = RHEL8CISScanner(args.output_dir, args.profile, args.jobs, args.incremental, args.profile_scan,
+                              args.low_impact, args.max_load, args.max_io_util)
     
     GREEN = '\033[92m'
     BLUE = '\033[94m'
     BOLD = '\033[1m'
     RESET = '\033[0m'
     
-    print(f"\n{BOLD}{BLUE}📊 Generating reports...{RESET}")
+    def write_reports():
+        print(f"\n{BOLD}{BLUE}📊 Generating reports...{RESET}")
+        
+        if args.format in ['html', 'both']:
+            html_report = scanner.generate_html_report()
+            print(f"{GREEN}📄 HTML report:{RESET} {html_report}")
+        
+        if args.format in ['csv', 'both']:
+            csv_report = scanner.generate_csv_report()
+            print(f"{GREEN}📊 CSV report:{RESET} {csv_report}")
+        
+        if args.profile_scan:
+            profile_report = scanner.generate_profile_report()
+            print(f"{GREEN}⏱️  Profile report:{RESET} {profile_report}")
     
-    if args.format in ['html', 'both']:
-        html_report = scanner.generate_html_report()
-        print(f"{GREEN}📄 HTML report:{RESET} {html_report}")
+    if args.watch:
+        try:
+            scanner.watch(args.milestones, args.watch_interval, args.drift_log, on_change=write_reports)
+        except KeyboardInterrupt:
+            print(f"\n{BOLD}{GREEN}Watch stopped{RESET}")
+        finally:
+            scanner.close_milestone_bundle()
+        return
     
-    if args.format in ['csv', 'both']:
-        csv_report = scanner.generate_csv_report()
-        print(f"{GREEN}📊 CSV report:{RESET} {csv_report}")
+    scanner.scan_milestones(args.milestones)
+    write_reports()
+    scanner.close_milestone_bundle()
     
     print(f"\n{BOLD}{GREEN}🎉 Vijenex CIS scan completed successfully!{RESET}")
 
@@ -0,0 +1,34 @@
+"""parse_audit_command on RHEL: firewall-cmd and the other firewall tools may only query"""
+
+import pytest
+
+
+@pytest.mark.parametrize('command', [
+    "firewall-cmd --state",
+    "firewall-cmd --get-active-zones",
+    "firewall-cmd --list-all --zone=public",
+    "firewall-cmd --permanent --query-service=ssh",
+    "nft list ruleset",
+    "iptables -L INPUT -v -n",
+    "find / -xdev -perm -0002 -type f 2>/dev/null | head -n 20",
+])
+def test_queries_are_accepted(cis, command):
+    cis.parse_audit_command(command)
+
+
+@pytest.mark.parametrize('command', [
+    "firewall-cmd",
+    "firewall-cmd --reload",
+    "firewall-cmd --set-default-zone=trusted",
+    "firewall-cmd --zone=public --add-service=telnet",
+    "firewall-cmd --list-all --remove-service=ssh",
+    "firewall-cmd --panic-on",
+    "nft flush ruleset",
+    "iptables -P INPUT ACCEPT",
+    "ufw status",
+    "awk '{ print > \"/etc/passwd\" }'",
+    "sort -o /etc/shadow",
+])
+def test_changes_are_rejected(cis, command):
+    with pytest.raises(ValueError):
+        cis.parse_audit_command(command)
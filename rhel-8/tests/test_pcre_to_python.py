@@ -0,0 +1,66 @@
+"""pcre_to_python: the grep -P dialect of milestone patterns in Python re syntax"""
+
+import re
+
+import pytest
+
+
+def search(cis, pattern, text):
+    return re.search(cis.pcre_to_python(pattern), text, re.IGNORECASE)
+
+
+def test_horizontal_whitespace(cis):
+    assert search(cis, r'^\h*PermitRootLogin\h+no\b', ' \tPermitRootLogin\tno')
+    assert not search(cis, r'^PermitRootLogin\h+no', 'PermitRootLogin\nno')
+    assert search(cis, r'^\H+$', 'no-blanks')
+    assert search(cis, r'^[\h]+x', ' \tx')
+
+
+def test_quoted_literal(cis):
+    assert cis.pcre_to_python(r'\Qa.b*\E+') == re.escape('a.b*') + '+'
+    assert search(cis, r'^\Qa.b*', 'a.b*')
+    assert not search(cis, r'^\Qa.b*\E$', 'axbb')
+
+
+def test_escapes(cis):
+    assert search(cis, r'^\x{41}\z', 'A')
+    assert not search(cis, r'^a\z', 'a\n')
+    assert search(cis, r'^\e', '\x1b[0m')
+
+
+def test_named_groups_and_backreferences(cis):
+    for pattern in (r"""(?<q>["'])x\k<q>""", r"""(?'q'["'])x\k{q}""", r"""(?<q>["'])x\k'q'"""):
+        assert search(cis, pattern, '"x"')
+        assert not search(cis, pattern, '"x\'')
+
+
+def test_lookbehind_is_not_a_named_group(cis):
+    assert cis.pcre_to_python(r'(?<=a)b(?<!c)') == r'(?<=a)b(?<!c)'
+
+
+def test_posix_classes(cis):
+    assert search(cis, r'^[[:space:]]*[[:digit:]]+$', ' \t42')
+    assert search(cis, r'^[^[:alpha:]]+$', '4-2')
+    assert not search(cis, r'^[^[:alpha:]]+$', '4a2')
+
+
+def test_possessive_and_atomic_are_greedy(cis):
+    assert cis.pcre_to_python(r'a++b*+c?+') == 'a+b*c?'
+    assert cis.pcre_to_python(r'x{2,3}+') == 'x{2,3}'
+    assert cis.pcre_to_python(r'(?>ab|a)c') == '(?:ab|a)c'
+    # A quantifier after an anchor or group opening is not possessive
+    assert cis.pcre_to_python(r'a*?') == 'a*?'
+
+
+def test_inline_flags(cis):
+    assert cis.pcre_to_python(r'(?i)umask') == 'umask'
+    assert cis.pcre_to_python(r'(?im)^umask') == '(?m)^umask'
+    assert cis.pcre_to_python(r'(?i:umask)\s') == r'(?:umask)\s'
+
+
+@pytest.mark.parametrize('pattern', [
+    r'(?R)', r'(?|a|b)', r'(?1)', r'[[:bogus:]]', r'[abc', r'[\H]', r'\x{41',
+])
+def test_unsupported_constructs_raise(cis, pattern):
+    with pytest.raises(re.error):
+        cis.pcre_to_python(pattern)
@@ -0,0 +1,65 @@
+"""parse_sudoers_defaults / check_sudo_config: sudoers Defaults settings"""
+
+import pytest
+
+SUDOERS = '''# Defaults use_pty
+Defaults   !visiblepw
+Defaults    always_set_home, use_pty
+Defaults    env_keep += "COLORS DISPLAY HOSTNAME"
+Defaults logfile="/var/log/sudo.log"  # log
+Defaults:backup !authenticate
+Defaults  mail_badpass,\\
+   ! lecture
+%wheel ALL=(ALL) ALL
+'''
+
+
+def test_parse_sudoers_defaults(cis):
+    assert cis.parse_sudoers_defaults(SUDOERS) == [
+        ('!visiblepw', None), ('always_set_home', None), ('use_pty', None),
+        ('env_keep', 'COLORS DISPLAY HOSTNAME'), ('logfile', '/var/log/sudo.log'), ('!authenticate', None),
+        ('mail_badpass', None), ('!lecture', None),
+    ]
+
+
+def test_only_defaults_lines_count(cis):
+    assert cis.parse_sudoers_defaults("DefaultsX use_pty\n#Defaults use_pty\nuser ALL=(ALL) ALL\n") == []
+
+
+@pytest.fixture
+def scanner(cis, tmp_path, monkeypatch):
+    sudoers = tmp_path / 'sudoers'
+    sudoers_dir = tmp_path / 'sudoers.d'
+    sudoers_dir.mkdir()
+    sudoers.write_text("Defaults use_pty\nDefaults logfile=/var/log/sudo.log\n")
+    monkeypatch.setattr(cis, 'SUDOERS_FILE', str(sudoers))
+    monkeypatch.setattr(cis, 'SUDOERS_DIR', str(sudoers_dir))
+    scanner = cis.RHEL8CISScanner(output_dir=str(tmp_path / 'reports'))
+    return scanner, sudoers_dir
+
+
+@pytest.mark.parametrize('parameter, expected_value, status', [
+    ('use_pty', 'enabled', 'PASS'),
+    ('requiretty', 'enabled', 'FAIL'),
+    ('logfile', '/var/log/sudo.log', 'PASS'),
+    ('logfile', '/var/log/other.log', 'FAIL'),
+    ('!authenticate', 'not_found', 'PASS'),
+])
+def test_check_sudo_config(scanner, parameter, expected_value, status):
+    assert scanner[0].check_sudo_config(parameter, expected_value)['status'] == status
+
+
+def test_included_files_and_last_entry_wins(scanner):
+    scanner, sudoers_dir = scanner
+    (sudoers_dir / 'backup').write_text("Defaults:backup !authenticate\nDefaults !use_pty\n")
+    # Skipped by sudo's includedir, like editor backups
+    (sudoers_dir / 'old.conf').write_text("Defaults logfile=/tmp/log\n")
+    (sudoers_dir / 'backup~').write_text("Defaults logfile=/tmp/log\n")
+    assert scanner.check_sudo_config('!authenticate', 'not_found')['status'] == 'FAIL'
+    assert scanner.check_sudo_config('use_pty', 'enabled')['status'] == 'FAIL'
+    assert scanner.check_sudo_config('logfile', '/var/log/sudo.log')['status'] == 'PASS'
+
+
+def test_missing_sudoers(cis, scanner, tmp_path, monkeypatch):
+    monkeypatch.setattr(cis, 'SUDOERS_FILE', str(tmp_path / 'missing'))
+    assert scanner[0].check_sudo_config('use_pty', 'enabled')['status'] == 'FAIL'
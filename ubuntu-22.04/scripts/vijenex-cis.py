@@ -14,7 +14,11 @@
 import os
 import sys
 import json
+import hashlib
 import subprocess
+import signal
+import errno
+import shlex
 import argparse
 import datetime
 import socket
@@ -23,26 +27,2474 @@ import pwd
 import grp
 import stat
 import re
+import functools
+import threading
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import types
+import resource
+import shutil
+import tarfile
+import fnmatch
+import contextlib
+import multiprocessing
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor, as_completed
 import glob
 
+DPKG_STATUS_FILE = '/var/lib/dpkg/status'
+
+def parse_dpkg_status(content: str) -> Dict[str, str]:
+    """Parse a dpkg status database into {package: version} for installed packages
+    
+    Equivalent to the "ii"/"hi" rows of `dpkg -l`. Multi-arch packages are
+    indexed both by name and by name:arch.
+    """
+    packages = {}
+    for stanza in content.split('\n\n'):
+        fields = {}
+        for line in stanza.splitlines():
+            # Continuation lines (leading whitespace) belong to multi-line fields
+            if not line or line[0].isspace() or ':' not in line:
+                continue
+            key, value = line.split(':', 1)
+            if key in ('Package', 'Status', 'Version', 'Architecture'):
+                fields[key] = value.strip()
+        
+        name = fields.get('Package')
+        status = fields.get('Status', '').split()
+        if not name or len(status) != 3 or status[2] != 'installed':
+            continue
+        
+        version = fields.get('Version', '')
+        packages.setdefault(name, version)
+        if fields.get('Architecture'):
+            packages[f"{name}:{fields['Architecture']}"] = version
+    return packages
+
+PROC_SYS = '/proc/sys'
+
+def sysctl_path(parameter: str) -> Optional[str]:
+    """Map a sysctl name (net.ipv4.ip_forward) to its /proc/sys file
+    
+    Like sysctl(8), names containing '/' are taken as already slash
+    separated, which is how dotted interface names (eth0.100) are written.
+    """
+    separator = '/' if '/' in parameter else '.'
+    parts = [part for part in parameter.split(separator) if part]
+    if not parts or any(part in ('.', '..') for part in parts):
+        return None
+    return os.path.join(PROC_SYS, *parts)
+
+SYSTEMD_UNIT_SUFFIXES = ('.service', '.socket', '.target', '.mount', '.automount', '.swap', '.timer', '.path', '.slice', '.scope', '.device')
+
+# `systemctl is-enabled` exits 0 for these unit file states
+SYSTEMD_ENABLED_STATES = ('enabled', 'enabled-runtime', 'static', 'alias', 'indirect', 'generated', 'transient')
+
+def systemd_unit_name(name: str) -> str:
+    """Normalize a unit name the way systemctl does (autofs -> autofs.service)"""
+    return name if name.endswith(SYSTEMD_UNIT_SUFFIXES) else f"{name}.service"
+
+PROC_MOUNTINFO = '/proc/self/mountinfo'
+
+def _unescape_mount_field(field: str) -> str:
+    """Decode the octal escapes (\\040 etc.) the kernel uses in mount tables"""
+    return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), field)
+
+def parse_mountinfo(content: str) -> Dict[str, Dict[str, Any]]:
+    """Index /proc/self/mountinfo by mount point
+    
+    Later entries win, so an overmounted path reports the filesystem that is
+    actually visible there. "root" is the path inside the source filesystem
+    that is mounted, which is what tells a bind mount apart from a real one.
+    """
+    mounts = {}
+    for line in content.splitlines():
+        fields = line.split()
+        if '-' not in fields:
+            continue
+        separator = fields.index('-')
+        if separator < 6 or len(fields) < separator + 3:
+            continue
+        mount_options = fields[5].split(',')
+        super_options = fields[separator + 3].split(',') if len(fields) > separator + 3 else []
+        # Same view as /proc/mounts: per-mount flags first, then superblock options
+        options = mount_options + [opt for opt in super_options if opt not in mount_options and opt not in ('rw', 'ro')]
+        mounts[_unescape_mount_field(fields[4])] = types.MappingProxyType({
+            "mount_id": fields[0],
+            "parent_id": fields[1],
+            "root": _unescape_mount_field(fields[3]),
+            "device": _unescape_mount_field(fields[separator + 2]),
+            "fstype": fields[separator + 1],
+            "options": tuple(options),
+            "propagation": tuple(fields[6:separator]),
+        })
+    return mounts
+
+def parse_proc_mounts(content: str) -> Dict[str, Dict[str, Any]]:
+    """Index /proc/mounts by mount point (fallback when mountinfo is unavailable)"""
+    mounts = {}
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) >= 4:
+            mounts[_unescape_mount_field(parts[1])] = types.MappingProxyType({
+                "mount_id": "",
+                "parent_id": "",
+                "root": "/",
+                "device": _unescape_mount_field(parts[0]),
+                "fstype": parts[2],
+                "options": tuple(parts[3].split(',')),
+                "propagation": (),
+            })
+    return mounts
+
+def is_bind_mount(mount: Dict[str, Any]) -> bool:
+    """True when only a subdirectory of another filesystem is mounted here"""
+    # btrfs reports the subvolume path as root, which is a real separate mount
+    return mount["root"] != "/" and mount["fstype"] != "btrfs"
+
+MODPROBE_DIRS = ['/etc/modprobe.d/', '/lib/modprobe.d/', '/usr/lib/modprobe.d/']
+MODULES_ROOT = '/lib/modules'
+
+def module_key(name: str) -> str:
+    """Canonical kernel module name (the kernel treats - and _ alike)"""
+    return name.strip().replace('-', '_')
+
+def _module_name_from_path(path: str) -> str:
+    """kernel/fs/cramfs/cramfs.ko.zst -> cramfs"""
+    return module_key(os.path.basename(path).split('.ko')[0])
+
+def parse_modprobe_conf(content: str, install: Dict[str, str], blacklist: set) -> None:
+    """Collect install and blacklist directives from one modprobe.d file"""
+    for line in content.replace('\\\n', ' ').splitlines():
+        parts = line.split()
+        if len(parts) < 2 or parts[0].startswith('#'):
+            continue
+        if parts[0] == 'install' and len(parts) >= 3:
+            install.setdefault(module_key(parts[1]), ' '.join(parts[2:]))
+        elif parts[0] == 'blacklist':
+            blacklist.add(module_key(parts[1]))
+
+def is_disabled_install(command: Optional[str]) -> bool:
+    """True when an install directive turns loading the module into a no-op"""
+    return bool(command) and re.match(r'(/usr)?/bin/(true|false)\b', command) is not None
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern: str, flags: int = 0) -> 're.Pattern':
+    """Compile a milestone regex once per run (raises re.error like re.compile)"""
+    return re.compile(pattern, flags)
+
+# --low-impact: filesystem walks pause while the host is busier than this.
+# Load is the 1-minute load average per CPU, IO utilisation the share of time
+# the busiest disk spent doing IO since the previous sample.
+LOW_IMPACT_MAX_LOAD = 1.0
+LOW_IMPACT_MAX_IO_UTIL = 50.0
+
+PROC_LOADAVG = '/proc/loadavg'
+PROC_DISKSTATS = '/proc/diskstats'
+
+# Seconds between load samples, per pause, and the longest a walk waits before
+# making progress anyway (a permanently busy host must still get scanned)
+THROTTLE_SAMPLE_INTERVAL = 0.5
+THROTTLE_PAUSE = 1.0
+THROTTLE_MAX_PAUSE = 30.0
+
+def read_loadavg() -> Optional[float]:
+    """1-minute load average, or None if /proc/loadavg is unavailable"""
+    try:
+        with open(PROC_LOADAVG, 'r') as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def read_disk_io_ticks() -> Dict[str, int]:
+    """Milliseconds each whole disk has spent doing IO (field 13 of /proc/diskstats)"""
+    ticks = {}
+    try:
+        with open(PROC_DISKSTATS, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 13:
+                    continue
+                name = fields[2]
+                # Partitions would count the same IO twice; loop and ram devices are not disks
+                if name.startswith(('loop', 'ram')) or not os.path.isdir('/sys/block/' + name.replace('/', '!')):
+                    continue
+                ticks[name] = int(fields[12])
+    except (OSError, ValueError):
+        pass
+    return ticks
+
+class LoadThrottle:
+    """Makes long filesystem walks yield while the host is busy (--low-impact)
+    
+    pause() is meant to be called often from walk loops: it only samples
+    /proc/loadavg and /proc/diskstats every THROTTLE_SAMPLE_INTERVAL seconds,
+    and sleeps while either is above its threshold. The time spent sleeping
+    is accumulated in `throttled`.
+    """
+    
+    def __init__(self, max_load: float = LOW_IMPACT_MAX_LOAD, max_io_util: float = LOW_IMPACT_MAX_IO_UTIL):
+        self.max_load = max_load
+        self.max_io_util = max_io_util
+        self.throttled = 0.0
+        self._cpus = os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._last_ticks = (self._last_check, read_disk_io_ticks())
+    
+    def busy(self) -> bool:
+        now, ticks = time.monotonic(), read_disk_io_ticks()
+        then, previous = self._last_ticks
+        self._last_ticks = (now, ticks)
+        
+        load = read_loadavg()
+        # The walk itself keeps one task runnable; do not throttle on our own load
+        if load is not None and max(0.0, load - 1) / self._cpus > self.max_load:
+            return True
+        if now > then:
+            busiest = max([ticks[disk] - previous[disk] for disk in ticks if disk in previous] or [0])
+            if busiest / ((now - then) * 1000) * 100 > self.max_io_util:
+                return True
+        return False
+    
+    def pause(self) -> None:
+        if time.monotonic() - self._last_check < THROTTLE_SAMPLE_INTERVAL:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_check < THROTTLE_SAMPLE_INTERVAL:
+                return
+            waited = 0.0
+            while waited < THROTTLE_MAX_PAUSE and self.busy():
+                time.sleep(THROTTLE_PAUSE)
+                waited += THROTTLE_PAUSE
+            self.throttled += waited
+            self._last_check = time.monotonic()
+
+# Paths kept as evidence per tree predicate (counts are always exact)
+TREE_EVIDENCE_LIMIT = 20
+
+TREE_PREDICATES = ('world_writable_files', 'world_writable_dirs', 'nouser', 'nogroup', 'unowned', 'suid', 'sgid')
+
+def walk_tree(root: str, exclude_paths: List[str], known_uids: frozenset, known_gids: frozenset,
+              evidence_limit: int = TREE_EVIDENCE_LIMIT, throttle: Optional[LoadThrottle] = None,
+              fs: Any = os) -> Dict[str, Tuple[int, Tuple[str, ...]]]:
+    """Walk one filesystem below root and evaluate every tree predicate in a single pass
+    
+    Behaves like `find root -xdev` with the exclude paths pruned: symlinks are
+    not followed, unreadable directories are skipped, and mount points are
+    reported but not descended into. With a throttle, the walk pauses between
+    directories while the host is busy. fs supplies lstat and scandir (os, or an
+    ImageIndex for --image). Returns predicate -> (count, first paths):
+    
+    world_writable_files  regular files with o+w
+    world_writable_dirs   directories with o+w but without the sticky bit
+    nouser / nogroup      owner / group not known to the system
+    unowned               nouser or nogroup
+    suid / sgid           regular files with the setuid / setgid bit
+    """
+    counts = dict.fromkeys(TREE_PREDICATES, 0)
+    paths = {name: [] for name in TREE_PREDICATES}
+    excluded = set(exclude_paths)
+    
+    def hit(name, path):
+        counts[name] += 1
+        if len(paths[name]) < evidence_limit:
+            paths[name].append(path)
+    
+    try:
+        root_dev = fs.lstat(root).st_dev
+    except OSError:
+        root_dev = None
+    stack = [root] if root_dev is not None and root not in excluded else []
+    
+    while stack:
+        if throttle is not None:
+            throttle.pause()
+        try:
+            entries = fs.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                path = entry.path
+                if path in excluded:
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                mode = st.st_mode
+                
+                if stat.S_ISDIR(mode):
+                    if st.st_dev == root_dev:
+                        stack.append(path)
+                    if mode & stat.S_IWOTH and not mode & stat.S_ISVTX:
+                        hit('world_writable_dirs', path)
+                elif stat.S_ISREG(mode):
+                    if mode & stat.S_IWOTH:
+                        hit('world_writable_files', path)
+                    if mode & stat.S_ISUID:
+                        hit('suid', path)
+                    if mode & stat.S_ISGID:
+                        hit('sgid', path)
+                
+                nouser = st.st_uid not in known_uids
+                nogroup = st.st_gid not in known_gids
+                if nouser:
+                    hit('nouser', path)
+                if nogroup:
+                    hit('nogroup', path)
+                if nouser or nogroup:
+                    hit('unowned', path)
+    
+    return {name: (counts[name], tuple(paths[name])) for name in TREE_PREDICATES}
+
+def _same_filesystem_below(ancestor: str, path: str, fs: Any = os) -> bool:
+    """True when every directory from ancestor down to path is on one filesystem"""
+    try:
+        dev = fs.lstat(ancestor).st_dev
+        current = path
+        while current != ancestor:
+            if fs.lstat(current).st_dev != dev:
+                return False
+            current = os.path.dirname(current)
+        return True
+    except OSError:
+        return False
+
+def parse_account_db(content: str, id_field: Optional[int] = None, members_field: Optional[int] = None) -> Dict[str, Any]:
+    """Index a colon-separated account database (/etc/passwd, /etc/group, /etc/shadow)
+    
+    entries          every non-comment line split into fields, in file order
+    by_name          name -> first entry with that name
+    by_id            id -> names sharing it (id_field, e.g. 2 for UID/GID)
+    duplicate_names  names that appear more than once
+    duplicate_ids    id -> names, for ids used by more than one entry
+    members          name -> listed members (members_field, 3 for /etc/group)
+    """
+    entries = []
+    by_name = {}
+    name_counts = {}
+    by_id = {}
+    members = {}
+    for line in content.splitlines():
+        if line.strip() and not line.startswith('#'):
+            fields = tuple(line.strip().split(':'))
+            entries.append(fields)
+            by_name.setdefault(fields[0], fields)
+            name_counts[fields[0]] = name_counts.get(fields[0], 0) + 1
+            if id_field is not None and len(fields) > id_field:
+                by_id.setdefault(fields[id_field], []).append(fields[0])
+            if members_field is not None and len(fields) > members_field:
+                members.setdefault(fields[0], tuple(m.strip() for m in fields[members_field].split(',') if m.strip()))
+    
+    return types.MappingProxyType({
+        "entries": tuple(entries),
+        "by_name": types.MappingProxyType(by_name),
+        "by_id": types.MappingProxyType({key: tuple(names) for key, names in by_id.items()}),
+        "duplicate_names": tuple(name for name, count in name_counts.items() if count > 1),
+        "duplicate_ids": types.MappingProxyType({key: tuple(names) for key, names in by_id.items() if len(names) > 1}),
+        "members": types.MappingProxyType(members),
+    })
+
+SSHD_CONFIG_FILE = '/etc/ssh/sshd_config'
+
+# sshd_config keywords whose occurrences add up; every other keyword keeps the
+# first value sshd reads for it (first match wins, Includes read in place)
+SSHD_MULTI_VALUED = frozenset([
+    'acceptenv', 'allowgroups', 'allowusers', 'denygroups', 'denyusers', 'hostcertificate', 'hostkey',
+    'listenaddress', 'port', 'setenv', 'subsystem',
+])
+
+# Nesting limit for Include, as in sshd
+SSHD_INCLUDE_DEPTH = 16
+
+# Keywords taking a time interval, reported in seconds like `sshd -T` does
+SSHD_TIME_KEYWORDS = ('clientaliveinterval', 'logingracetime')
+
+# Compiled-in OpenSSH defaults for keywords the CIS controls check, used when
+# the configuration has to be parsed instead of asking `sshd -T`
+SSHD_DEFAULTS = types.MappingProxyType({
+    'banner': 'none', 'clientalivecountmax': '3', 'clientaliveinterval': '0', 'disableforwarding': 'no',
+    'gssapiauthentication': 'no', 'hostbasedauthentication': 'no', 'ignorerhosts': 'yes', 'logingracetime': '120',
+    'loglevel': 'INFO', 'maxauthtries': '6', 'maxsessions': '10', 'maxstartups': '10:30:100',
+    'permitemptypasswords': 'no', 'permitrootlogin': 'prohibit-password', 'permituserenvironment': 'no',
+    'usepam': 'no', 'x11forwarding': 'no',
+    # What sshd offers when Ciphers, MACs or KexAlgorithms are not set (OpenSSH 8.9 to 9.x)
+    'ciphers': 'chacha20-poly1305@openssh.com,aes128-ctr,aes192-ctr,aes256-ctr,aes128-gcm@openssh.com,'
+               'aes256-gcm@openssh.com',
+    'macs': 'umac-64-etm@openssh.com,umac-128-etm@openssh.com,hmac-sha2-256-etm@openssh.com,'
+            'hmac-sha2-512-etm@openssh.com,hmac-sha1-etm@openssh.com,umac-64@openssh.com,umac-128@openssh.com,'
+            'hmac-sha2-256,hmac-sha2-512,hmac-sha1',
+    'kexalgorithms': 'sntrup761x25519-sha512@openssh.com,curve25519-sha256,curve25519-sha256@libssh.org,'
+                     'ecdh-sha2-nistp256,ecdh-sha2-nistp384,ecdh-sha2-nistp521,diffie-hellman-group-exchange-sha256,'
+                     'diffie-hellman-group16-sha512,diffie-hellman-group18-sha512,diffie-hellman-group14-sha256',
+})
+
+# Algorithms the CIS benchmarks require to be disabled
+SSHD_WEAK_ALGORITHMS = types.MappingProxyType({
+    'ciphers': frozenset([
+        '3des-cbc', 'aes128-cbc', 'aes192-cbc', 'aes256-cbc', 'arcfour', 'arcfour128', 'arcfour256',
+        'blowfish-cbc', 'cast128-cbc', 'rijndael-cbc@lysator.liu.se',
+    ]),
+    'macs': frozenset([
+        'hmac-md5', 'hmac-md5-96', 'hmac-ripemd160', 'hmac-sha1-96', 'umac-64@openssh.com',
+        'hmac-md5-etm@openssh.com', 'hmac-md5-96-etm@openssh.com', 'hmac-ripemd160-etm@openssh.com',
+        'hmac-sha1-96-etm@openssh.com', 'umac-64-etm@openssh.com',
+    ]),
+    'kexalgorithms': frozenset([
+        'diffie-hellman-group1-sha1', 'diffie-hellman-group14-sha1', 'diffie-hellman-group-exchange-sha1',
+    ]),
+})
+
+def sshd_seconds(value: str) -> str:
+    """An sshd time interval ("1m30s", "90") in seconds; unparsable values are returned unchanged"""
+    units = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    parts = re.findall(r'(\d+)([smhdw]?)', value.lower())
+    if not parts or ''.join(number + unit for number, unit in parts) != value.lower():
+        return value
+    return str(sum(int(number) * units[unit] for number, unit in parts))
+
+def parse_sshd_t(content: str) -> Dict[str, str]:
+    """Settings printed by `sshd -T` (lowercase keyword -> value, repeated keywords joined by spaces)"""
+    settings = {}
+    for line in content.splitlines():
+        keyword, _, value = line.strip().partition(' ')
+        if not keyword:
+            continue
+        if keyword in settings:
+            settings[keyword] += ' ' + value.strip()
+        else:
+            settings[keyword] = value.strip()
+    return settings
+
+def parse_sshd_config(config_file: str, read_file, glob_func) -> Dict[str, str]:
+    """Global settings of an sshd_config as sshd reads them, with its defaults filled in
+    
+    Include directives are expanded in place (relative paths are taken from
+    the directory of config_file, globs in sorted order), the first value of
+    a keyword wins and Match blocks, which only apply to some connections, are
+    left out; a Match block ends with the file it appears in. Files are read
+    with read_file(path) and patterns expanded with glob_func(pattern).
+    """
+    settings = {}
+    base_dir = os.path.dirname(config_file)
+    
+    def parse(path, depth):
+        if depth > SSHD_INCLUDE_DEPTH:
+            raise ValueError(f"Include nested deeper than {SSHD_INCLUDE_DEPTH} levels in {path}")
+        in_match = False
+        for line in read_file(path).splitlines():
+            line = re.sub(r'\s#.*$', '', line).strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = re.split(r'\s*=\s*|\s+', line, 1)
+            keyword = fields[0].lower()
+            value = fields[1].strip() if len(fields) > 1 else ''
+            if keyword == 'match':
+                in_match = True
+            if in_match:
+                continue
+            if keyword == 'include':
+                for pattern in value.split():
+                    pattern = os.path.join(base_dir, pattern)
+                    for included in sorted(glob_func(pattern)) if glob.has_magic(pattern) else [pattern]:
+                        try:
+                            parse(included, depth + 1)
+                        except OSError:
+                            pass
+                continue
+            
+            value = value.strip('"')
+            if keyword in SSHD_TIME_KEYWORDS:
+                value = sshd_seconds(value)
+            if keyword in SSHD_MULTI_VALUED and keyword in settings:
+                settings[keyword] += ' ' + value
+            else:
+                settings.setdefault(keyword, value)
+    
+    parse(config_file, 0)
+    for keyword, value in SSHD_DEFAULTS.items():
+        settings.setdefault(keyword, value)
+    return settings
+
+PAM_DIR = '/etc/pam.d'
+
+PAM_TYPES = ('account', 'auth', 'password', 'session')
+
+# Nesting limit for @include, include and substack (PAM itself allows 8 levels
+# of substack; deeper chains here are treated as a loop)
+PAM_INCLUDE_DEPTH = 16
+
+def parse_pam_stack(config_file: str, read_file) -> Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]:
+    """The fully expanded stack of a PAM service as (type, control, module, args) entries
+    
+    `@include` pulls in every line of another service, `include` and
+    `substack` the lines of their own type, in place and recursively; names
+    are relative to PAM_DIR. The module is given by its file name, a leading
+    "-" (skip if the module is missing) is dropped from the type, and bracketed
+    controls and arguments are kept as one field each. Files are read with
+    read_file(path); a missing included service contributes nothing, as with
+    PAM.
+    """
+    entries = []
+    
+    def expand(path, only_type, chain):
+        if path in chain or len(chain) > PAM_INCLUDE_DEPTH:
+            return
+        chain = chain + (path,)
+        for line in read_file(path).replace('\\\n', ' ').splitlines():
+            fields = re.findall(r'\[[^\]]*\]|[^\s#]+|#', line)
+            if '#' in fields:
+                fields = fields[:fields.index('#')]
+            if not fields:
+                continue
+            if fields[0] == '@include':
+                if len(fields) > 1:
+                    include(fields[1], only_type, chain)
+                continue
+            if len(fields) < 3:
+                continue
+            pam_type = fields[0].lstrip('-').lower()
+            if only_type is not None and pam_type != only_type:
+                continue
+            if fields[1] in ('include', 'substack'):
+                include(fields[2], pam_type, chain)
+                continue
+            entries.append((pam_type, fields[1], os.path.basename(fields[2]), tuple(fields[3:])))
+    
+    def include(name, only_type, chain):
+        try:
+            expand(os.path.join(PAM_DIR, name), only_type, chain)
+        except OSError:
+            pass
+    
+    expand(config_file, None, ())
+    return tuple(entries)
+
+def pam_arguments(args: Tuple[str, ...]) -> Dict[str, str]:
+    """Module arguments as name -> value ('' for flags such as use_uid)"""
+    arguments = {}
+    for arg in args:
+        name, _, value = arg.partition('=')
+        arguments[name] = value
+    return arguments
+
+class PAMStack:
+    """A PAM service's expanded stack (see parse_pam_stack), indexed by type and module"""
+    
+    def __init__(self, entries: Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]):
+        self.entries = entries
+        by_type, by_module = {}, {}
+        for entry in entries:
+            by_type.setdefault(entry[0], []).append(entry)
+            by_module.setdefault(entry[2], []).append(entry)
+        self._by_type = {pam_type: tuple(found) for pam_type, found in by_type.items()}
+        self._by_module = {module: tuple(found) for module, found in by_module.items()}
+    
+    def __repr__(self) -> str:
+        # Also what stable_digest fingerprints
+        return f"PAMStack({self.entries!r})"
+    
+    def stack(self, pam_type: str) -> Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]:
+        """Entries of one management group (auth, account, password, session) in order"""
+        return self._by_type.get(pam_type, ())
+    
+    def module(self, module: str, pam_type: Optional[str] = None) -> Tuple[Tuple[str, str, str, Tuple[str, ...]], ...]:
+        """Entries using a module (by file name, e.g. pam_unix.so), optionally of one type only"""
+        found = self._by_module.get(module, ())
+        return found if pam_type is None else tuple(entry for entry in found if entry[0] == pam_type)
+    
+    def arguments(self, module: str, pam_type: Optional[str] = None) -> Dict[str, str]:
+        """Arguments a module is given across its entries (later entries override earlier ones)"""
+        arguments = {}
+        for entry in self.module(module, pam_type):
+            arguments.update(pam_arguments(entry[3]))
+        return arguments
+    
+    def contains(self, pam_type: str, control: str, module: str, args: Tuple[str, ...] = ()) -> bool:
+        """Whether an entry of that type, control and module has at least the given arguments"""
+        return any(entry[1].split() == control.split() and set(args) <= set(entry[3])
+                   for entry in self.module(module, pam_type))
+
+# Milestones are compiled into one file next to the milestones directory (by
+# --compile-milestones at build time, or on first use) and recompiled whenever
+# a milestone file's mtime or size changes, so scans only stat the sources
+MILESTONE_BUNDLE_FILE = 'vijenex-cis-milestones.bundle'
+MILESTONE_BUNDLE_VERSION = 2
+
+# Control fields only the reports read: kept out of the execution table
+NARRATIVE_FIELDS = ('description', 'rationale', 'remediation', 'impact', 'references', 'audit',
+                    'cis_controls', 'reference_note', 'default_value')
+
+def milestone_stamps(milestones_dir: Path) -> Dict[str, List[int]]:
+    """[mtime_ns, size] of every milestone file in a directory, what a bundle is checked against"""
+    stamps = {}
+    for name in sorted(f for f in os.listdir(milestones_dir) if f.endswith('.json')):
+        st = os.stat(os.path.join(milestones_dir, name))
+        stamps[name] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+def milestone_sources(milestones_dir: Path) -> Tuple[Dict[str, List[int]], Dict[str, bytes]]:
+    """Stamps (see milestone_stamps) and raw contents of every milestone file in a directory"""
+    # Stamped before reading: a file changing in between makes the next run recompile
+    stamps = milestone_stamps(milestones_dir)
+    sources = {}
+    for name in stamps:
+        with open(os.path.join(milestones_dir, name), 'rb') as f:
+            sources[name] = f.read()
+    return stamps, sources
+
+def compile_milestones(stamps: Dict[str, List[int]], sources: Dict[str, bytes]) -> Tuple[Dict[str, Any], bytes, List[str]]:
+    """Split milestone sources into an execution table and a narrative store
+    
+    Returns the bundle header (per milestone: its controls without their
+    NARRATIVE_FIELDS and the location of each control's narrative record),
+    the narrative records it indexes, and the problems found while
+    validating: files that do not parse, controls without an id, patterns
+    that do not compile and ids used twice with different narratives.
+    """
+    milestones = {}
+    data = bytearray()
+    problems = []
+    for name, raw in sources.items():
+        try:
+            controls = json.loads(raw.decode('utf-8')).get('controls', [])
+        except Exception as e:
+            milestones[name] = {"error": str(e)}
+            problems.append(f"{name}: {e}")
+            continue
+        
+        table = []
+        narratives = {}
+        for position, control in enumerate(controls):
+            control_id = control.get('id')
+            if not control_id:
+                problems.append(f"{name}: control #{position + 1} has no id")
+            if control.get('type') == 'ConfigFile' and control.get('pattern'):
+                try:
+                    compile_pattern(control['pattern'], re.MULTILINE)
+                except re.error as e:
+                    problems.append(f"{name}: {control_id}: invalid pattern: {e}")
+            narrative = {field: control[field] for field in NARRATIVE_FIELDS if field in control}
+            if control_id and narratives.setdefault(control_id, narrative) != narrative:
+                problems.append(f"{name}: {control_id}: used by controls with different narratives")
+            table.append({key: value for key, value in control.items() if key not in NARRATIVE_FIELDS})
+        
+        locations = {}
+        for control_id, narrative in narratives.items():
+            record = json.dumps(narrative, separators=(',', ':')).encode()
+            locations[control_id] = [len(data), len(record)]
+            data += record
+        milestones[name] = {"controls": table, "narrative": locations}
+    
+    header = {"version": MILESTONE_BUNDLE_VERSION, "narrative_fields": list(NARRATIVE_FIELDS), "sources": stamps,
+              "milestones": milestones}
+    return header, bytes(data), problems
+
+def write_milestone_bundle(path: Path, header: Dict[str, Any], data: bytes) -> None:
+    """Write a bundle atomically: a JSON header line followed by the narrative records"""
+    temp_path = Path(f"{path}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps(header, separators=(',', ':')).encode() + b'\n')
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+class MilestoneBundle:
+    """Compiled milestones: an execution table in memory, narrative text read on demand
+    
+    Only the header line (the controls as the checks see them) is parsed when
+    a bundle is opened. The narrative fields of a control are read from the
+    rest of the file with os.pread, so reports load the text of the controls
+    they render and nothing else. A bundle compiled in memory (when no cache
+    path was writable) serves the same lookups from its data.
+    """
+    
+    def __init__(self, header: Dict[str, Any], data: Optional[bytes] = None,
+                 fileobj=None, data_offset: int = 0):
+        self.sources = header.get("sources")
+        self.narrative_fields = header.get("narrative_fields")
+        self._milestones = header.get("milestones", {})
+        self._data = data
+        self._file = fileobj
+        self._data_offset = data_offset
+    
+    @classmethod
+    def open(cls, path: Path) -> 'MilestoneBundle':
+        """Open a bundle file (raises OSError, or ValueError if it is not a readable bundle)"""
+        f = open(path, 'rb')
+        try:
+            line = f.readline()
+            header = json.loads(line)
+            if not isinstance(header, dict) or header.get("version") != MILESTONE_BUNDLE_VERSION:
+                raise ValueError(f"{path} is not a version {MILESTONE_BUNDLE_VERSION} milestone bundle")
+        except Exception:
+            f.close()
+            raise
+        return cls(header, fileobj=f, data_offset=len(line))
+    
+    def close(self) -> None:
+        """Release the bundle file (narratives can no longer be read)"""
+        if self._file is not None:
+            self._file.close()
+    
+    def controls(self, milestone_file: str) -> Optional[List[Dict[str, Any]]]:
+        """Controls of a milestone without their narrative fields (None if it has none)"""
+        return self._milestones.get(milestone_file, {}).get("controls")
+    
+    def error(self, milestone_file: str) -> Optional[str]:
+        """Why a milestone could not be compiled, if it could not"""
+        return self._milestones.get(milestone_file, {}).get("error")
+    
+    def narrative(self, milestone_file: str, control_id: str) -> Dict[str, Any]:
+        """Narrative fields of a control ({} if there are none)"""
+        location = self._milestones.get(milestone_file, {}).get("narrative", {}).get(control_id)
+        if location is None:
+            return {}
+        offset, length = location
+        if self._data is not None:
+            record = self._data[offset:offset + length]
+        else:
+            record = os.pread(self._file.fileno(), length, self._data_offset + offset)
+        return json.loads(record)
+
+def load_milestone_bundle(milestones_dir: Path, cache_paths: List[Path]) -> MilestoneBundle:
+    """The compiled bundle of a milestones directory, recompiled if any milestone changed
+    
+    The first cache path holding a bundle whose recorded mtime and size of
+    every milestone file still match is used; the sources themselves are
+    not read. Otherwise the milestones are compiled and written to the first
+    writable cache path, or kept in memory if none is.
+    """
+    stamps = milestone_stamps(milestones_dir)
+    for path in cache_paths:
+        try:
+            bundle = MilestoneBundle.open(path)
+        except (OSError, ValueError):
+            continue
+        if bundle.sources == stamps and bundle.narrative_fields == list(NARRATIVE_FIELDS):
+            return bundle
+        bundle.close()
+    
+    stamps, sources = milestone_sources(milestones_dir)
+    header, data, problems = compile_milestones(stamps, sources)
+    for problem in problems:
+        print(f"Warning: milestone {problem}")
+    for path in cache_paths:
+        try:
+            write_milestone_bundle(path, header, data)
+            return MilestoneBundle.open(path)
+        except (OSError, ValueError):
+            continue
+    return MilestoneBundle(header, data)
+
+# --incremental keeps per-control results and input fingerprints here, next to the reports
+INCREMENTAL_STATE_FILE = 'vijenex-cis-state.json'
+INCREMENTAL_STATE_VERSION = 1
+
+# Fingerprints cover what checks read through ScanContext; as a safety net for
+# anything they miss, an incremental run falls back to a full scan once the
+# state is this old
+INCREMENTAL_MAX_AGE = 24 * 60 * 60
+
+RPM_DB_FILES = ('/var/lib/rpm/rpmdb.sqlite', '/var/lib/rpm/Packages', '/usr/lib/sysimage/rpm/rpmdb.sqlite')
+
+def stable_digest(value: Any) -> str:
+    """Digest of a fact value that does not depend on set ordering or hash seeds"""
+    def canonical(item):
+        if isinstance(item, (dict, types.MappingProxyType)):
+            return {str(key): canonical(val) for key, val in item.items()}
+        if isinstance(item, (set, frozenset)):
+            return sorted((canonical(val) for val in item), key=repr)
+        if isinstance(item, (list, tuple)):
+            return [canonical(val) for val in item]
+        return item
+    return hashlib.sha256(json.dumps(canonical(value), sort_keys=True, default=str).encode()).hexdigest()
+
+def file_signature(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """(st_ino, st_mtime_ns, st_size) of a file, or None if it cannot be stat'ed"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def fact_key_from_json(value: Any) -> Any:
+    """Turn a fact key read back from JSON into its tuple form"""
+    if isinstance(value, list):
+        return tuple(fact_key_from_json(item) for item in value)
+    return value
+
+# Control types whose checks read the system only through ScanContext, so the
+# facts they touched fully describe their inputs and --incremental may reuse them.
+# Tree walks (WorldWritableFiles, OrphanedFiles) are always re-run: a file
+# created deep in the tree changes nothing a fingerprint short of the walk sees.
+INCREMENTAL_CONTROL_TYPES = frozenset([
+    'Service', 'KernelParameter', 'MultiKernelParameter', 'Package', 'MultiPackage', 'ServiceNotInUse',
+    'SingleLoggingSystem', 'KernelModule', 'MountOption', 'MountPoint', 'ConfigFile', 'FileContent', 'BootParameter',
+    'SSHDConfig', 'PAMConfig', 'JournaldConfig', 'AuditdConfig', 'AuditRule', 'AIDEConfig',
+    'AppArmorProfile', 'WirelessInterface', 'SingleFirewall', 'UFWStatus', 'UFWLoopback', 'UFWOpenPorts',
+    'UFWDefaultPolicy', 'NftablesTable', 'NftablesBaseChains', 'CronJob',
+    'ShadowedPasswords', 'EmptyPasswords', 'GroupConsistency', 'EmptyGroup', 'DuplicateUIDs', 'DuplicateGIDs',
+    'DuplicateUsernames', 'DuplicateGroupnames',
+])
+
+PACKAGE_DB_FILES = (DPKG_STATUS_FILE,) + RPM_DB_FILES
+
+# --watch: how often controls that depend on runtime state inotify cannot see
+# (sysctl values, mounts, command output, tree walks) are re-checked
+WATCH_INTERVAL = 300
+
+# Quiet period after an inotify event before re-evaluating, so a burst of
+# writes (package upgrade, editor save) triggers one re-check
+WATCH_DEBOUNCE = 1.0
+
+DRIFT_LOG_FILE = 'vijenex-cis-drift.jsonl'
+
+SYSTEMD_UNIT_DIRS = ['/etc/systemd/system', '/lib/systemd/system', '/usr/lib/systemd/system']
+
+class InotifyWatcher:
+    """Minimal inotify binding over ctypes (Linux only, no extra dependencies)
+    
+    Watches are placed on directories so files replaced by rename (editors,
+    package managers) keep being seen. read() returns the changed paths, or
+    None when the kernel event queue overflowed and everything must be
+    re-checked.
+    """
+    
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_CLOEXEC = 0o2000000
+    
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self._dirs = {}
+    
+    def add_directory(self, directory: str) -> bool:
+        """Watch a directory for changes to itself and its entries (False if it cannot be watched)"""
+        if directory in self._dirs.values():
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            return False
+        self._dirs[wd] = directory
+        return True
+    
+    def read(self, timeout: float) -> Optional[List[str]]:
+        """Paths changed within timeout seconds ([] if nothing happened)"""
+        ready, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not ready:
+            return []
+        data = os.read(self._fd, 64 * 1024)
+        paths = []
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _cookie, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + length].split(b'\0', 1)[0]
+            offset += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                del self._dirs[wd]
+            paths.append(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return paths
+    
+    def close(self) -> None:
+        os.close(self._fd)
+
+def watch_targets(key: Any) -> Tuple[List[str], List[str], bool]:
+    """What --watch must observe for one fact key: (files, directories, needs polling)"""
+    kind = key[0] if isinstance(key, tuple) else key
+    if kind in ("file", "exists", "passwd", "group", "shadow"):
+        return [key[1]], [], False
+    if kind == "packages":
+        return list(PACKAGE_DB_FILES), [], False
+    if kind == "glob":
+        literal = re.split(r'[*?\[]', key[1], 1)[0]
+        return [], [os.path.dirname(literal) or '/'], False
+    if kind == "pam_stack":
+        return [key[1]], [PAM_DIR], False
+    if kind == "sshd_config":
+        # Includes may live anywhere, so poll as well
+        return [key[1]], [os.path.join(os.path.dirname(key[1]), 'sshd_config.d')], True
+    if kind == "kernel_modules":
+        # modprobe.d is watchable, the set of loaded modules is not
+        return [], [d.rstrip('/') for d in MODPROBE_DIRS], True
+    if kind == "unit_file_states":
+        dirs = []
+        for unit_dir in SYSTEMD_UNIT_DIRS:
+            dirs.append(unit_dir)
+            dirs.extend(glob.glob(os.path.join(unit_dir, '*.wants')) + glob.glob(os.path.join(unit_dir, '*.requires')))
+        return [], dirs, False
+    return [], [], True
+
+# Limits applied to every command a check runs, so a runaway pipeline cannot
+# degrade the workloads on the host being scanned
+COMMAND_TIMEOUT = 30
+COMMAND_CPU_LIMIT = 30
+COMMAND_MEMORY_LIMIT = 1024 * 1024 * 1024
+COMMAND_OUTPUT_LIMIT = 8 * 1024 * 1024
+COMMAND_NICE = 10
+
+# ioprio_set(2) has no libc wrapper; syscall numbers per architecture
+IOPRIO_SYSCALLS = {'x86_64': 251, 'i386': 289, 'i686': 289, 'aarch64': 30, 'armv7l': 314, 'ppc64le': 273, 's390x': 282}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_WHO_PGRP = 2
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+
+def set_io_priority(io_class: int, level: int = 0, who: int = IOPRIO_WHO_PROCESS, target: int = 0) -> bool:
+    """ionice for a process (0 = ourselves) or process group; False where unsupported"""
+    number = IOPRIO_SYSCALLS.get(platform.machine())
+    if number is None:
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        return libc.syscall(number, who, target, (io_class << IOPRIO_CLASS_SHIFT) | level) == 0
+    except (OSError, AttributeError):
+        return False
+
+def run_deprioritized(func):
+    """func() run in a thread of its own at the lowest CPU and idle IO priority
+    
+    Linux keeps both priorities per thread, so the rest of the process is not
+    affected. Exceptions raised by func are re-raised in the caller.
+    """
+    outcome = {}
+    def target():
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, 19)
+        except OSError:
+            pass
+        set_io_priority(IOPRIO_CLASS_IDLE)
+        try:
+            outcome["value"] = func()
+        except BaseException as e:
+            outcome["error"] = e
+    thread = threading.Thread(target=target, name="vijenex-low-impact-walk")
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+class CommandExecutor:
+    """Runs check commands in their own process group under hard limits
+    
+    On timeout, or once a stream exceeds output_limit bytes, the whole
+    process group is killed, so pipeline members (find | head) never outlive
+    the shell. Shell commands get RLIMIT_CPU/RLIMIT_AS through ulimit, which
+    every pipeline member inherits; the group is reniced and given a lower IO
+    priority as soon as it starts. Limits are applied without preexec_fn,
+    which is not safe with the --jobs worker threads.
+    
+    run_pipeline() runs argv lists connected by pipes without any shell; each
+    stage gets its own process group and its limits through prlimit(2).
+    """
+    
+    def __init__(self, timeout: int = COMMAND_TIMEOUT, cpu_limit: int = COMMAND_CPU_LIMIT,
+                 memory_limit: int = COMMAND_MEMORY_LIMIT, output_limit: int = COMMAND_OUTPUT_LIMIT,
+                 nice: int = COMMAND_NICE, io_class: int = IOPRIO_CLASS_BE, io_level: int = 7):
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self.output_limit = output_limit
+        self.nice = nice
+        self.io_class = io_class
+        self.io_level = io_level
+    
+    def _limited(self, command: str) -> str:
+        prefix = ''
+        if self.cpu_limit:
+            prefix += f'ulimit -t {self.cpu_limit} 2>/dev/null; '
+        if self.memory_limit:
+            prefix += f'ulimit -v {self.memory_limit // 1024} 2>/dev/null; '
+        return prefix + command
+    
+    def _deprioritize(self, pgid: int) -> None:
+        try:
+            if self.nice:
+                os.setpriority(os.PRIO_PGRP, pgid, min(19, os.getpriority(os.PRIO_PROCESS, 0) + self.nice))
+        except OSError:
+            pass
+        set_io_priority(self.io_class, self.io_level, IOPRIO_WHO_PGRP, pgid)
+    
+    @staticmethod
+    def _kill_group(proc: subprocess.Popen) -> None:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    
+    def _limit(self, pid: int) -> None:
+        for limit, value in ((resource.RLIMIT_CPU, self.cpu_limit), (resource.RLIMIT_AS, self.memory_limit)):
+            if value:
+                try:
+                    resource.prlimit(pid, limit, (value, value))
+                except (OSError, ValueError):
+                    pass
+    
+    def run(self, command: str, shell: bool = True) -> Tuple[str, str, int, float]:
+        """(stdout, stderr, returncode, seconds the command ran)"""
+        started = time.perf_counter()
+        proc = subprocess.Popen(self._limited(command) if shell else command, shell=shell, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True)
+        self._deprioritize(proc.pid)
+        stdout, stderr, returncode, elapsed = self._communicate([proc], proc.stdout, proc.stderr, started, self.timeout)
+        if stdout is None:
+            return "", "Command timeout", 1, elapsed
+        return stdout, stderr, returncode, elapsed
+    
+    def run_pipeline(self, stages: List[Tuple[List[str], bool]], timeout: Optional[float] = None,
+                     env: Optional[Dict[str, str]] = None) -> Tuple[str, str, int, float]:
+        """Run (argv, quiet) stages connected by pipes, without a shell
+        
+        Like run(), with the last stage's return code; quiet stages have their
+        stderr discarded (2>/dev/null). Raises subprocess.TimeoutExpired when
+        the pipeline outlives timeout (default: the executor's).
+        """
+        started = time.perf_counter()
+        timeout = self.timeout if timeout is None else timeout
+        err_read, err_write = os.pipe()
+        procs = []
+        try:
+            stdin = subprocess.DEVNULL
+            for argv, quiet in stages:
+                proc = subprocess.Popen(argv, stdin=stdin, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL if quiet else err_write, env=env,
+                                        start_new_session=True)
+                procs.append(proc)
+                if stdin is not subprocess.DEVNULL:
+                    # Only the next stage reads it, so it sees EOF/SIGPIPE like in a shell
+                    stdin.close()
+                stdin = proc.stdout
+                self._limit(proc.pid)
+                self._deprioritize(proc.pid)
+        except BaseException:
+            for proc in procs:
+                self._kill_group(proc)
+                proc.wait()
+                proc.stdout.close()
+            os.close(err_read)
+            raise
+        finally:
+            os.close(err_write)
+        
+        stdout, stderr, returncode, elapsed = self._communicate(procs, procs[-1].stdout, os.fdopen(err_read, 'rb'),
+                                                                started, timeout)
+        if stdout is None:
+            raise subprocess.TimeoutExpired([argv for argv, _ in stages], timeout)
+        return stdout, stderr, returncode, elapsed
+    
+    def _communicate(self, procs: List[subprocess.Popen], stdout, stderr, started: float,
+                     timeout: float) -> Tuple[Optional[str], str, int, float]:
+        """Read stdout and stderr until every process has exited (stdout is None on timeout)"""
+        deadline = started + timeout
+        out_fd, err_fd = stdout.fileno(), stderr.fileno()
+        streams = {out_fd: [], err_fd: []}
+        sizes = dict.fromkeys(streams, 0)
+        open_fds = list(streams)
+        timed_out = truncated = False
+        try:
+            while open_fds and not (timed_out or truncated):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                ready, _, _ = select.select(open_fds, [], [], remaining)
+                for fd in ready:
+                    data = os.read(fd, 64 * 1024)
+                    if not data:
+                        open_fds.remove(fd)
+                        continue
+                    streams[fd].append(data[:max(0, self.output_limit - sizes[fd])])
+                    sizes[fd] += len(data)
+                    truncated = truncated or sizes[fd] > self.output_limit
+            
+            if not (timed_out or truncated):
+                for proc in procs:
+                    try:
+                        proc.wait(timeout=max(0.0, deadline - time.perf_counter()))
+                    except subprocess.TimeoutExpired:
+                        timed_out = True
+                        break
+        finally:
+            for proc in procs:
+                if proc.returncode is None:
+                    self._kill_group(proc)
+                proc.wait()
+                proc.stdout.close()
+            stderr.close()
+        
+        elapsed = time.perf_counter() - started
+        if timed_out:
+            return None, "", 1, elapsed
+        stdout = b''.join(streams[out_fd]).decode('utf-8', errors='replace')
+        stderr = b''.join(streams[err_fd]).decode('utf-8', errors='replace')
+        if truncated:
+            stderr += f"\nOutput truncated at {self.output_limit} bytes"
+        return stdout, stderr, procs[-1].returncode, elapsed
+
+# CommandOutputEmpty controls: programs their audit commands may run, where
+# they are looked up, and how long each command may take (whole-filesystem
+# finds need more than the usual COMMAND_TIMEOUT)
+AUDIT_COMMAND_PROGRAMS = frozenset([
+    'find', 'awk', 'grep', 'cut', 'sort', 'uniq', 'head', 'stat', 'ls', 'df', 'ss', 'xargs',
+    'ufw', 'iptables', 'ip6tables', 'nft',
+])
+AUDIT_COMMAND_PATH = '/usr/sbin:/usr/bin:/sbin:/bin'
+AUDIT_COMMAND_TIMEOUT = 300
+
+# find actions that run other programs or write files
+AUDIT_FIND_ACTIONS = ('-exec', '-execdir', '-ok', '-okdir', '-delete', '-fprint', '-fprint0', '-fprintf', '-fls')
+
+# xargs options whose value is a separate argument
+XARGS_VALUE_OPTIONS = ('-I', '-a', '-d', '-E', '-L', '-n', '-P', '-s')
+
+# awk options allowed (others load program files or, like gawk -i inplace,
+# rewrite files); the program itself is checked by _audit_awk_program
+AWK_OPTIONS = ('-F', '-v')
+
+# Short options of sort and uniq that take a value, and ss options that kill
+# sockets or write files
+SORT_VALUE_OPTIONS = 'ktST'
+UNIQ_VALUE_OPTIONS = ('-f', '-s', '-w')
+SS_WRITE_OPTIONS = 'KD'
+
+# Read-only use of the firewall tools: listing rules only
+IPTABLES_LIST_COMMANDS = ('-L', '--list', '-S', '--list-rules')
+IPTABLES_LIST_OPTIONS = ('-n', '--numeric', '-v', '--verbose', '-x', '--exact', '--line-numbers', '-w', '--wait')
+NFT_READ_OPTIONS = ('-a', '--handle', '-n', '--numeric', '-s', '--stateless', '-j', '--json', '-t', '--terse',
+                    '-y', '--numeric-priority')
+UFW_READ_COMMANDS = ('status', 'show')
+
+# Audit commands independent of each other run this many at a time
+AUDIT_COMMAND_WORKERS = 4
+
+def _audit_awk_program(program: str) -> None:
+    """Reject an awk program that could run commands or write files
+    
+    String and regex literals are left out, `||` is a logical or; what
+    remains may not call system() or use `|` or `>` (pipes and output
+    redirection; `>=` is a comparison).
+    """
+    code = []
+    previous = ''
+    index = 0
+    while index < len(program):
+        char = program[index]
+        # A slash where an operand is expected opens a regex, elsewhere it divides
+        if char == '"' or (char == '/' and previous in ('', '(', ',', '~', '!', '&', '|', '{', '}', ';')):
+            index += 1
+            while index < len(program) and program[index] != char:
+                index += 2 if program[index] == '\\' else 1
+            code.append(char * 2)
+            previous = char
+        else:
+            code.append(char)
+            if not char.isspace():
+                previous = char
+        index += 1
+    code = ''.join(code).replace('||', '')
+    if re.search(r'\bsystem\s*\(', code) or '|' in code or re.search(r'>(?!=)', code):
+        raise ValueError("awk programs that run commands or write files are not allowed")
+
+def _short_options(arg: str, value_options: str) -> str:
+    """Option letters of a short option cluster (-tuln), up to one that takes a value"""
+    if not arg.startswith('-') or arg.startswith('--') or arg == '-':
+        return ''
+    letters = ''
+    for letter in arg[1:]:
+        letters += letter
+        if letter in value_options:
+            break
+    return letters
+
+def _audit_iptables(argv: List[str]) -> None:
+    """Reject iptables/ip6tables invocations other than listing rules"""
+    listing = False
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in IPTABLES_LIST_COMMANDS:
+            listing = True
+        elif arg in ('-t', '--table'):
+            next(args, None)
+        elif arg in IPTABLES_LIST_OPTIONS:
+            continue
+        elif arg.startswith('-') and not arg.startswith('--') and set(arg[1:]) <= set('LSnvx'):
+            listing = listing or bool(set(arg[1:]) & set('LS'))
+        elif arg.startswith('-'):
+            raise ValueError(f"{argv[0]} {arg} is not allowed, only listing rules")
+    if not listing:
+        raise ValueError(f"{argv[0]} may only list rules (-L/-S)")
+
+def _audit_program(argv: List[str]) -> None:
+    """Reject a pipeline stage that is not an allow-listed program used read-only"""
+    program = argv[0]
+    if program not in AUDIT_COMMAND_PROGRAMS:
+        raise ValueError(f"'{program}' is not an allowed audit program")
+    if program == 'find' and any(arg in AUDIT_FIND_ACTIONS for arg in argv):
+        raise ValueError("find actions that run programs or write files are not allowed")
+    if program == 'awk':
+        args = iter(argv[1:])
+        for arg in args:
+            if arg in AWK_OPTIONS:
+                next(args, None)
+            elif arg[:2] in AWK_OPTIONS and len(arg) > 2:
+                continue
+            elif arg.startswith('-') and arg != '--':
+                raise ValueError(f"awk option {arg} is not allowed")
+            else:
+                program_text = next(args, '') if arg == '--' else arg
+                _audit_awk_program(program_text)
+                break
+    if program == 'sort':
+        for arg in argv[1:]:
+            if arg.startswith(('--output', '--compress-program')) or 'o' in _short_options(arg, SORT_VALUE_OPTIONS):
+                raise ValueError("sort options that write files or run programs are not allowed")
+    if program == 'uniq':
+        operands = []
+        args = iter(argv[1:])
+        for arg in args:
+            if arg in UNIQ_VALUE_OPTIONS:
+                next(args, None)
+            elif not arg.startswith('-') or arg == '-':
+                operands.append(arg)
+        if len(operands) > 1:
+            raise ValueError("uniq with an output file is not allowed")
+    if program == 'ss' and any(arg.startswith(('--kill', '--diag')) or set(_short_options(arg, '')) & set(SS_WRITE_OPTIONS)
+                               for arg in argv[1:]):
+        raise ValueError("ss options that kill sockets or write files are not allowed")
+    if program in ('iptables', 'ip6tables'):
+        _audit_iptables(argv)
+    if program == 'nft':
+        words = [arg for arg in argv[1:] if arg not in NFT_READ_OPTIONS]
+        if not words or words[0] != 'list' or any(arg.startswith('-') or ';' in arg or '\n' in arg for arg in words):
+            raise ValueError("nft may only list (nft list ...)")
+    if program == 'ufw' and (len(argv) < 2 or argv[1] not in UFW_READ_COMMANDS):
+        raise ValueError(f"ufw may only run {' or '.join(UFW_READ_COMMANDS)}")
+    if program == 'xargs':
+        index = 1
+        while index < len(argv) and argv[index].startswith('-'):
+            index += 2 if argv[index] in XARGS_VALUE_OPTIONS else 1
+        if index >= len(argv) or argv[index] == 'xargs':
+            raise ValueError("xargs must name the program it runs")
+        _audit_program(argv[index:])
+
+def parse_audit_command(command: str) -> List[Tuple[List[str], bool]]:
+    """Split an audit command into pipeline stages of (argv, stderr discarded)
+    
+    Only what can run without a shell is accepted: words, single and double
+    quotes, backslash escapes, `|` and `2>/dev/null`. Anything else (lists,
+    other redirections, expansions, loops), a program outside
+    AUDIT_COMMAND_PROGRAMS or one used in a way that can change the system
+    (see _audit_program) raises ValueError.
+    """
+    stages, argv, word = [], [], []
+    in_word = quiet = False
+    quote = None
+    index = 0
+    while index < len(command):
+        char = command[index]
+        if quote == "'":
+            if char == "'":
+                quote = None
+            else:
+                word.append(char)
+        elif quote == '"':
+            if char == '"':
+                quote = None
+            elif char == '\\' and command[index + 1:index + 2] in ('"', '\\', '$', '`'):
+                index += 1
+                word.append(command[index])
+            elif char in '$`':
+                raise ValueError("shell expansion is not supported")
+            else:
+                word.append(char)
+        elif char in '\'"':
+            quote = char
+            in_word = True
+        elif char == '\\':
+            index += 1
+            word.append(command[index:index + 1])
+            in_word = True
+        elif char.isspace() or char == '|':
+            if in_word:
+                argv.append(''.join(word))
+                word, in_word = [], False
+            if char == '|':
+                if command[index + 1:index + 2] == '|' or not argv:
+                    raise ValueError("'||' and empty pipeline stages are not supported")
+                stages.append((argv, quiet))
+                argv, quiet = [], False
+        elif not in_word and command.startswith('2>/dev/null', index):
+            quiet = True
+            index += len('2>/dev/null') - 1
+        elif char in ';&<>()$`*?[' or (char == '~' and not in_word):
+            raise ValueError(f"shell syntax {char!r} is not supported")
+        else:
+            word.append(char)
+            in_word = True
+        index += 1
+    
+    if quote is not None:
+        raise ValueError("unterminated quote")
+    if in_word:
+        argv.append(''.join(word))
+    if not argv:
+        raise ValueError("empty pipeline stage")
+    stages.append((argv, quiet))
+    for argv, _ in stages:
+        _audit_program(argv)
+    return stages
+
+# Every result is appended here and flushed as soon as its control finishes,
+# so an interrupted scan keeps what it checked and log shippers can tail it
+RESULTS_STREAM_FILE = 'vijenex-cis-results.jsonl'
+
+class ResultStream:
+    """JSON Lines result sink that the HTML and CSV reports are built from
+    
+    Results are not held in memory: write() appends one record per control and
+    flushes it, iterating reads the records back from disk. Only per-status
+    counts are kept. Each record carries the milestone it came from so update()
+    can replace individual results in place.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.counts = {}
+        self._file = None
+    
+    def open(self) -> None:
+        """Start a new stream, discarding the records of a previous scan"""
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w')
+        self.counts = {}
+    
+    def write(self, milestone_file: str, result: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(dict(result, milestone=milestone_file), default=str) + '\n')
+        self._file.flush()
+        self.counts[result["status"]] = self.counts.get(result["status"], 0) + 1
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def update(self, replacements: Dict[str, Dict[str, Any]]) -> None:
+        """Rewrite the stream with the results of the given "milestone:id" keys replaced"""
+        self.close()
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        counts = {}
+        with open(temp_path, 'w') as f:
+            for record in self:
+                key = f"{record['milestone']}:{record['id']}"
+                if key in replacements:
+                    record = dict(replacements[key], milestone=record['milestone'])
+                f.write(json.dumps(record, default=str) + '\n')
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+        os.replace(temp_path, self.path)
+        self.counts = counts
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        try:
+            f = open(self.path, 'r')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                # A torn last line from an interrupted write is not a result
+                if line.endswith('\n'):
+                    yield json.loads(line)
+    
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+# --profile-scan output: every control's costs (sortable CSV) and a summary of
+# the slowest controls, check types and commands
+PROFILE_CSV_FILE = 'vijenex-cis-profile.csv'
+PROFILE_REPORT_FILE = 'vijenex-cis-profile.txt'
+PROFILE_TOP = 20
+
+class ScanProfiler:
+    """Per-control cost accounting for --profile-scan
+    
+    measure() runs one control and records its wall and CPU time. While it
+    runs, subprocesses and file reads made on the same thread are charged to
+    it. Facts are gathered once per scan, so a command or file shared by
+    several controls is charged to the first control that needed it.
+    """
+    
+    def __init__(self):
+        self.records = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def start(self) -> None:
+        self.records = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    def stop(self) -> None:
+        self.elapsed = time.perf_counter() - self.started
+    
+    def measure(self, milestone_file: str, control: Dict[str, Any], func, *args) -> Any:
+        """Call func(*args) on behalf of control and record what it cost"""
+        record = {
+            "milestone": milestone_file,
+            "id": control.get('id', 'Unknown'),
+            "type": control.get('type', 'Manual'),
+            "wall_time": 0.0,
+            "cpu_time": 0.0,
+            "subprocess_time": 0.0,
+            "subprocesses": 0,
+            "bytes_read": 0,
+            "commands": [],
+        }
+        self._local.record = record
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            return func(*args)
+        finally:
+            record["cpu_time"] = time.thread_time() - cpu_start
+            record["wall_time"] = time.perf_counter() - wall_start
+            self._local.record = None
+            with self._lock:
+                self.records.append(record)
+    
+    def add_command(self, command: str, elapsed: float, output_bytes: int) -> None:
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            record["subprocesses"] += 1
+            record["subprocess_time"] += elapsed
+            record["bytes_read"] += output_bytes
+            record["commands"].append((command, elapsed))
+    
+    def add_bytes(self, count: int) -> None:
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            record["bytes_read"] += count
+
+# --root: control types that only read files, so they can be evaluated against
+# a mounted image or an unpacked container rootfs. All other types inspect the
+# running system (kernel parameters, mounts, services, firewall and AppArmor
+# state) and are reported as NOT_APPLICABLE.
+OFFLINE_CONTROL_TYPES = frozenset([
+    'FilePermission', 'Package', 'MultiPackage', 'ConfigFile', 'FileContent', 'KernelModule', 'BootParameter', 'MTALocalOnly',
+    'SSHPrivateKeys', 'SSHPublicKeys', 'SSHDConfig', 'SudoConfig', 'PAMConfig', 'JournaldConfig', 'RsyslogConfig',
+    'LogFilePermissions', 'AuditdConfig', 'AuditRule', 'AuditLogPermissions', 'AIDEConfig', 'WorldWritableFiles',
+    'OrphanedFiles', 'ShadowedPasswords', 'EmptyPasswords', 'GroupConsistency', 'EmptyGroup', 'DuplicateUIDs',
+    'DuplicateGIDs', 'DuplicateUsernames', 'DuplicateGroupnames', 'UserHomeDirs', 'UserDotFiles', 'Manual',
+])
+
+def _not_installed_default(control: Dict[str, Any]) -> bool:
+    # Some milestones say expected_state: not_installed instead of should_be_installed
+    return control.get('expected_state') != 'not_installed'
+
+# Dispatch table of execute_control: control type -> (scanner method,
+# parameters, facts). Parameters are passed positionally, each as (milestone
+# key or keys tried in order, default or a function of the control giving it).
+# Facts are the ScanContext methods a check reads through, as (method,
+# parameter holding its input, key of the input in each item of a list);
+# with --jobs they are gathered before the controls run (see prefetch).
+CONTROL_CHECKS = types.MappingProxyType({
+    'FilePermission': ('check_file_permissions', (
+        ('file_path', ''), ('expected_mode', ''), ('expected_owner', None), ('expected_group', None)), ()),
+    # Some milestones spell these as service / expected_state
+    'Service': ('check_service_status', (
+        (('service_name', 'service'), ''), (('expected_status', 'expected_state'), '')),
+        (('unit_file_states',), ('unit_active_states',))),
+    'KernelParameter': ('check_kernel_parameter', (
+        ('parameter', ''), ('expected_value', '')), (('sysctl', 'parameter'),)),
+    'Package': ('check_package_installed', (
+        (('package_name', 'package'), ''), ('should_be_installed', _not_installed_default)), (('packages',),)),
+    'ConfigFile': ('check_config_file', (
+        ('file_path', ''), ('pattern', ''), ('expected_match', True)), (('read_file', 'file_path'),)),
+    # file_path may list several files separated by spaces
+    'FileContent': ('check_file_content', (
+        ('file_path', ''), ('pattern', ''), ('expected_result', 'found')), ()),
+    'KernelModule': ('check_kernel_module', (
+        ('module_name', ''), ('expected_status', '')), (('kernel_modules',),)),
+    'MountOption': ('check_mount_option', (
+        ('mount_point', ''), ('required_option', '')), (('mounts',),)),
+    'MountPoint': ('check_mount_point', (
+        ('mount_point', ''), ('expected_status', '')), (('mounts',),)),
+    'BootParameter': ('check_boot_parameters', (
+        ('parameters', []), ('config_file', '/etc/default/grub')), (('read_file', 'config_file'),)),
+    'AppArmorProfile': ('check_apparmor_profiles', (
+        ('expected_modes', []), ('check_unconfined', False)), ()),
+    'CoreDumpRestriction': ('check_core_dump_restriction', (
+        ('expected_setting', ''), ('limits_files', [])), ()),
+    'ServiceNotInUse': ('check_service_not_in_use', (
+        ('service_names', []), ('package_names', [])),
+        (('packages',), ('unit_file_states',), ('unit_active_states',))),
+    'MTALocalOnly': ('check_mta_local_only', (
+        ('config_file', ''), ('expected_setting', '')), (('read_file', 'config_file'),)),
+    'WirelessInterface': ('check_wireless_interface', (('expected_status', ''),), ()),
+    'MultiKernelParameter': ('check_multi_kernel_parameters', (
+        ('parameters', []),), (('sysctl', 'parameters', 'name'),)),
+    'SingleFirewall': ('check_single_firewall', (('firewall_utilities', []),), ()),
+    'UFWStatus': ('check_ufw_status', (('expected_status', ''),), ()),
+    'UFWLoopback': ('check_ufw_loopback', (('expected_rules', []),), ()),
+    'UFWOpenPorts': ('check_ufw_open_ports', (('check_open_ports', False),), ()),
+    'UFWDefaultPolicy': ('check_ufw_default_policy', (('expected_policies', {}),), ()),
+    'NftablesTable': ('check_nftables_table', (('expected_families', []),), ()),
+    'NftablesBaseChains': ('check_nftables_base_chains', (('required_hooks', []),), ()),
+    'SSHPrivateKeys': ('check_ssh_private_keys', (
+        ('key_pattern', ''), ('expected_mode', ''), ('expected_owner', ''), ('expected_group', '')), ()),
+    'SSHPublicKeys': ('check_ssh_public_keys', (
+        ('key_pattern', ''), ('expected_mode', ''), ('expected_owner', ''), ('expected_group', '')), ()),
+    'SSHDConfig': ('check_sshd_config', (
+        ('config_file', ''), ('check_parameters', []), ('expected_values', {}), ('require_one_of', False),
+        ('validate_crypto', False)), (('sshd_config', 'config_file'),)),
+    'SudoConfig': ('check_sudo_config', (
+        ('config_files', []), ('required_setting', ''), ('prohibited_setting', '')), ()),
+    'PAMConfig': ('check_pam_config', (
+        ('config_file', ''), ('required_setting', '')), (('pam_stack', 'config_file'),)),
+    'SingleLoggingSystem': ('check_single_logging_system', (
+        ('logging_services', []),), (('unit_active_states',),)),
+    'JournaldConfig': ('check_journald_config', (
+        ('config_file', ''), ('parameter', ''), ('expected_value', '')), (('read_file', 'config_file'),)),
+    'RsyslogConfig': ('check_rsyslog_config', (
+        ('config_files', []), ('prohibited_directives', [])), ()),
+    'LogFilePermissions': ('check_log_file_permissions', (
+        ('log_directory', ''), ('expected_file_permissions', ''), ('expected_dir_permissions', '')), ()),
+    'MultiPackage': ('check_multi_packages', (
+        ('package_names', []), ('should_be_installed', True)), (('packages',),)),
+    'AuditdConfig': ('check_auditd_config', (
+        ('config_file', ''), ('parameter', ''), ('expected_value', ''), ('check_configured', False)),
+        (('read_file', 'config_file'),)),
+    'AuditRule': ('check_audit_rule', (
+        ('rule_file', ''), ('expected_rules', [])), (('read_file', 'rule_file'),)),
+    'AuditLogPermissions': ('check_audit_log_permissions', (
+        ('log_directory', ''), ('expected_file_mode', ''), ('expected_owner', ''), ('expected_group', '')), ()),
+    'CronJob': ('check_cron_job', (
+        ('cron_user', ''), ('expected_job', ''), ('job_description', '')), ()),
+    'AIDEConfig': ('check_aide_config', (
+        ('config_file', ''), ('monitored_tools', [])), (('read_file', 'config_file'),)),
+    'WorldWritableFiles': ('check_world_writable_files', (
+        ('search_paths', []), ('exclude_paths', [])), ()),
+    'OrphanedFiles': ('check_orphaned_files', (
+        ('search_paths', []), ('exclude_paths', [])), (('known_ids',),)),
+    'ShadowedPasswords': ('check_shadowed_passwords', (('passwd_file', ''),), (('passwd', 'passwd_file'),)),
+    'EmptyPasswords': ('check_empty_passwords', (('shadow_file', ''),), (('shadow', 'shadow_file'),)),
+    'GroupConsistency': ('check_group_consistency', (
+        ('passwd_file', ''), ('group_file', '')), (('passwd', 'passwd_file'), ('group', 'group_file'))),
+    'EmptyGroup': ('check_empty_group', (
+        ('group_name', ''), ('group_file', '')), (('group', 'group_file'),)),
+    'DuplicateUIDs': ('check_duplicate_uids', (('passwd_file', ''),), (('passwd', 'passwd_file'),)),
+    'DuplicateGIDs': ('check_duplicate_gids', (('group_file', ''),), (('group', 'group_file'),)),
+    'DuplicateUsernames': ('check_duplicate_usernames', (('passwd_file', ''),), (('passwd', 'passwd_file'),)),
+    'DuplicateGroupnames': ('check_duplicate_groupnames', (('group_file', ''),), (('group', 'group_file'),)),
+    'UserHomeDirs': ('check_user_home_dirs', (
+        ('passwd_file', ''), ('min_uid', 1000)), (('passwd', 'passwd_file'),)),
+    'UserDotFiles': ('check_user_dot_files', (
+        ('passwd_file', ''), ('min_uid', 1000), ('max_permissions', 'go-w')), (('passwd', 'passwd_file'),)),
+    'CommandOutputEmpty': ('check_command_output_empty', (
+        ('audit_command', ''), ('expected', 'No output from the audit command')),
+        (('audit_command', 'audit_command'),)),
+})
+
+def resolve_check(control: Dict[str, Any]) -> Tuple[Optional[str], tuple, tuple]:
+    """Bind a control to its entry in CONTROL_CHECKS
+    
+    Returns the scanner method (None for Manual and unknown types), its
+    arguments and the facts to prefetch as (ScanContext method, input) pairs,
+    input being None for facts without one.
+    """
+    entry = CONTROL_CHECKS.get(control.get('type', 'Manual'))
+    if entry is None:
+        return None, (), ()
+    method, parameters, facts = entry
+    
+    args, by_name = [], {}
+    for keys, default in parameters:
+        keys = (keys,) if isinstance(keys, str) else keys
+        present = [key for key in keys if key in control]
+        if present:
+            value = control[present[0]]
+        else:
+            value = default(control) if callable(default) else default
+        args.append(value)
+        by_name[keys[0]] = value
+    
+    inputs = []
+    for fact in facts:
+        if len(fact) == 1:
+            inputs.append((fact[0], None))
+            continue
+        values = by_name[fact[1]]
+        if not isinstance(values, list):
+            values = [values]
+        if len(fact) == 3:
+            values = [item.get(fact[2]) for item in values if isinstance(item, dict)]
+        inputs.extend((fact[0], value) for value in values if value and isinstance(value, str))
+    return method, tuple(args), tuple(inputs)
+
+# Same limit as the kernel's for nested symlink resolution
+MAX_SYMLINK_HOPS = 40
+
+def resolve_in_root(root: str, path: str, readlink=None) -> str:
+    """Host path of `path` inside the tree at root, resolving symlinks as chroot(root) would
+    
+    Absolute link targets and '..' are interpreted relative to root and can
+    never leave it, so links such as /etc/alternatives/* in an image do not
+    escape to the host. Missing components are kept as they are. A readlink
+    other than os.readlink resolves inside that filesystem view instead
+    (an ImageIndex, with root "/").
+    """
+    if readlink is None:
+        if root == '/':
+            return os.path.realpath(path)
+        readlink = os.readlink
+    
+    parts = [part for part in path.split('/') if part not in ('', '.')]
+    resolved = []
+    hops = 0
+    while parts:
+        part = parts.pop(0)
+        if part == '..':
+            if resolved:
+                resolved.pop()
+            continue
+        try:
+            target = readlink(os.path.join(root, *resolved, part))
+        except OSError:
+            # Not a symlink, or does not exist
+            resolved.append(part)
+            continue
+        hops += 1
+        if hops > MAX_SYMLINK_HOPS:
+            raise OSError(errno.ELOOP, os.strerror(errno.ELOOP), path)
+        if target.startswith('/'):
+            resolved = []
+        parts = [item for item in target.split('/') if item not in ('', '.')] + parts
+    return os.path.join(root, *resolved)
+
+def logical_path(root: str, host_path: str) -> str:
+    """Path as seen from inside the tree at root (inverse of resolve_in_root for reporting)"""
+    if root == '/':
+        return host_path
+    relative = os.path.relpath(host_path, root)
+    return '/' if relative == '.' else '/' + relative
+
+# --image: regular files whose contents are kept while indexing an image
+# (configuration the checks read); everything else is indexed by metadata only
+IMAGE_CONTENT_PATHS = ('/etc/', '/usr/etc/', '/boot/grub/', '/lib/modprobe.d/', '/usr/lib/modprobe.d/',
+                       '/usr/lib/os-release', DPKG_STATUS_FILE)
+IMAGE_CONTENT_NAMES = ('modules.dep', 'modules.builtin')
+IMAGE_CONTENT_LIMIT = 16 * 1024 * 1024
+
+# Manifests and configs of docker save / OCI archives are small JSON documents
+IMAGE_JSON_LIMIT = 4 * 1024 * 1024
+
+WHITEOUT_PREFIX = '.wh.'
+WHITEOUT_OPAQUE = '.wh..wh..opq'
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+TAR_FILE_TYPES = {
+    tarfile.REGTYPE: stat.S_IFREG, tarfile.AREGTYPE: stat.S_IFREG, tarfile.CONTTYPE: stat.S_IFREG,
+    tarfile.DIRTYPE: stat.S_IFDIR, tarfile.SYMTYPE: stat.S_IFLNK, tarfile.CHRTYPE: stat.S_IFCHR,
+    tarfile.BLKTYPE: stat.S_IFBLK, tarfile.FIFOTYPE: stat.S_IFIFO,
+}
+
+def image_member_path(name: str) -> str:
+    """Absolute path of a layer member ('./etc/passwd' -> '/etc/passwd')"""
+    return os.path.normpath('/' + name.lstrip('/'))
+
+class _ImageDirEntry:
+    """os.DirEntry counterpart for ImageIndex.scandir"""
+    
+    __slots__ = ('name', 'path', '_index')
+    
+    def __init__(self, index, directory: str, name: str):
+        self._index = index
+        self.name = name
+        self.path = os.path.join(directory, name)
+    
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        return self._index.stat(self.path) if follow_symlinks else self._index.lstat(self.path)
+
+class _ImageScandirIterator(list):
+    """os.scandir iterator counterpart: the entries, usable as a context manager"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+class _ReplayStream:
+    """Read-only stream that returns already consumed bytes before the rest of a file"""
+    
+    def __init__(self, head: bytes, fileobj):
+        self._head = head
+        self._file = fileobj
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data, self._head = self._head + self._file.read(), b''
+            return data
+        data, self._head = self._head[:size], self._head[size:]
+        if len(data) < size:
+            data += self._file.read(size - len(data))
+        return data
+
+class ImageIndex:
+    """In-memory view of a container image's merged filesystem, built without extracting it
+    
+    Layers are applied in order with their whiteouts: '.wh.<name>' deletes
+    <name> from the layers below and '.wh..wh..opq' empties its directory.
+    Every path keeps its metadata (mode, owner, size, symlink target), and
+    regular files under IMAGE_CONTENT_PATHS keep their contents. Implements
+    the subset of os and os.path the checks use (stat, lstat, readlink,
+    listdir, scandir, walk, exists, isdir, isfile) on paths inside the image.
+    """
+    
+    def __init__(self, source: str):
+        self.source = source
+        self._nodes = {'/': os.stat_result((stat.S_IFDIR | 0o755, 1, 0, 1, 0, 0, 0, 0, 0, 0))}
+        self._links = {}
+        self._children = {'/': set()}
+        self._contents = {}
+        self._next_ino = 2
+        self.layers = 0
+    
+    def add_layer(self, changes: List[Tuple]) -> None:
+        """Apply one layer's changes (from read_image_layer) on top of the layers already added"""
+        # Whiteouts only hide what the layers below provide
+        for change in changes:
+            if change[0] == 'opaque':
+                for name in list(self._children.get(change[1], ())):
+                    self._remove(os.path.join(change[1], name))
+            elif change[0] == 'whiteout':
+                self._remove(change[1])
+        for change in changes:
+            if change[0] == 'entry':
+                self._add(*change[1:])
+        self.layers += 1
+    
+    def _add(self, path: str, mode: int, uid: int, gid: int, size: int, mtime: int,
+             linkname: str, content: Optional[bytes], hardlink: bool) -> None:
+        if hardlink:
+            # Hard links share the metadata and contents of their target
+            target = image_member_path(linkname)
+            if target not in self._nodes:
+                return
+            self._set(path, self._nodes[target], None, self._contents.get(target))
+            return
+        previous = self._nodes.get(path)
+        if previous is not None and (stat.S_ISDIR(previous.st_mode) != stat.S_ISDIR(mode) or not stat.S_ISDIR(mode)):
+            self._remove(path)
+        st = os.stat_result((mode, self._next_ino, 0, 1, uid, gid, size, mtime, mtime, mtime),
+                            {'st_mtime_ns': mtime * 1000000000})
+        self._next_ino += 1
+        self._set(path, st, linkname if stat.S_ISLNK(mode) else None, content)
+    
+    def _set(self, path: str, st: os.stat_result, linkname: Optional[str], content: Optional[bytes]) -> None:
+        parent = os.path.dirname(path)
+        if parent not in self._nodes:
+            # Layers may omit parent directories
+            self._set(parent, os.stat_result((stat.S_IFDIR | 0o755, 0, 0, 1, 0, 0, 0, 0, 0, 0)), None, None)
+        if path != '/':
+            self._children.setdefault(parent, set()).add(os.path.basename(path))
+        self._nodes[path] = st
+        if stat.S_ISDIR(st.st_mode):
+            self._children.setdefault(path, set())
+        if linkname is not None:
+            self._links[path] = linkname
+        if content is not None:
+            self._contents[path] = content
+    
+    def _remove(self, path: str) -> None:
+        for name in self._children.pop(path, ()):
+            self._remove(os.path.join(path, name))
+        if self._nodes.pop(path, None) is not None:
+            self._children.get(os.path.dirname(path), set()).discard(os.path.basename(path))
+        self._links.pop(path, None)
+        self._contents.pop(path, None)
+    
+    def resolve(self, path: str) -> str:
+        """path with every symlink resolved inside the image"""
+        return resolve_in_root('/', path, self.readlink)
+    
+    def readlink(self, path: str) -> str:
+        try:
+            return self._links[os.path.normpath(path)]
+        except KeyError:
+            raise OSError(errno.EINVAL, os.strerror(errno.EINVAL), path)
+    
+    def lstat(self, path: str) -> os.stat_result:
+        try:
+            return self._nodes[os.path.normpath(path)]
+        except KeyError:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+    
+    def stat(self, path: str) -> os.stat_result:
+        return self.lstat(self.resolve(path))
+    
+    def listdir(self, path: str) -> List[str]:
+        path = self.resolve(path)
+        if not stat.S_ISDIR(self.lstat(path).st_mode):
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        return sorted(self._children[path])
+    
+    def scandir(self, path: str) -> _ImageScandirIterator:
+        return _ImageScandirIterator(_ImageDirEntry(self, path, name) for name in self.listdir(path))
+    
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """os.walk (top-down, symlinks not followed)"""
+        try:
+            names = self.listdir(top)
+        except OSError:
+            return
+        dirs = [name for name in names if stat.S_ISDIR(self.lstat(os.path.join(top, name)).st_mode)]
+        files = [name for name in names if name not in dirs]
+        yield top, dirs, files
+        for name in dirs:
+            yield from self.walk(os.path.join(top, name))
+    
+    def glob(self, pattern: str) -> List[str]:
+        """glob.glob for an absolute pattern"""
+        matches = ['/']
+        for part in [item for item in pattern.split('/') if item]:
+            found = []
+            for directory in matches:
+                if glob.has_magic(part):
+                    try:
+                        names = self.listdir(directory)
+                    except OSError:
+                        continue
+                    found.extend(os.path.join(directory, name) for name in fnmatch.filter(names, part)
+                                 if not name.startswith('.') or part.startswith('.'))
+                elif self.exists(os.path.join(directory, part)):
+                    found.append(os.path.join(directory, part))
+            matches = found
+        return [] if matches == ['/'] else matches
+    
+    def exists(self, path: str) -> bool:
+        try:
+            self.stat(path)
+        except OSError:
+            return False
+        return True
+    
+    def isdir(self, path: str) -> bool:
+        try:
+            return stat.S_ISDIR(self.stat(path).st_mode)
+        except OSError:
+            return False
+    
+    def isfile(self, path: str) -> bool:
+        try:
+            return stat.S_ISREG(self.stat(path).st_mode)
+        except OSError:
+            return False
+    
+    def read(self, path: str) -> str:
+        """Contents of a regular file (raises OSError like open() if they were not kept)"""
+        path = self.resolve(path)
+        st = self.lstat(path)
+        if stat.S_ISDIR(st.st_mode):
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        content = self._contents.get(path)
+        if content is None:
+            if st.st_size:
+                raise OSError(errno.ENODATA, "contents not kept when indexing the image", path)
+            content = b''
+        return content.decode('utf-8', errors='ignore')
+
+def read_image_layer(fileobj) -> List[Tuple]:
+    """One layer tarball (plain or gzip, read as a stream) as a list of changes for ImageIndex.add_layer"""
+    changes = []
+    with tarfile.open(fileobj=fileobj, mode='r|*') as layer:
+        for member in layer:
+            path = image_member_path(member.name)
+            directory, name = os.path.split(path)
+            if name == WHITEOUT_OPAQUE:
+                changes.append(('opaque', directory))
+            elif name.startswith(WHITEOUT_PREFIX):
+                changes.append(('whiteout', os.path.join(directory, name[len(WHITEOUT_PREFIX):])))
+            elif member.islnk():
+                changes.append(('entry', path, 0, 0, 0, 0, 0, member.linkname, None, True))
+            elif member.type in TAR_FILE_TYPES or member.isreg():
+                mode = TAR_FILE_TYPES.get(member.type, stat.S_IFREG) | (member.mode & 0o7777)
+                content = None
+                if (member.isreg() and member.size <= IMAGE_CONTENT_LIMIT
+                        and (path.startswith(IMAGE_CONTENT_PATHS) or name in IMAGE_CONTENT_NAMES)):
+                    content = layer.extractfile(member).read()
+                changes.append(('entry', path, mode, member.uid, member.gid, member.size, int(member.mtime),
+                                member.linkname, content, False))
+    return changes
+
+def image_layer_order(documents: Dict[str, Any]) -> List[str]:
+    """Archive member names of an image's layers, bottom first
+    
+    `docker save` archives list them in manifest.json; OCI image layouts in
+    the manifest that index.json points to (the first one for this
+    architecture when the index covers several platforms).
+    """
+    def blob(digest):
+        algorithm, _, value = digest.partition(':')
+        return f"blobs/{algorithm}/{value}"
+    
+    manifest = documents.get('manifest.json')
+    if isinstance(manifest, list) and manifest:
+        return [os.path.normpath(layer) for layer in manifest[0].get('Layers', [])]
+    
+    index = documents.get('index.json')
+    while isinstance(index, dict) and 'manifests' in index:
+        machine = {'x86_64': 'amd64', 'aarch64': 'arm64'}.get(platform.machine(), platform.machine())
+        candidates = index['manifests']
+        matching = [m for m in candidates if m.get('platform', {}).get('architecture', machine) == machine]
+        if not (matching or candidates):
+            break
+        index = documents.get(blob((matching or candidates)[0]['digest']))
+    if isinstance(index, dict) and 'layers' in index:
+        return [blob(layer['digest']) for layer in index['layers']]
+    raise ValueError("no manifest.json or OCI index.json found; not a docker save or OCI image archive")
+
+def index_image(source: str) -> ImageIndex:
+    """Index a `docker save` or OCI image archive in a single streaming pass ('-' reads stdin)
+    
+    Nothing is written to disk: each layer is read from the archive as a
+    nested tar stream as it goes by, and the layers are merged in manifest
+    order once the archive (which may list its manifest last) has been read.
+    """
+    documents = {}
+    layers = {}
+    fileobj = sys.stdin.buffer if source == '-' else None
+    with tarfile.open(source if fileobj is None else None, mode='r|*', fileobj=fileobj) as archive:
+        for member in archive:
+            if not member.isreg():
+                continue
+            name = os.path.normpath(member.name)
+            f = archive.extractfile(member)
+            head = f.read(512)
+            if head.lstrip()[:1] in (b'{', b'[') and member.size <= IMAGE_JSON_LIMIT:
+                try:
+                    documents[name] = json.loads(head + f.read())
+                except ValueError:
+                    pass
+            elif head.startswith(ZSTD_MAGIC):
+                layers[name] = None
+            else:
+                try:
+                    layers[name] = read_image_layer(_ReplayStream(head, f))
+                except tarfile.TarError:
+                    continue
+    
+    image = ImageIndex('<stdin>' if source == '-' else os.path.abspath(source))
+    for name in image_layer_order(documents):
+        if name not in layers:
+            raise ValueError(f"layer {name} is missing from the archive")
+        if layers[name] is None:
+            raise ValueError(f"layer {name} is zstd-compressed, which is not supported")
+        image.add_layer(layers.pop(name))
+    return image
+
+class ScanContext:
+    """Point-in-time snapshot of system facts shared by all checks in a scan
+    
+    Python counterpart of the Go scanner's ScanContext. Each fact source
+    (command output, file contents, mount table) is gathered once, lazily on
+    first use, and reused by every control so that a scan sees one
+    consistent view of the host. Returned values must be treated as
+    read-only. Safe to share between --jobs worker threads.
+    
+    With a root other than "/", file facts are read from the filesystem tree
+    at root (see resolve_in_root) and keyed by their host paths. With an
+    image, they are read from its ImageIndex and keyed by paths inside it.
+    """
+    
+    def __init__(self, run_command, profiler: Optional[ScanProfiler] = None, throttle: Optional[LoadThrottle] = None,
+                 root: str = '/', image: Optional[ImageIndex] = None, run_audit_command=None):
+        self._run_command = run_command
+        self._run_audit_command = run_audit_command
+        self._profiler = profiler
+        self._throttle = throttle
+        self.root = root
+        self.image = image
+        # Where file metadata comes from: os/os.path, or the image index standing in for both
+        self._fs = os if image is None else image
+        self._fs_path = os.path if image is None else image
+        self._facts = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._local = threading.local()
+    
+    def fact(self, key: Any, loader) -> Any:
+        """Return the cached fact for key, gathering it with loader on first use"""
+        inputs = getattr(self._local, 'inputs', None)
+        if inputs is not None:
+            inputs.add(key)
+        try:
+            cached = self._facts[key]
+        except KeyError:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                if key not in self._facts:
+                    # Only the fact itself is an input: its fingerprint covers what the loader
+                    # reads, and e.g. /proc/self/mountinfo changes signature on every run
+                    self._local.inputs = None
+                    try:
+                        self._facts[key] = (loader(), None)
+                    except Exception as e:
+                        # Failures are part of the snapshot too
+                        self._facts[key] = (None, e)
+                    finally:
+                        self._local.inputs = inputs
+                cached = self._facts[key]
+        
+        value, error = cached
+        if error is not None:
+            raise error
+        return value
+    
+    def command(self, command: str) -> Tuple[str, str, int]:
+        """Output of a read-only system command, executed once per scan"""
+        return self.fact(("command", command), lambda: self._run_command(command))
+    
+    def audit_command(self, command: str) -> Tuple[str, str, int]:
+        """Output of a CommandOutputEmpty audit command (see parse_audit_command), executed once per scan"""
+        return self.fact(("audit_command", command), lambda: self._run_audit_command(command))
+    
+    def path(self, path: str) -> str:
+        """Host path of a path on the scanned filesystem (unchanged unless scanning a --root or --image)"""
+        if self.image is not None:
+            return self.image.resolve(path)
+        return path if self.root == '/' else resolve_in_root(self.root, path)
+    
+    def resolve(self, path: str) -> str:
+        """path with its symlinks resolved on the scanned filesystem, as seen from inside it"""
+        if self.image is not None:
+            return self.image.resolve(path)
+        return logical_path(self.root, resolve_in_root(self.root, path))
+    
+    def logical(self, host_path: str) -> str:
+        """Path as seen from inside the scanned filesystem, for evidence"""
+        return host_path if self.image is not None else logical_path(self.root, host_path)
+    
+    def stat(self, path: str) -> os.stat_result:
+        """os.stat of a path on the scanned filesystem"""
+        return self._fs.stat(self.path(path))
+    
+    def listdir(self, path: str) -> List[str]:
+        """os.listdir of a directory on the scanned filesystem"""
+        return self._fs.listdir(self.path(path))
+    
+    def isfile(self, path: str) -> bool:
+        """os.path.isfile on the scanned filesystem"""
+        return self._fs_path.isfile(self.path(path))
+    
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """os.walk of a directory on the scanned filesystem, with directory paths as seen from inside it"""
+        for dirpath, dirs, files in self._fs.walk(self.path(top)):
+            yield self.logical(dirpath), dirs, files
+    
+    def glob(self, pattern: str) -> List[str]:
+        """glob.glob on the scanned filesystem, returning paths as seen from inside it"""
+        if self.image is not None:
+            return self.image.glob(pattern)
+        if self.root == '/':
+            return glob.glob(pattern)
+        return [logical_path(self.root, path) for path in glob.glob(os.path.join(self.root, pattern.lstrip('/')))]
+    
+    def read_file(self, file_path: str) -> str:
+        """Contents of a file, read once per scan unless it changes (raises OSError like open())"""
+        file_path = self.path(file_path)
+        # Keyed by (inode, mtime, size) so a file rewritten mid-scan is read again
+        st = self._fs.stat(file_path)
+        def load():
+            if self.image is not None:
+                content = self.image.read(file_path)
+            else:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+            if self._profiler is not None:
+                self._profiler.add_bytes(len(content))
+            return content
+        return self.fact(("file", file_path, st.st_ino, st.st_mtime_ns, st.st_size), load)
+    
+    def exists(self, path: str) -> bool:
+        """os.path.exists, recorded as an input so --incremental and --watch notice files appearing"""
+        path = self.path(path)
+        return self.fact(("exists", path), lambda: self._fs_path.exists(path))
+    
+    def mounts(self) -> Dict[str, Dict[str, Any]]:
+        """Mounted filesystems keyed by mount point, parsed once from mountinfo"""
+        def load():
+            try:
+                mounts = parse_mountinfo(self.read_file(PROC_MOUNTINFO))
+            except OSError:
+                mounts = {}
+            if not mounts:
+                mounts = parse_proc_mounts(self.read_file('/proc/mounts'))
+            return types.MappingProxyType(mounts)
+        return self.fact("mounts", load)
+    
+    def packages(self) -> Dict[str, str]:
+        """Installed packages (name -> version), indexed once from the package database
+        
+        Debian/Ubuntu: /var/lib/dpkg/status is parsed directly.
+        RPM systems: a single bulk `rpm -qa` query.
+        """
+        def load():
+            if self._fs_path.exists(self.path(DPKG_STATUS_FILE)):
+                return types.MappingProxyType(parse_dpkg_status(self.read_file(DPKG_STATUS_FILE)))
+            
+            packages = {}
+            if self.image is not None:
+                # The RPM database cannot be queried without extracting it
+                return types.MappingProxyType(packages)
+            root_option = f"--root {shlex.quote(self.root)} " if self.root != '/' else ''
+            stdout, stderr, returncode = self.command(f"rpm {root_option}-qa --qf '%{{NAME}} %{{VERSION}}-%{{RELEASE}}\\n'")
+            if returncode == 0:
+                for line in stdout.splitlines():
+                    parts = line.split()
+                    if len(parts) == 2:
+                        packages.setdefault(parts[0], parts[1])
+            return types.MappingProxyType(packages)
+        return self.fact("packages", load)
+    
+    def package_version(self, package_name: str) -> Optional[str]:
+        """Installed version of a package, or None if it is not installed"""
+        return self.packages().get(package_name)
+    
+    def package_installed(self, package_name: str) -> bool:
+        """Whether a package is installed"""
+        return package_name in self.packages()
+    
+    def sysctl(self, parameter: str) -> Optional[str]:
+        """Runtime value of a kernel parameter, or None if it does not exist
+        
+        Values are read straight from /proc/sys instead of forking sysctl per
+        parameter. If /proc/sys cannot be read, a single bulk `sysctl -a`
+        snapshot is used instead.
+        """
+        def load():
+            path = sysctl_path(parameter)
+            if path is None:
+                return None
+            try:
+                with open(path, 'r') as f:
+                    return f.read().strip()
+            except FileNotFoundError:
+                if os.path.isdir(PROC_SYS):
+                    return None
+            except OSError:
+                pass
+            return self.sysctl_all().get(parameter)
+        return self.fact(("sysctl", parameter), load)
+    
+    def sysctl_all(self) -> Dict[str, str]:
+        """All kernel parameters from one `sysctl -a` call (fallback source)"""
+        def load():
+            values = {}
+            stdout, stderr, returncode = self.command("sysctl -a")
+            for line in stdout.splitlines():
+                name, sep, value = line.partition('=')
+                if sep:
+                    values[name.strip()] = value.strip()
+            return types.MappingProxyType(values)
+        return self.fact("sysctl_all", load)
+    
+    def unit_file_states(self) -> Optional[Dict[str, str]]:
+        """Unit file states from one `systemctl list-unit-files` call (None if unavailable)"""
+        def load():
+            stdout, stderr, returncode = self.command("systemctl list-unit-files --no-legend --no-pager")
+            if returncode != 0:
+                return None
+            states = {}
+            for line in stdout.splitlines():
+                parts = line.split()
+                if len(parts) >= 2:
+                    states[parts[0]] = parts[1]
+            return types.MappingProxyType(states)
+        return self.fact("unit_file_states", load)
+    
+    def unit_active_states(self) -> Optional[Dict[str, str]]:
+        """Active states of all loaded units from one `systemctl list-units --all` call"""
+        def load():
+            stdout, stderr, returncode = self.command("systemctl list-units --all --no-legend --no-pager --plain")
+            if returncode != 0:
+                return None
+            states = {}
+            for line in stdout.splitlines():
+                parts = line.split()
+                if len(parts) >= 3:
+                    states[parts[0]] = parts[2]
+            return types.MappingProxyType(states)
+        return self.fact("unit_active_states", load)
+    
+    def unit_enabled_state(self, unit: str) -> str:
+        """What `systemctl is-enabled` reports for a unit ('' if it has no unit file)"""
+        unit = systemd_unit_name(unit)
+        states = self.unit_file_states()
+        # Template instances resolve through their template, so ask systemctl
+        if states is None or (unit not in states and '@' in unit):
+            stdout, stderr, returncode = self.command(f"systemctl is-enabled {unit}")
+            return stdout.strip()
+        return states.get(unit, '')
+    
+    def unit_active_state(self, unit: str) -> str:
+        """What `systemctl is-active` reports for a unit"""
+        unit = systemd_unit_name(unit)
+        states = self.unit_active_states()
+        # Aliases (sshd.service for ssh.service) are listed under their unit's name, so ask systemctl
+        if states is None or unit not in states:
+            stdout, stderr, returncode = self.command(f"systemctl is-active {unit}")
+            return stdout.strip()
+        return states[unit]
+    
+    def kernel_modules(self) -> Dict[str, Any]:
+        """Kernel module index: loaded, available and builtin modules plus modprobe.d directives
+        
+        Built once from /proc/modules, modules.dep/modules.builtin of the running
+        kernel and a single pass over the modprobe.d directories. For a --root
+        tree nothing is loaded and every kernel installed in it counts.
+        """
+        def load():
+            def names(path, from_path):
+                try:
+                    content = self.read_file(path)
+                except OSError:
+                    return frozenset()
+                found = set()
+                for line in content.splitlines():
+                    field = line.split(':', 1)[0].split()
+                    if field:
+                        found.add(_module_name_from_path(field[0]) if from_path else module_key(field[0]))
+                return frozenset(found)
+            
+            if self.root == '/':
+                releases = [os.uname().release]
+            else:
+                try:
+                    releases = sorted(self.listdir(MODULES_ROOT))
+                except OSError:
+                    releases = []
+            
+            # Same precedence as modprobe: a file name in /etc overrides the vendor copies
+            conf_files = {}
+            for modprobe_dir in MODPROBE_DIRS:
+                try:
+                    for conf_file in sorted(self.listdir(modprobe_dir)):
+                        if conf_file.endswith('.conf'):
+                            conf_files.setdefault(conf_file, os.path.join(modprobe_dir, conf_file))
+                except OSError:
+                    continue
+            
+            install, blacklist = {}, set()
+            for conf_file in sorted(conf_files):
+                try:
+                    parse_modprobe_conf(self.read_file(conf_files[conf_file]), install, blacklist)
+                except OSError:
+                    continue
+            
+            return types.MappingProxyType({
+                "loaded": names('/proc/modules', False),
+                "available": frozenset().union(*[names(os.path.join(MODULES_ROOT, release, 'modules.dep'), True)
+                                                 for release in releases]),
+                "builtin": frozenset().union(*[names(os.path.join(MODULES_ROOT, release, 'modules.builtin'), True)
+                                               for release in releases]),
+                "install": types.MappingProxyType(install),
+                "blacklist": frozenset(blacklist),
+            })
+        return self.fact("kernel_modules", load)
+    
+    def tree_scan(self, search_paths: List[str], exclude_paths: List[str],
+                  evidence_limit: int = TREE_EVIDENCE_LIMIT) -> Dict[str, Tuple[int, Tuple[str, ...]]]:
+        """Tree predicates over search_paths, each filesystem walked at most once per scan
+        
+        A search path that an earlier one already covers on the same filesystem
+        (e.g. /var under / without a separate /var mount) is not walked again,
+        so counts stay exact when the milestone lists overlapping paths.
+        """
+        roots = []
+        for search_path in sorted(set(self.path(os.path.normpath(p)) for p in search_paths), key=len):
+            if not self._fs_path.isdir(search_path):
+                continue
+            if any(search_path.startswith(root.rstrip('/') + '/') and _same_filesystem_below(root, search_path, self._fs)
+                   for root in roots):
+                continue
+            roots.append(search_path)
+        
+        excludes = tuple(sorted(self.path(os.path.normpath(p)) for p in exclude_paths))
+        merged = {name: (0, ()) for name in TREE_PREDICATES}
+        for root in roots:
+            walk = functools.partial(walk_tree, root, list(excludes), self.known_ids()[0], self.known_ids()[1],
+                                     evidence_limit, self._throttle, self._fs)
+            # --low-impact walks run at the lowest priority without lowering the scanner's
+            found = self.fact(("tree", root, excludes, evidence_limit),
+                              walk if self._throttle is None else lambda: run_deprioritized(walk))
+            for name, (count, paths) in found.items():
+                total, evidence = merged[name]
+                paths = tuple(self.logical(path) for path in paths)
+                merged[name] = (total + count, (evidence + paths)[:evidence_limit])
+        return merged
+    
+    def pam_stack(self, config_file: str) -> PAMStack:
+        """The expanded stack of a PAM service file (see parse_pam_stack), built once per scan"""
+        return self.fact(("pam_stack", config_file), lambda: PAMStack(parse_pam_stack(config_file, self.read_file)))
+    
+    def sshd_config(self, config_file: str = SSHD_CONFIG_FILE) -> Tuple[str, Dict[str, str]]:
+        """Effective sshd settings (lowercase keyword -> value) and where they came from
+        
+        On this host that is a single `sshd -T` snapshot: what sshd enforces,
+        Includes and compiled-in defaults applied. When sshd cannot report it
+        (not installed, not root, no host keys) and for --root and --image
+        scans, config_file and its Includes are parsed instead (see
+        parse_sshd_config).
+        """
+        def load():
+            if self.root == '/':
+                sshd = shutil.which('sshd', path=AUDIT_COMMAND_PATH)
+                if sshd is not None:
+                    stdout, stderr, returncode = self.command(f"{sshd} -T -f {shlex.quote(config_file)}")
+                    if returncode == 0 and stdout.strip():
+                        return "sshd -T", types.MappingProxyType(parse_sshd_t(stdout))
+            return "sshd_config", types.MappingProxyType(parse_sshd_config(config_file, self.read_file, self.glob))
+        return self.fact(("sshd_config", config_file), load)
+    
+    def known_ids(self) -> Tuple[frozenset, frozenset]:
+        """UIDs and GIDs the name service knows about (what find -nouser/-nogroup consult)"""
+        def load():
+            if self.root != '/':
+                return (frozenset(int(uid) for uid in self.passwd()["by_id"] if uid.isdigit()),
+                        frozenset(int(gid) for gid in self.group()["by_id"] if gid.isdigit()))
+            return (frozenset(entry.pw_uid for entry in pwd.getpwall()),
+                    frozenset(entry.gr_gid for entry in grp.getgrall()))
+        return self.fact("known_ids", load)
+    
+    def passwd(self, passwd_file: str = '/etc/passwd') -> Dict[str, Any]:
+        """Account index of a passwd file (by_id is keyed by UID)"""
+        return self.fact(("passwd", self.path(passwd_file)), lambda: parse_account_db(self.read_file(passwd_file), id_field=2))
+    
+    def group(self, group_file: str = '/etc/group') -> Dict[str, Any]:
+        """Account index of a group file (by_id is keyed by GID, members lists secondary members)"""
+        return self.fact(("group", self.path(group_file)), lambda: parse_account_db(self.read_file(group_file), id_field=2, members_field=3))
+    
+    def shadow(self, shadow_file: str = '/etc/shadow') -> Dict[str, Any]:
+        """Account index of a shadow file"""
+        return self.fact(("shadow", self.path(shadow_file)), lambda: parse_account_db(self.read_file(shadow_file)))
+    
+    def record_inputs(self, func, *args) -> Tuple[Any, set]:
+        """Call func(*args) and return its result with the fact keys it read"""
+        outer = getattr(self._local, 'inputs', None)
+        self._local.inputs = inputs = set()
+        try:
+            return func(*args), inputs
+        finally:
+            self._local.inputs = outer
+            if outer is not None:
+                outer.update(inputs)
+    
+    def fingerprint(self, key: Any) -> Optional[str]:
+        """Digest of the current state of the input behind a fact key (used by --incremental)
+        
+        Files, account databases and the package database are compared by stat
+        signature without being read, everything else by the digest of its
+        freshly loaded value. None means the input could not be fingerprinted
+        (tree walks are not: see INCREMENTAL_CONTROL_TYPES).
+        """
+        kind = key[0] if isinstance(key, tuple) else key
+        try:
+            if kind in ("file", "passwd", "group", "shadow"):
+                value = file_signature(key[1])
+            elif kind == "packages":
+                value = [file_signature(self.path(path)) for path in PACKAGE_DB_FILES]
+            elif kind == "exists":
+                value = os.path.exists(key[1])
+            elif kind in ("command", "audit_command", "sysctl", "sshd_config", "pam_stack"):
+                value = getattr(self, kind)(key[1])
+            else:
+                value = getattr(self, kind)()
+        except Exception:
+            return None
+        return stable_digest(value)
+
 class LinuxCISScanner:
     """Main Linux CIS compliance scanner engine"""
     
-    def __init__(self, output_dir: str = None, profile: str = "Level1"):
+    def __init__(self, output_dir: str = None, profile: str = "Level1", jobs: int = 1,
+                 evidence_limit: int = TREE_EVIDENCE_LIMIT, incremental: bool = False,
+                 profile_scan: bool = False, low_impact: bool = False, max_load: float = LOW_IMPACT_MAX_LOAD,
+                 max_io_util: float = LOW_IMPACT_MAX_IO_UTIL, root: str = '/', image: Optional[ImageIndex] = None):
         # Use explicit output_dir if provided, otherwise use default
         if output_dir is None:
             output_dir = "./reports"
             
         self.output_dir = Path(output_dir)
         self.profile = profile
-        self.results = []
+        self.jobs = max(1, jobs)
+        self.incremental = incremental
+        self.evidence_limit = max(0, evidence_limit)
+        # Filesystem tree to evaluate file-based controls against ("/" = this host),
+        # or the indexed image archive standing in for one
+        self.image = image
+        self.root = image.source if image is not None else os.path.abspath(root)
+        self.results = ResultStream(self.output_dir / RESULTS_STREAM_FILE)
+        self._result_status = {}
+        self._control_inputs = {}
+        self.profiler = ScanProfiler() if profile_scan else None
+        self.throttle = LoadThrottle(max_load, max_io_util) if low_impact else None
+        if low_impact:
+            # Idle IO class and lowest CPU priority for every command it runs and its tree walks; the
+            # scanner process keeps its own (--batch workers, later --watch scans)
+            self.executor = CommandExecutor(nice=19, io_class=IOPRIO_CLASS_IDLE, io_level=0)
+        else:
+            self.executor = CommandExecutor()
+        self.context = ScanContext(self._run_command, self.profiler, self.throttle, self.root, self.image,
+                                   self._run_audit_command)
         self.system_info = self._get_system_info()
         
         # Set milestones directory - use current script's milestones directory
         current_path = Path(__file__).parent
         self.milestones_dir = current_path.parent / "milestones"
+        # Parsed milestones by file name (a --batch parent fills this once for all workers)
+        self.milestone_cache = {}
+        # Resolved checks (see resolve_check) by id() of their control, which
+        # milestone_cache keeps alive; a --batch parent fills this too
+        self.checks = {}
+        # Compiled milestones (see MilestoneBundle), loaded on first use
+        self.bundle = None
         
         # Ensure output directory exists
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -55,6 +2507,10 @@ class LinuxCISScanner:
         except:
             hostname = "Unknown"
             ip_address = "Unknown"
+        if self.root != '/':
+            # Offline scan: the report describes the tree, not this host
+            hostname = self.root
+            ip_address = "N/A (offline scan)"
             
         return {
             "hostname": hostname,
@@ -70,10 +2526,9 @@ class LinuxCISScanner:
     def _get_distribution(self) -> str:
         """Get Linux distribution information"""
         try:
-            with open('/etc/os-release', 'r') as f:
-                for line in f:
-                    if line.startswith('PRETTY_NAME='):
-                        return line.split('=')[1].strip().strip('"')
+            for line in self.context.read_file('/etc/os-release').splitlines():
+                if line.startswith('PRETTY_NAME='):
+                    return line.split('=')[1].strip().strip('"')
         except:
             pass
         return "Unknown Linux Distribution"
@@ -96,36 +2551,64 @@ class LinuxCISScanner:
             # Sanitize command for security
             if shell and isinstance(command, str):
                 # Basic command validation - only allow known safe commands
-                safe_commands = ['systemctl', 'sysctl', 'dpkg', 'rpm', 'lsmod', 'modinfo', 'aa-status', 'ufw', 'nft', 'ss', 'crontab', 'find', 'iwconfig', 'nmcli', 'rfkill']
+                safe_commands = ['systemctl', 'sysctl', 'dpkg', 'rpm', 'lsmod', 'modinfo', 'aa-status', 'ufw', 'nft', 'ss', 'crontab', 'find', 'iwconfig', 'nmcli', 'rfkill', 'sshd']
                 cmd_parts = command.split()
                 if not cmd_parts or not any(safe_cmd in cmd_parts[0] for safe_cmd in safe_commands):
                     return "", "Command not allowed", 1
             
-            result = subprocess.run(
-                command,
-                shell=shell,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            return result.stdout, result.stderr, result.returncode
-        except subprocess.TimeoutExpired:
-            return "", "Command timeout", 1
+            if self.throttle is not None and command.lstrip().startswith('find '):
+                self.throttle.pause()
+            stdout, stderr, returncode, elapsed = self.executor.run(command, shell)
+            if self.profiler is not None:
+                self.profiler.add_command(command, elapsed, len(stdout) + len(stderr))
+            return stdout, stderr, returncode
         except (OSError, ValueError) as e:
             return "", f"Command error: {str(e)}", 1
         except Exception as e:
             return "", f"Unexpected error: {str(e)}", 1
     
+    def _run_audit_command(self, command: str) -> Tuple[str, str, int]:
+        """Run an audit command as a shell-less pipeline of allow-listed programs
+        
+        Raises ValueError if it cannot run that way, FileNotFoundError if a
+        program is not installed and subprocess.TimeoutExpired after
+        AUDIT_COMMAND_TIMEOUT seconds.
+        """
+        stages = parse_audit_command(command)
+        for argv, _ in stages:
+            if shutil.which(argv[0], path=AUDIT_COMMAND_PATH) is None:
+                raise FileNotFoundError(errno.ENOENT, "is not installed", argv[0])
+        
+        if self.throttle is not None and any('find' in argv for argv, _ in stages):
+            self.throttle.pause()
+        stdout, stderr, returncode, elapsed = self.executor.run_pipeline(
+            stages, AUDIT_COMMAND_TIMEOUT, {'PATH': AUDIT_COMMAND_PATH, 'LC_ALL': 'C'})
+        if self.profiler is not None:
+            self.profiler.add_command(command, elapsed, len(stdout) + len(stderr))
+        return stdout, stderr, returncode
+    
     def _validate_path(self, file_path: str) -> bool:
         """Validate file path to prevent path traversal"""
         try:
-            # Resolve path and check if it's within allowed directories
-            resolved_path = os.path.realpath(file_path)
+            # Resolve path (inside --root, if any) and check if it's within allowed directories
+            resolved_path = self.context.resolve(file_path)
             allowed_prefixes = ['/etc/', '/var/', '/usr/', '/bin/', '/sbin/', '/lib/', '/opt/', '/home/', '/root/', '/proc/', '/sys/']
             return any(resolved_path.startswith(prefix) for prefix in allowed_prefixes)
         except (OSError, ValueError):
             return False
     
+    def _user_name(self, uid: int) -> str:
+        """Name of a UID on the scanned system (raises KeyError like pwd.getpwuid)"""
+        if self.root == '/':
+            return pwd.getpwuid(uid).pw_name
+        return self.context.passwd()["by_id"][str(uid)][0]
+    
+    def _group_name(self, gid: int) -> str:
+        """Name of a GID on the scanned system (raises KeyError like grp.getgrgid)"""
+        if self.root == '/':
+            return grp.getgrgid(gid).gr_name
+        return self.context.group()["by_id"][str(gid)][0]
+    
     def check_file_permissions(self, file_path: str, expected_mode: str, expected_owner: str = None, expected_group: str = None) -> Dict[str, Any]:
         """Check file permissions and ownership"""
         try:
@@ -138,7 +2621,7 @@ class LinuxCISScanner:
                     "evidence": f"File path {file_path} is not allowed"
                 }
             
-            if not os.path.exists(file_path):
+            if not self.context.exists(file_path):
                 return {
                     "status": "FAIL",
                     "current": "File not found",
@@ -146,10 +2629,10 @@ class LinuxCISScanner:
                     "evidence": f"File {file_path} does not exist"
                 }
             
-            file_stat = os.stat(file_path)
+            file_stat = self.context.stat(file_path)
             current_mode = oct(file_stat.st_mode)[-3:]
-            current_owner = pwd.getpwuid(file_stat.st_uid).pw_name
-            current_group = grp.getgrgid(file_stat.st_gid).gr_name
+            current_owner = self._user_name(file_stat.st_uid)
+            current_group = self._group_name(file_stat.st_gid)
             
             issues = []
             if expected_mode and current_mode != expected_mode:
@@ -185,11 +2668,8 @@ class LinuxCISScanner:
     
     def check_service_status(self, service_name: str, expected_status: str) -> Dict[str, Any]:
         """Check systemd service status"""
-        stdout, stderr, returncode = self._run_command(f"systemctl is-enabled {service_name}")
-        enabled_status = stdout.strip()
-        
-        stdout, stderr, returncode = self._run_command(f"systemctl is-active {service_name}")
-        active_status = stdout.strip()
+        enabled_status = self.context.unit_enabled_state(service_name)
+        active_status = self.context.unit_active_state(service_name)
         
         current_status = f"enabled={enabled_status}, active={active_status}"
         
@@ -209,9 +2689,9 @@ class LinuxCISScanner:
     
     def check_kernel_parameter(self, parameter: str, expected_value: str) -> Dict[str, Any]:
         """Check kernel parameter value"""
-        stdout, stderr, returncode = self._run_command(f"sysctl {parameter}")
+        current_value = self.context.sysctl(parameter)
         
-        if returncode != 0:
+        if current_value is None:
             return {
                 "status": "FAIL",
                 "current": "Parameter not found",
@@ -219,7 +2699,6 @@ class LinuxCISScanner:
                 "evidence": f"Kernel parameter {parameter} not found"
             }
         
-        current_value = stdout.split('=')[1].strip() if '=' in stdout else stdout.strip()
         status = "PASS" if current_value == expected_value else "FAIL"
         
         return {
@@ -231,15 +2710,7 @@ class LinuxCISScanner:
     
     def check_package_installed(self, package_name: str, should_be_installed: bool = True) -> Dict[str, Any]:
         """Check if package is installed"""
-        # Try dpkg first (Debian/Ubuntu)
-        stdout, stderr, returncode = self._run_command(f"dpkg -l {package_name}")
-        
-        if returncode == 0 and "ii" in stdout:
-            installed = True
-        else:
-            # Try rpm (RHEL/CentOS)
-            stdout, stderr, returncode = self._run_command(f"rpm -q {package_name}")
-            installed = returncode == 0
+        installed = self.context.package_installed(package_name)
         
         if should_be_installed:
             status = "PASS" if installed else "FAIL"
@@ -269,7 +2740,7 @@ class LinuxCISScanner:
                     "evidence": f"File path {file_path} is not allowed"
                 }
             
-            if not os.path.exists(file_path):
+            if not self.context.exists(file_path):
                 return {
                     "status": "FAIL",
                     "current": "File not found",
@@ -277,10 +2748,9 @@ class LinuxCISScanner:
                     "evidence": f"Configuration file {file_path} does not exist"
                 }
             
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = self.context.read_file(file_path)
             
-            match_found = re.search(pattern, content, re.MULTILINE)
+            match_found = compile_pattern(pattern, re.MULTILINE).search(content)
             
             if expected_match:
                 status = "PASS" if match_found else "FAIL"
@@ -313,40 +2783,77 @@ class LinuxCISScanner:
                 "evidence": f"Unexpected error: {str(e)}"
             }
     
-    def check_kernel_module(self, module_name: str, expected_status: str) -> Dict[str, Any]:
-        """Check kernel module availability and status"""
+    def check_file_content(self, file_path: str, pattern: str, expected_result: str = 'found') -> Dict[str, Any]:
+        """Check whether a pattern occurs in any of the files listed in file_path (as `grep -E pattern files`)"""
+        expected = f"Pattern '{pattern}' {'not found' if expected_result == 'not_found' else 'found'}"
         try:
-            # Check if module is blacklisted in modprobe.d
-            blacklist_found = False
-            modprobe_dirs = ['/etc/modprobe.d/', '/lib/modprobe.d/', '/usr/lib/modprobe.d/']
+            if expected_result not in ('found', 'not_found'):
+                return {
+                    "status": "ERROR",
+                    "current": f"Unknown expected_result: {expected_result}",
+                    "expected": expected,
+                    "evidence": "expected_result must be 'found' or 'not_found'"
+                }
             
-            for modprobe_dir in modprobe_dirs:
-                if os.path.exists(modprobe_dir):
-                    try:
-                        for conf_file in os.listdir(modprobe_dir):
-                            if conf_file.endswith('.conf'):
-                                conf_path = os.path.join(modprobe_dir, conf_file)
-                                if self._validate_path(conf_path):
-                                    try:
-                                        with open(conf_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                            content = f.read()
-                                            if re.search(f'install\\s+{re.escape(module_name)}\\s+/bin/(true|false)', content):
-                                                blacklist_found = True
-                                                break
-                                    except (OSError, IOError):
-                                        continue
-                    except (OSError, PermissionError):
-                        continue
-                if blacklist_found:
-                    break
+            files = file_path.split()
+            invalid = [path for path in files if not self._validate_path(path)]
+            if not files or invalid:
+                return {
+                    "status": "FAIL",
+                    "current": "Invalid file path",
+                    "expected": expected,
+                    "evidence": f"File path {' '.join(invalid) or file_path!r} is not allowed"
+                }
+            
+            regex = compile_pattern(pattern, re.MULTILINE)
+            existing = [path for path in files if self.context.exists(path)]
+            matched = [path for path in existing if regex.search(self.context.read_file(path))]
+            
+            if expected_result == 'found':
+                status = "PASS" if matched else "FAIL"
+            else:
+                # A missing file cannot contain the pattern (e.g. /etc/motd removed)
+                status = "PASS" if not matched else "FAIL"
+            
+            if matched:
+                current = f"Pattern found in {', '.join(matched)}"
+            elif existing:
+                current = f"Pattern not found in {', '.join(existing)}"
+            else:
+                current = "File not found"
+            
+            return {
+                "status": status,
+                "current": current,
+                "expected": expected,
+                "evidence": f"Checked {', '.join(files)}: {current}"
+            }
             
-            # Check if module is currently loaded
-            stdout, stderr, returncode = self._run_command(f"lsmod | grep -w {module_name}")
-            module_loaded = returncode == 0 and module_name in stdout
+        except (OSError, IOError, UnicodeDecodeError) as e:
+            return {
+                "status": "FAIL",
+                "current": "Error reading file",
+                "expected": expected,
+                "evidence": f"File read error: {str(e)}"
+            }
+        except Exception as e:
+            return {
+                "status": "ERROR",
+                "current": "Unexpected error",
+                "expected": expected,
+                "evidence": f"Unexpected error: {str(e)}"
+            }
+    
+    def check_kernel_module(self, module_name: str, expected_status: str) -> Dict[str, Any]:
+        """Check kernel module availability and status"""
+        try:
+            modules = self.context.kernel_modules()
+            key = module_key(module_name)
             
-            # Check if module exists in the system
-            stdout, stderr, returncode = self._run_command(f"modinfo {module_name}")
-            module_exists = returncode == 0
+            # Blacklisted means an install directive in modprobe.d makes loading a no-op
+            blacklist_found = is_disabled_install(modules["install"].get(key))
+            module_loaded = key in modules["loaded"]
+            module_exists = key in modules["available"] or key in modules["builtin"]
             
             if expected_status == "not_available":
                 if blacklist_found and not module_loaded:
@@ -387,21 +2894,18 @@ class LinuxCISScanner:
             current_options = []
             mount_found = False
             
-            if not self._validate_path('/proc/mounts'):
+            if not self._validate_path(PROC_MOUNTINFO):
                 return {
                     "status": "ERROR",
                     "current": "Cannot access mount information",
                     "expected": f"Option '{required_option}' present",
-                    "evidence": "Access to /proc/mounts denied"
+                    "evidence": f"Access to {PROC_MOUNTINFO} denied"
                 }
             
-            with open('/proc/mounts', 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) >= 4 and parts[1] == mount_point:
-                        mount_found = True
-                        current_options = parts[3].split(',')
-                        break
+            mount = self.context.mounts().get(mount_point)
+            if mount is not None:
+                mount_found = True
+                current_options = list(mount["options"])
             
             if not mount_found:
                 return {
@@ -443,24 +2947,24 @@ class LinuxCISScanner:
             mount_found = False
             device_info = ""
             
-            if not self._validate_path('/proc/mounts'):
+            if not self._validate_path(PROC_MOUNTINFO):
                 return {
                     "status": "ERROR",
                     "current": "Cannot access mount information",
                     "expected": f"Mount point {expected_status}",
-                    "evidence": "Access to /proc/mounts denied"
+                    "evidence": f"Access to {PROC_MOUNTINFO} denied"
                 }
             
-            with open('/proc/mounts', 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) >= 2 and parts[1] == mount_point:
-                        mount_found = True
-                        device_info = parts[0]
-                        break
+            mount = self.context.mounts().get(mount_point)
+            if mount is not None:
+                mount_found = True
+                device_info = mount["device"]
             
             if expected_status == "separate_partition":
-                if mount_found and not device_info.startswith('/dev/loop'):
+                if mount_found and is_bind_mount(mount):
+                    status = "FAIL"
+                    current = f"Bind mount of {device_info}:{mount['root']}"
+                elif mount_found and not device_info.startswith('/dev/loop'):
                     status = "PASS"
                     current = f"Separate partition: {device_info}"
                 elif mount_found:
@@ -499,7 +3003,7 @@ class LinuxCISScanner:
                     "evidence": f"Config file path {config_file} is not allowed"
                 }
             
-            if not os.path.exists(config_file):
+            if not self.context.exists(config_file):
                 return {
                     "status": "FAIL",
                     "current": "Config file not found",
@@ -507,8 +3011,7 @@ class LinuxCISScanner:
                     "evidence": f"Boot config file {config_file} does not exist"
                 }
             
-            with open(config_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = self.context.read_file(config_file)
             
             missing_params = []
             found_params = []
@@ -552,7 +3055,7 @@ class LinuxCISScanner:
         """Check AppArmor profile status"""
         try:
             # Check if AppArmor is enabled
-            stdout, stderr, returncode = self._run_command("aa-status --enabled")
+            stdout, stderr, returncode = self.context.command("aa-status --enabled")
             if returncode != 0:
                 return {
                     "status": "FAIL",
@@ -562,7 +3065,7 @@ class LinuxCISScanner:
                 }
             
             # Get profile status
-            stdout, stderr, returncode = self._run_command("aa-status")
+            stdout, stderr, returncode = self.context.command("aa-status")
             if returncode != 0:
                 return {
                     "status": "ERROR",
@@ -633,21 +3136,17 @@ class LinuxCISScanner:
                     files_to_check = [limits_pattern]
                 
                 for limits_file in files_to_check:
-                    if os.path.exists(limits_file):
+                    if self.context.exists(limits_file):
                         try:
-                            with open(limits_file, 'r') as f:
-                                content = f.read()
-                                if expected_setting in content or "* hard core 0" in content:
-                                    setting_found = True
-                                    found_in_files.append(limits_file)
+                            content = self.context.read_file(limits_file)
+                            if expected_setting in content or "* hard core 0" in content:
+                                setting_found = True
+                                found_in_files.append(limits_file)
                         except:
                             continue
             
             # Also check sysctl for fs.suid_dumpable
-            stdout, stderr, returncode = self._run_command("sysctl fs.suid_dumpable")
-            suid_dumpable_ok = False
-            if returncode == 0 and "fs.suid_dumpable = 0" in stdout:
-                suid_dumpable_ok = True
+            suid_dumpable_ok = self.context.sysctl("fs.suid_dumpable") == "0"
             
             if setting_found or suid_dumpable_ok:
                 status = "PASS"
@@ -677,30 +3176,13 @@ class LinuxCISScanner:
             issues = []
             
             # Check if services are running
-            running_services = []
-            for service in service_names:
-                stdout, stderr, returncode = self._run_command(f"systemctl is-active {service}")
-                if returncode == 0 and stdout.strip() == "active":
-                    running_services.append(service)
+            running_services = [service for service in service_names if self.context.unit_active_state(service) == "active"]
             
             # Check if services are enabled
-            enabled_services = []
-            for service in service_names:
-                stdout, stderr, returncode = self._run_command(f"systemctl is-enabled {service}")
-                if returncode == 0 and stdout.strip() in ["enabled", "static"]:
-                    enabled_services.append(service)
+            enabled_services = [service for service in service_names if self.context.unit_enabled_state(service) in ["enabled", "static"]]
             
             # Check if packages are installed
-            installed_packages = []
-            for package in package_names:
-                stdout, stderr, returncode = self._run_command(f"dpkg -l {package}")
-                if returncode == 0 and "ii" in stdout:
-                    installed_packages.append(package)
-                else:
-                    # Try rpm for RHEL-based systems
-                    stdout, stderr, returncode = self._run_command(f"rpm -q {package}")
-                    if returncode == 0:
-                        installed_packages.append(package)
+            installed_packages = [package for package in package_names if self.context.package_installed(package)]
             
             # Determine status
             if running_services:
@@ -735,7 +3217,7 @@ class LinuxCISScanner:
     def check_mta_local_only(self, config_file: str, expected_setting: str) -> Dict[str, Any]:
         """Check Mail Transfer Agent is configured for local-only mode"""
         try:
-            if not os.path.exists(config_file):
+            if not self.context.exists(config_file):
                 return {
                     "status": "FAIL",
                     "current": "Config file not found",
@@ -743,8 +3225,7 @@ class LinuxCISScanner:
                     "evidence": f"MTA config file {config_file} does not exist"
                 }
             
-            with open(config_file, 'r') as f:
-                content = f.read()
+            content = self.context.read_file(config_file)
             
             # Check for inet_interfaces setting
             inet_interfaces_found = False
@@ -786,10 +3267,10 @@ class LinuxCISScanner:
         """Check wireless interface status"""
         try:
             # Check if wireless interfaces exist
-            stdout, stderr, returncode = self._run_command("iwconfig")
+            stdout, stderr, returncode = self.context.command("iwconfig")
             if returncode != 0:
                 # iwconfig not available, try ip command
-                stdout, stderr, returncode = self._run_command("ip link show | grep -i wireless")
+                stdout, stderr, returncode = self.context.command("ip link show | grep -i wireless")
                 if returncode != 0:
                     return {
                         "status": "PASS",
@@ -799,13 +3280,13 @@ class LinuxCISScanner:
                     }
             
             # Check NetworkManager radio status
-            stdout, stderr, returncode = self._run_command("nmcli radio wifi")
+            stdout, stderr, returncode = self.context.command("nmcli radio wifi")
             wifi_enabled = False
             if returncode == 0:
                 wifi_enabled = "enabled" in stdout.lower()
             
             # Check rfkill status
-            stdout, stderr, returncode = self._run_command("rfkill list")
+            stdout, stderr, returncode = self.context.command("rfkill list")
             rfkill_blocked = False
             if returncode == 0 and "Wireless LAN" in stdout:
                 rfkill_blocked = "Soft blocked: yes" in stdout or "Hard blocked: yes" in stdout
@@ -846,14 +3327,12 @@ class LinuxCISScanner:
                 param_name = param_config.get('name', '')
                 expected_value = param_config.get('expected_value', '')
                 
-                stdout, stderr, returncode = self._run_command(f"sysctl {param_name}")
+                current_value = self.context.sysctl(param_name)
                 
-                if returncode != 0:
+                if current_value is None:
                     failed_params.append(f"{param_name}: not found")
                     continue
                 
-                current_value = stdout.split('=')[1].strip() if '=' in stdout else stdout.strip()
-                
                 if current_value == expected_value:
                     passed_params.append(f"{param_name}={current_value}")
                 else:
@@ -891,17 +3370,17 @@ class LinuxCISScanner:
             active_firewalls = []
             
             # Check ufw
-            stdout, stderr, returncode = self._run_command("ufw status")
+            stdout, stderr, returncode = self.context.command("ufw status")
             if returncode == 0 and "Status: active" in stdout:
                 active_firewalls.append("ufw")
             
             # Check nftables
-            stdout, stderr, returncode = self._run_command("nft list tables")
+            stdout, stderr, returncode = self.context.command("nft list tables")
             if returncode == 0 and stdout.strip():
                 active_firewalls.append("nftables")
             
             # Check iptables
-            stdout, stderr, returncode = self._run_command("iptables -L")
+            stdout, stderr, returncode = self.context.command("iptables -L")
             if returncode == 0:
                 # Check if there are non-default rules
                 lines = stdout.split('\n')
@@ -937,7 +3416,7 @@ class LinuxCISScanner:
     def check_ufw_status(self, expected_status: str) -> Dict[str, Any]:
         """Check UFW firewall status"""
         try:
-            stdout, stderr, returncode = self._run_command("ufw status")
+            stdout, stderr, returncode = self.context.command("ufw status")
             
             if returncode != 0:
                 return {
@@ -974,7 +3453,7 @@ class LinuxCISScanner:
     def check_ufw_loopback(self, expected_rules: List[str]) -> Dict[str, Any]:
         """Check UFW loopback configuration"""
         try:
-            stdout, stderr, returncode = self._run_command("ufw status numbered")
+            stdout, stderr, returncode = self.context.command("ufw status numbered")
             
             if returncode != 0:
                 return {
@@ -1019,7 +3498,7 @@ class LinuxCISScanner:
         """Check UFW rules for open ports"""
         try:
             # Get listening ports
-            stdout, stderr, returncode = self._run_command("ss -tuln")
+            stdout, stderr, returncode = self.context.command("ss -tuln")
             if returncode != 0:
                 return {
                     "status": "ERROR",
@@ -1041,7 +3520,7 @@ class LinuxCISScanner:
                                 listening_ports.append(port)
             
             # Get UFW rules
-            stdout, stderr, returncode = self._run_command("ufw status numbered")
+            stdout, stderr, returncode = self.context.command("ufw status numbered")
             if returncode != 0:
                 return {
                     "status": "FAIL",
@@ -1076,7 +3555,7 @@ class LinuxCISScanner:
     def check_ufw_default_policy(self, expected_policies: Dict[str, str]) -> Dict[str, Any]:
         """Check UFW default policies"""
         try:
-            stdout, stderr, returncode = self._run_command("ufw status verbose")
+            stdout, stderr, returncode = self.context.command("ufw status verbose")
             
             if returncode != 0:
                 return {
@@ -1132,7 +3611,7 @@ class LinuxCISScanner:
     def check_nftables_table(self, expected_families: List[str]) -> Dict[str, Any]:
         """Check nftables table existence"""
         try:
-            stdout, stderr, returncode = self._run_command("nft list tables")
+            stdout, stderr, returncode = self.context.command("nft list tables")
             
             if returncode != 0:
                 return {
@@ -1184,7 +3663,7 @@ class LinuxCISScanner:
     def check_nftables_base_chains(self, required_hooks: List[str]) -> Dict[str, Any]:
         """Check nftables base chains"""
         try:
-            stdout, stderr, returncode = self._run_command("nft list ruleset")
+            stdout, stderr, returncode = self.context.command("nft list ruleset")
             
             if returncode != 0:
                 return {
@@ -1228,8 +3707,7 @@ class LinuxCISScanner:
     def check_ssh_private_keys(self, key_pattern: str, expected_mode: str, expected_owner: str, expected_group: str) -> Dict[str, Any]:
         """Check SSH private key file permissions"""
         try:
-            import glob
-            key_files = glob.glob(key_pattern)
+            key_files = self.context.glob(key_pattern)
             
             if not key_files:
                 return {
@@ -1274,8 +3752,7 @@ class LinuxCISScanner:
     def check_ssh_public_keys(self, key_pattern: str, expected_mode: str, expected_owner: str, expected_group: str) -> Dict[str, Any]:
         """Check SSH public key file permissions"""
         try:
-            import glob
-            key_files = glob.glob(key_pattern)
+            key_files = self.context.glob(key_pattern)
             
             if not key_files:
                 return {
@@ -1318,9 +3795,9 @@ class LinuxCISScanner:
             }
     
     def check_sshd_config(self, config_file: str, check_parameters: List[str], expected_values: Dict[str, str], require_one_of: bool, validate_crypto: bool) -> Dict[str, Any]:
-        """Check SSH daemon configuration"""
+        """Check effective SSH daemon settings (see ScanContext.sshd_config)"""
         try:
-            if not os.path.exists(config_file):
+            if not self.context.exists(config_file):
                 return {
                     "status": "FAIL",
                     "current": "SSH config file not found",
@@ -1328,20 +3805,11 @@ class LinuxCISScanner:
                     "evidence": f"Config file {config_file} does not exist"
                 }
             
-            with open(config_file, 'r') as f:
-                content = f.read()
+            source, settings = self.context.sshd_config(config_file)
             
-            found_params = {}
+            found_params = {param: settings[param.lower()] for param in check_parameters if param.lower() in settings}
             issues = []
             
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    for param in check_parameters:
-                        if line.lower().startswith(param.lower()):
-                            value = line.split(None, 1)[1] if len(line.split(None, 1)) > 1 else ""
-                            found_params[param] = value
-            
             if require_one_of:
                 # At least one parameter must be configured
                 if not found_params:
@@ -1351,10 +3819,24 @@ class LinuxCISScanner:
                     status = "PASS"
                     current = f"Access control configured: {', '.join(f'{k}={v}' for k, v in found_params.items())}"
             else:
+                crypto = [param for param in check_parameters if validate_crypto and param.lower() in SSHD_WEAK_ALGORITHMS]
+                for param in crypto:
+                    # Judged by what is enabled (compiled-in defaults included, see
+                    # SSHD_DEFAULTS), not by matching a recommended list verbatim
+                    if param not in found_params:
+                        issues.append(f"{param}: not set, effective algorithms unknown")
+                        continue
+                    weak = [algorithm for algorithm in found_params[param].split(',')
+                            if algorithm.strip().lower() in SSHD_WEAK_ALGORITHMS[param.lower()]]
+                    if weak:
+                        issues.append(f"{param}: weak algorithms enabled: {', '.join(weak)}")
+                
                 # Check specific expected values
-                for param, expected_value in expected_values.items():
-                    current_value = found_params.get(param, 'not set')
-                    if current_value != expected_value:
+                for param, expected_value in (expected_values or {}).items():
+                    if param in crypto:
+                        continue
+                    current_value = settings.get(param.lower(), 'not set')
+                    if current_value.lower() != str(expected_value).lower():
                         issues.append(f"{param}: {current_value} (expected {expected_value})")
                 
                 if not issues:
@@ -1367,8 +3849,8 @@ class LinuxCISScanner:
             return {
                 "status": status,
                 "current": current,
-                "expected": f"Parameters configured: {', '.join(check_parameters)}",
-                "evidence": f"Found parameters: {', '.join(f'{k}={v}' for k, v in found_params.items())}"
+                "expected": f"Parameters configured: {', '.join(check_parameters)}{' (no weak algorithms)' if validate_crypto else ''}",
+                "evidence": f"Effective parameters ({source}): {', '.join(f'{k}={v}' for k, v in found_params.items()) or 'none set'}"
             }
             
         except Exception as e:
@@ -1382,14 +3864,13 @@ class LinuxCISScanner:
     def check_sudo_config(self, config_files: List[str], required_setting: str, prohibited_setting: str) -> Dict[str, Any]:
         """Check sudo configuration"""
         try:
-            import glob
             all_files = []
             
             for config_pattern in config_files:
                 if '*' in config_pattern:
-                    all_files.extend(glob.glob(config_pattern))
+                    all_files.extend(self.context.glob(config_pattern))
                 else:
-                    if os.path.exists(config_pattern):
+                    if self.context.exists(config_pattern):
                         all_files.append(config_pattern)
             
             if not all_files:
@@ -1405,8 +3886,7 @@ class LinuxCISScanner:
             
             for config_file in all_files:
                 try:
-                    with open(config_file, 'r') as f:
-                        content = f.read()
+                    content = self.context.read_file(config_file)
                     
                     if required_setting and required_setting in content:
                         found_required = True
@@ -1448,9 +3928,15 @@ class LinuxCISScanner:
             }
     
     def check_pam_config(self, config_file: str, required_setting: str) -> Dict[str, Any]:
-        """Check PAM configuration"""
+        """Check a PAM service's expanded stack for a module or a full entry
+        
+        required_setting is either a module ("pam_faillock.so"), which must be
+        somewhere in the stack, or a PAM line ("auth required pam_wheel.so
+        use_uid"), which needs an entry of that type, control and module with
+        at least those arguments. Included and substacked services count.
+        """
         try:
-            if not os.path.exists(config_file):
+            if not self.context.exists(config_file):
                 return {
                     "status": "FAIL",
                     "current": "PAM config file not found",
@@ -1458,10 +3944,19 @@ class LinuxCISScanner:
                     "evidence": f"Config file {config_file} does not exist"
                 }
             
-            with open(config_file, 'r') as f:
-                content = f.read()
+            stack = self.context.pam_stack(config_file)
+            
+            fields = re.findall(r'\[[^\]]*\]|\S+', required_setting)
+            if len(fields) >= 3 and fields[0].lstrip('-').lower() in PAM_TYPES:
+                pam_type, control, module = fields[0].lstrip('-').lower(), fields[1], os.path.basename(fields[2])
+                found = stack.contains(pam_type, control, module, tuple(fields[3:]))
+                entries = stack.module(module, pam_type)
+            else:
+                module = os.path.basename(required_setting.strip())
+                entries = stack.module(module)
+                found = bool(entries)
             
-            if required_setting in content:
+            if found:
                 status = "PASS"
                 current = "Required PAM setting found"
             else:
@@ -1472,7 +3967,8 @@ class LinuxCISScanner:
                 "status": status,
                 "current": current,
                 "expected": required_setting,
-                "evidence": f"Checked PAM config file: {config_file}"
+                "evidence": f"{module} entries in the expanded {config_file} stack: "
+                            f"{'; '.join(' '.join(entry[:3] + entry[3]) for entry in entries) or 'none'}"
             }
             
         except Exception as e:
@@ -1489,8 +3985,7 @@ class LinuxCISScanner:
             active_services = []
             
             for service in logging_services:
-                stdout, stderr, returncode = self._run_command(f"systemctl is-active {service}")
-                if returncode == 0 and stdout.strip() == "active":
+                if self.context.unit_active_state(service) == "active":
                     active_services.append(service)
             
             if len(active_services) == 1:
@@ -1521,7 +4016,7 @@ class LinuxCISScanner:
     def check_journald_config(self, config_file: str, parameter: str, expected_value: str) -> Dict[str, Any]:
         """Check systemd-journald configuration"""
         try:
-            if not os.path.exists(config_file):
+            if not self.context.exists(config_file):
                 return {
                     "status": "FAIL",
                     "current": "Journald config file not found",
@@ -1529,8 +4024,7 @@ class LinuxCISScanner:
                     "evidence": f"Config file {config_file} does not exist"
                 }
             
-            with open(config_file, 'r') as f:
-                content = f.read()
+            content = self.context.read_file(config_file)
             
             current_value = None
             for line in content.split('\n'):
@@ -1567,22 +4061,20 @@ class LinuxCISScanner:
     def check_rsyslog_config(self, config_files: List[str], prohibited_directives: List[str]) -> Dict[str, Any]:
         """Check rsyslog configuration for prohibited directives"""
         try:
-            import glob
             all_files = []
             
             for config_pattern in config_files:
                 if '*' in config_pattern:
-                    all_files.extend(glob.glob(config_pattern))
+                    all_files.extend(self.context.glob(config_pattern))
                 else:
-                    if os.path.exists(config_pattern):
+                    if self.context.exists(config_pattern):
                         all_files.append(config_pattern)
             
             found_prohibited = []
             
             for config_file in all_files:
                 try:
-                    with open(config_file, 'r') as f:
-                        content = f.read()
+                    content = self.context.read_file(config_file)
                     
                     for line in content.split('\n'):
                         line = line.strip()
@@ -1618,7 +4110,7 @@ class LinuxCISScanner:
     def check_log_file_permissions(self, log_directory: str, expected_file_permissions: str, expected_dir_permissions: str) -> Dict[str, Any]:
         """Check log file and directory permissions"""
         try:
-            if not os.path.exists(log_directory):
+            if not self.context.exists(log_directory):
                 return {
                     "status": "FAIL",
                     "current": "Log directory not found",
@@ -1630,12 +4122,14 @@ class LinuxCISScanner:
             checked_files = 0
             checked_dirs = 0
             
-            for root, dirs, files in os.walk(log_directory):
+            for root, dirs, files in self.context.walk(log_directory):
+                if self.throttle is not None:
+                    self.throttle.pause()
                 # Check directory permissions
                 for d in dirs:
                     dir_path = os.path.join(root, d)
                     try:
-                        dir_stat = os.stat(dir_path)
+                        dir_stat = self.context.stat(dir_path)
                         current_mode = oct(dir_stat.st_mode)[-3:]
                         if current_mode > expected_dir_permissions:
                             issues.append(f"Dir {dir_path}: {current_mode}")
@@ -1647,7 +4141,7 @@ class LinuxCISScanner:
                 for f in files:
                     file_path = os.path.join(root, f)
                     try:
-                        file_stat = os.stat(file_path)
+                        file_stat = self.context.stat(file_path)
                         current_mode = oct(file_stat.st_mode)[-3:]
                         if current_mode > expected_file_permissions:
                             issues.append(f"File {file_path}: {current_mode}")
@@ -1684,16 +4178,10 @@ class LinuxCISScanner:
             installed_packages = []
             
             for package in package_names:
-                stdout, stderr, returncode = self._run_command(f"dpkg -l {package}")
-                if returncode == 0 and "ii" in stdout:
+                if self.context.package_installed(package):
                     installed_packages.append(package)
                 else:
-                    # Try rpm for RHEL-based systems
-                    stdout, stderr, returncode = self._run_command(f"rpm -q {package}")
-                    if returncode == 0:
-                        installed_packages.append(package)
-                    else:
-                        missing_packages.append(package)
+                    missing_packages.append(package)
             
             if should_be_installed:
                 if not missing_packages:
@@ -1728,7 +4216,7 @@ class LinuxCISScanner:
     def check_auditd_config(self, config_file: str, parameter: str, expected_value: str, check_configured: bool) -> Dict[str, Any]:
         """Check auditd configuration"""
         try:
-            if not os.path.exists(config_file):
+            if not self.context.exists(config_file):
                 return {
                     "status": "FAIL",
                     "current": "Auditd config file not found",
@@ -1736,8 +4224,7 @@ class LinuxCISScanner:
                     "evidence": f"Config file {config_file} does not exist"
                 }
             
-            with open(config_file, 'r') as f:
-                content = f.read()
+            content = self.context.read_file(config_file)
             
             current_value = None
             for line in content.split('\n'):
@@ -1784,7 +4271,7 @@ class LinuxCISScanner:
     def check_audit_rule(self, rule_file: str, expected_rules: List[str]) -> Dict[str, Any]:
         """Check audit rules configuration"""
         try:
-            if not os.path.exists(rule_file):
+            if not self.context.exists(rule_file):
                 return {
                     "status": "FAIL",
                     "current": "Audit rule file not found",
@@ -1792,8 +4279,7 @@ class LinuxCISScanner:
                     "evidence": f"Rule file {rule_file} does not exist"
                 }
             
-            with open(rule_file, 'r') as f:
-                content = f.read()
+            content = self.context.read_file(rule_file)
             
             missing_rules = []
             found_rules = []
@@ -1829,7 +4315,7 @@ class LinuxCISScanner:
     def check_audit_log_permissions(self, log_directory: str, expected_file_mode: str, expected_owner: str, expected_group: str) -> Dict[str, Any]:
         """Check audit log file permissions"""
         try:
-            if not os.path.exists(log_directory):
+            if not self.context.exists(log_directory):
                 return {
                     "status": "FAIL",
                     "current": "Audit log directory not found",
@@ -1840,9 +4326,9 @@ class LinuxCISScanner:
             issues = []
             checked_files = 0
             
-            for file_name in os.listdir(log_directory):
+            for file_name in self.context.listdir(log_directory):
                 file_path = os.path.join(log_directory, file_name)
-                if os.path.isfile(file_path):
+                if self.context.isfile(file_path):
                     result = self.check_file_permissions(file_path, expected_file_mode, expected_owner, expected_group)
                     if result['status'] != 'PASS':
                         issues.append(f"{file_name}: {result['current']}")
@@ -1873,7 +4359,7 @@ class LinuxCISScanner:
     def check_cron_job(self, cron_user: str, expected_job: str, job_description: str) -> Dict[str, Any]:
         """Check cron job configuration"""
         try:
-            stdout, stderr, returncode = self._run_command(f"crontab -u {cron_user} -l")
+            stdout, stderr, returncode = self.context.command(f"crontab -u {cron_user} -l")
             
             if returncode != 0:
                 return {
@@ -1908,7 +4394,7 @@ class LinuxCISScanner:
     def check_aide_config(self, config_file: str, monitored_tools: List[str]) -> Dict[str, Any]:
         """Check AIDE configuration for monitored tools"""
         try:
-            if not os.path.exists(config_file):
+            if not self.context.exists(config_file):
                 return {
                     "status": "FAIL",
                     "current": "AIDE config file not found",
@@ -1916,8 +4402,7 @@ class LinuxCISScanner:
                     "evidence": f"Config file {config_file} does not exist"
                 }
             
-            with open(config_file, 'r') as f:
-                content = f.read()
+            content = self.context.read_file(config_file)
             
             missing_tools = []
             found_tools = []
@@ -1953,32 +4438,25 @@ class LinuxCISScanner:
     def check_world_writable_files(self, search_paths: List[str], exclude_paths: List[str]) -> Dict[str, Any]:
         """Check for world-writable files and directories"""
         try:
-            world_writable = []
-            
-            for search_path in search_paths:
-                if not os.path.exists(search_path):
-                    continue
-                
-                # Use find command for efficiency
-                exclude_args = ' '.join([f"-path {path} -prune -o" for path in exclude_paths])
-                find_cmd = f"find {search_path} {exclude_args} -type f -perm -0002 -print 2>/dev/null | head -20"
-                
-                stdout, stderr, returncode = self._run_command(find_cmd)
-                if returncode == 0 and stdout.strip():
-                    world_writable.extend(stdout.strip().split('\n'))
+            found = self.context.tree_scan(search_paths, exclude_paths, self.evidence_limit)
+            file_count, files = found['world_writable_files']
+            dir_count, dirs = found['world_writable_dirs']
+            world_writable = files + dirs
             
-            if not world_writable:
+            if not file_count and not dir_count:
                 status = "PASS"
                 current = "No world-writable files found"
             else:
                 status = "FAIL"
-                current = f"Found {len(world_writable)} world-writable files: {', '.join(world_writable[:5])}{'...' if len(world_writable) > 5 else ''}"
+                current = (f"Found {file_count} world-writable files and {dir_count} world-writable directories without sticky bit: "
+                           f"{', '.join(world_writable[:5])}{'...' if file_count + dir_count > 5 else ''}")
             
             return {
                 "status": status,
                 "current": current,
                 "expected": "No world-writable files",
-                "evidence": f"Searched paths: {', '.join(search_paths)}, Found: {len(world_writable)} files"
+                "evidence": f"Searched paths: {', '.join(search_paths)}, Found: {file_count} files, {dir_count} directories"
+                            + (f" ({', '.join(world_writable)})" if world_writable else "")
             }
             
         except Exception as e:
@@ -1992,32 +4470,21 @@ class LinuxCISScanner:
     def check_orphaned_files(self, search_paths: List[str], exclude_paths: List[str]) -> Dict[str, Any]:
         """Check for files without valid owner or group"""
         try:
-            orphaned_files = []
-            
-            for search_path in search_paths:
-                if not os.path.exists(search_path):
-                    continue
-                
-                # Use find command to locate orphaned files
-                exclude_args = ' '.join([f"-path {path} -prune -o" for path in exclude_paths])
-                find_cmd = f"find {search_path} {exclude_args} -nouser -o -nogroup -print 2>/dev/null | head -20"
-                
-                stdout, stderr, returncode = self._run_command(find_cmd)
-                if returncode == 0 and stdout.strip():
-                    orphaned_files.extend(stdout.strip().split('\n'))
+            count, orphaned_files = self.context.tree_scan(search_paths, exclude_paths, self.evidence_limit)['unowned']
             
-            if not orphaned_files:
+            if not count:
                 status = "PASS"
                 current = "No orphaned files found"
             else:
                 status = "FAIL"
-                current = f"Found {len(orphaned_files)} orphaned files: {', '.join(orphaned_files[:5])}{'...' if len(orphaned_files) > 5 else ''}"
+                current = f"Found {count} orphaned files: {', '.join(orphaned_files[:5])}{'...' if count > 5 else ''}"
             
             return {
                 "status": status,
                 "current": current,
                 "expected": "No orphaned files",
-                "evidence": f"Searched paths: {', '.join(search_paths)}, Found: {len(orphaned_files)} files"
+                "evidence": f"Searched paths: {', '.join(search_paths)}, Found: {count} files"
+                            + (f" ({', '.join(orphaned_files)})" if orphaned_files else "")
             }
             
         except Exception as e:
@@ -2031,7 +4498,7 @@ class LinuxCISScanner:
     def check_shadowed_passwords(self, passwd_file: str) -> Dict[str, Any]:
         """Check that all accounts use shadowed passwords"""
         try:
-            if not os.path.exists(passwd_file):
+            if not self.context.exists(passwd_file):
                 return {
                     "status": "FAIL",
                     "current": "passwd file not found",
@@ -2039,14 +4506,8 @@ class LinuxCISScanner:
                     "evidence": f"File {passwd_file} does not exist"
                 }
             
-            non_shadowed = []
-            
-            with open(passwd_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 2 and fields[1] != 'x':
-                            non_shadowed.append(fields[0])
+            non_shadowed = [fields[0] for fields in self.context.passwd(passwd_file)["entries"]
+                            if len(fields) >= 2 and fields[1] != 'x']
             
             if not non_shadowed:
                 status = "PASS"
@@ -2080,7 +4541,7 @@ class LinuxCISScanner:
     def check_empty_passwords(self, shadow_file: str) -> Dict[str, Any]:
         """Check for accounts with empty passwords"""
         try:
-            if not os.path.exists(shadow_file):
+            if not self.context.exists(shadow_file):
                 return {
                     "status": "FAIL",
                     "current": "shadow file not found",
@@ -2088,14 +4549,8 @@ class LinuxCISScanner:
                     "evidence": f"File {shadow_file} does not exist"
                 }
             
-            empty_passwords = []
-            
-            with open(shadow_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 2 and fields[1] == '':
-                            empty_passwords.append(fields[0])
+            empty_passwords = [fields[0] for fields in self.context.shadow(shadow_file)["entries"]
+                               if len(fields) >= 2 and fields[1] == '']
             
             if not empty_passwords:
                 status = "PASS"
@@ -2122,31 +4577,17 @@ class LinuxCISScanner:
     def check_group_consistency(self, passwd_file: str, group_file: str) -> Dict[str, Any]:
         """Check that all groups in passwd exist in group file"""
         try:
-            if not os.path.exists(passwd_file) or not os.path.exists(group_file):
+            if not self.context.exists(passwd_file) or not self.context.exists(group_file):
                 return {
                     "status": "FAIL",
                     "current": "Required files not found",
                     "expected": "All passwd groups exist in group file",
-                    "evidence": f"Missing files: passwd={os.path.exists(passwd_file)}, group={os.path.exists(group_file)}"
+                    "evidence": f"Missing files: passwd={self.context.exists(passwd_file)}, group={self.context.exists(group_file)}"
                 }
             
-            # Get all GIDs from passwd
-            passwd_gids = set()
-            with open(passwd_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 4:
-                            passwd_gids.add(fields[3])
-            
-            # Get all GIDs from group
-            group_gids = set()
-            with open(group_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 3:
-                            group_gids.add(fields[2])
+            # Primary GIDs from passwd against GIDs defined in group
+            passwd_gids = set(fields[3] for fields in self.context.passwd(passwd_file)["entries"] if len(fields) >= 4)
+            group_gids = set(self.context.group(group_file)["by_id"])
             
             missing_gids = passwd_gids - group_gids
             
@@ -2175,7 +4616,7 @@ class LinuxCISScanner:
     def check_empty_group(self, group_name: str, group_file: str) -> Dict[str, Any]:
         """Check that specified group has no members"""
         try:
-            if not os.path.exists(group_file):
+            if not self.context.exists(group_file):
                 return {
                     "status": "FAIL",
                     "current": "Group file not found",
@@ -2183,16 +4624,7 @@ class LinuxCISScanner:
                     "evidence": f"File {group_file} does not exist"
                 }
             
-            group_members = []
-            
-            with open(group_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 4 and fields[0] == group_name:
-                            if fields[3]:  # Group members field
-                                group_members = [m.strip() for m in fields[3].split(',') if m.strip()]
-                            break
+            group_members = list(self.context.group(group_file)["members"].get(group_name, ()))
             
             if not group_members:
                 status = "PASS"
@@ -2219,7 +4651,7 @@ class LinuxCISScanner:
     def check_duplicate_uids(self, passwd_file: str) -> Dict[str, Any]:
         """Check for duplicate UIDs"""
         try:
-            if not os.path.exists(passwd_file):
+            if not self.context.exists(passwd_file):
                 return {
                     "status": "FAIL",
                     "current": "passwd file not found",
@@ -2227,20 +4659,9 @@ class LinuxCISScanner:
                     "evidence": f"File {passwd_file} does not exist"
                 }
             
-            uid_counts = {}
-            
-            with open(passwd_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 3:
-                            uid = fields[2]
-                            if uid in uid_counts:
-                                uid_counts[uid].append(fields[0])
-                            else:
-                                uid_counts[uid] = [fields[0]]
-            
-            duplicates = {uid: users for uid, users in uid_counts.items() if len(users) > 1}
+            accounts = self.context.passwd(passwd_file)
+            uid_counts = accounts["by_id"]
+            duplicates = accounts["duplicate_ids"]
             
             if not duplicates:
                 status = "PASS"
@@ -2268,7 +4689,7 @@ class LinuxCISScanner:
     def check_duplicate_gids(self, group_file: str) -> Dict[str, Any]:
         """Check for duplicate GIDs"""
         try:
-            if not os.path.exists(group_file):
+            if not self.context.exists(group_file):
                 return {
                     "status": "FAIL",
                     "current": "group file not found",
@@ -2276,20 +4697,9 @@ class LinuxCISScanner:
                     "evidence": f"File {group_file} does not exist"
                 }
             
-            gid_counts = {}
-            
-            with open(group_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 3:
-                            gid = fields[2]
-                            if gid in gid_counts:
-                                gid_counts[gid].append(fields[0])
-                            else:
-                                gid_counts[gid] = [fields[0]]
-            
-            duplicates = {gid: groups for gid, groups in gid_counts.items() if len(groups) > 1}
+            groups = self.context.group(group_file)
+            gid_counts = groups["by_id"]
+            duplicates = groups["duplicate_ids"]
             
             if not duplicates:
                 status = "PASS"
@@ -2317,7 +4727,7 @@ class LinuxCISScanner:
     def check_duplicate_usernames(self, passwd_file: str) -> Dict[str, Any]:
         """Check for duplicate usernames"""
         try:
-            if not os.path.exists(passwd_file):
+            if not self.context.exists(passwd_file):
                 return {
                     "status": "FAIL",
                     "current": "passwd file not found",
@@ -2325,30 +4735,21 @@ class LinuxCISScanner:
                     "evidence": f"File {passwd_file} does not exist"
                 }
             
-            username_counts = {}
-            
-            with open(passwd_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 1:
-                            username = fields[0]
-                            username_counts[username] = username_counts.get(username, 0) + 1
-            
-            duplicates = {user: count for user, count in username_counts.items() if count > 1}
+            accounts = self.context.passwd(passwd_file)
+            duplicates = accounts["duplicate_names"]
             
             if not duplicates:
                 status = "PASS"
                 current = "No duplicate usernames found"
             else:
                 status = "FAIL"
-                current = f"Duplicate usernames: {', '.join(duplicates.keys())}"
+                current = f"Duplicate usernames: {', '.join(duplicates)}"
             
             return {
                 "status": status,
                 "current": current,
                 "expected": "No duplicate usernames",
-                "evidence": f"Checked {len(username_counts)} usernames, Duplicates: {len(duplicates)}"
+                "evidence": f"Checked {len(accounts['by_name'])} usernames, Duplicates: {len(duplicates)}"
             }
             
         except Exception as e:
@@ -2362,7 +4763,7 @@ class LinuxCISScanner:
     def check_duplicate_groupnames(self, group_file: str) -> Dict[str, Any]:
         """Check for duplicate group names"""
         try:
-            if not os.path.exists(group_file):
+            if not self.context.exists(group_file):
                 return {
                     "status": "FAIL",
                     "current": "group file not found",
@@ -2370,30 +4771,21 @@ class LinuxCISScanner:
                     "evidence": f"File {group_file} does not exist"
                 }
             
-            groupname_counts = {}
-            
-            with open(group_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 1:
-                            groupname = fields[0]
-                            groupname_counts[groupname] = groupname_counts.get(groupname, 0) + 1
-            
-            duplicates = {group: count for group, count in groupname_counts.items() if count > 1}
+            groups = self.context.group(group_file)
+            duplicates = groups["duplicate_names"]
             
             if not duplicates:
                 status = "PASS"
                 current = "No duplicate group names found"
             else:
                 status = "FAIL"
-                current = f"Duplicate group names: {', '.join(duplicates.keys())}"
+                current = f"Duplicate group names: {', '.join(duplicates)}"
             
             return {
                 "status": status,
                 "current": current,
                 "expected": "No duplicate group names",
-                "evidence": f"Checked {len(groupname_counts)} group names, Duplicates: {len(duplicates)}"
+                "evidence": f"Checked {len(groups['by_name'])} group names, Duplicates: {len(duplicates)}"
             }
             
         except Exception as e:
@@ -2407,7 +4799,7 @@ class LinuxCISScanner:
     def check_user_home_dirs(self, passwd_file: str, min_uid: int) -> Dict[str, Any]:
         """Check user home directory configuration"""
         try:
-            if not os.path.exists(passwd_file):
+            if not self.context.exists(passwd_file):
                 return {
                     "status": "FAIL",
                     "current": "passwd file not found",
@@ -2418,24 +4810,20 @@ class LinuxCISScanner:
             issues = []
             checked_users = 0
             
-            with open(passwd_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 6:
-                            username = fields[0]
-                            uid = int(fields[2]) if fields[2].isdigit() else 0
-                            home_dir = fields[5]
-                            
-                            # Check interactive users (UID >= min_uid)
-                            if uid >= min_uid:
-                                checked_users += 1
-                                if not home_dir or home_dir == '/':
-                                    issues.append(f"{username}: no home directory assigned")
-                                elif not self._validate_path(home_dir):
-                                    issues.append(f"{username}: invalid home directory path {home_dir}")
-                                elif not os.path.exists(home_dir):
-                                    issues.append(f"{username}: home directory {home_dir} does not exist")
+            for fields in self.context.passwd(passwd_file)["entries"]:
+                if len(fields) >= 6:
+                    username = fields[0]
+                    uid = int(fields[2]) if fields[2].isdigit() else 0
+                    home_dir = fields[5]
+                    # Check interactive users (UID >= min_uid)
+                    if uid >= min_uid:
+                        checked_users += 1
+                        if not home_dir or home_dir == '/':
+                            issues.append(f"{username}: no home directory assigned")
+                        elif not self._validate_path(home_dir):
+                            issues.append(f"{username}: invalid home directory path {home_dir}")
+                        elif not self.context.exists(home_dir):
+                            issues.append(f"{username}: home directory {home_dir} does not exist")
             
             if not issues:
                 status = "PASS"
@@ -2462,7 +4850,7 @@ class LinuxCISScanner:
     def check_user_dot_files(self, passwd_file: str, min_uid: int, max_permissions: str) -> Dict[str, Any]:
         """Check user dot file permissions"""
         try:
-            if not os.path.exists(passwd_file):
+            if not self.context.exists(passwd_file):
                 return {
                     "status": "FAIL",
                     "current": "passwd file not found",
@@ -2473,32 +4861,27 @@ class LinuxCISScanner:
             issues = []
             checked_users = 0
             
-            with open(passwd_file, 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        fields = line.strip().split(':')
-                        if len(fields) >= 6:
-                            username = fields[0]
-                            uid = int(fields[2]) if fields[2].isdigit() else 0
-                            home_dir = fields[5]
-                            
-                            # Check interactive users (UID >= min_uid)
-                            if uid >= min_uid and os.path.exists(home_dir):
-                                checked_users += 1
-                                
-                                # Check common dot files
-                                dot_files = ['.bashrc', '.bash_profile', '.profile', '.cshrc', '.tcshrc']
-                                for dot_file in dot_files:
-                                    dot_path = os.path.join(home_dir, dot_file)
-                                    if os.path.exists(dot_path):
-                                        try:
-                                            file_stat = os.stat(dot_path)
-                                            file_mode = oct(file_stat.st_mode)[-3:]
-                                            # Check if group or other have write permission
-                                            if int(file_mode[1]) & 2 or int(file_mode[2]) & 2:
-                                                issues.append(f"{username}:{dot_file} ({file_mode})")
-                                        except:
-                                            continue
+            for fields in self.context.passwd(passwd_file)["entries"]:
+                if len(fields) >= 6:
+                    username = fields[0]
+                    uid = int(fields[2]) if fields[2].isdigit() else 0
+                    home_dir = fields[5]
+                    # Check interactive users (UID >= min_uid)
+                    if uid >= min_uid and self.context.exists(home_dir):
+                        checked_users += 1
+                        # Check common dot files
+                        dot_files = ['.bashrc', '.bash_profile', '.profile', '.cshrc', '.tcshrc']
+                        for dot_file in dot_files:
+                            dot_path = os.path.join(home_dir, dot_file)
+                            if self.context.exists(dot_path):
+                                try:
+                                    file_stat = self.context.stat(dot_path)
+                                    file_mode = oct(file_stat.st_mode)[-3:]
+                                    # Check if group or other have write permission
+                                    if int(file_mode[1]) & 2 or int(file_mode[2]) & 2:
+                                        issues.append(f"{username}:{dot_file} ({file_mode})")
+                                except:
+                                    continue
             
             if not issues:
                 status = "PASS"
@@ -2522,23 +4905,130 @@ class LinuxCISScanner:
                 "evidence": str(e)
             }
     
-    def load_milestone(self, milestone_file: str) -> List[Dict[str, Any]]:
-        """Load CIS controls from milestone file"""
-        milestone_path = self.milestones_dir / milestone_file
+    def check_command_output_empty(self, audit_command: str, expected: str) -> Dict[str, Any]:
+        """Check that an audit command prints nothing (see parse_audit_command for what it may run)"""
+        try:
+            stdout, stderr, returncode = self.context.audit_command(audit_command)
+        except ValueError as e:
+            return {
+                "status": "MANUAL",
+                "current": f"Audit command not run: {e}",
+                "expected": expected,
+                "evidence": f"Run and review manually: {audit_command}"
+            }
+        except subprocess.TimeoutExpired:
+            return {
+                "status": "ERROR",
+                "current": f"Audit command timed out after {AUDIT_COMMAND_TIMEOUT}s",
+                "expected": expected,
+                "evidence": f"Command: {audit_command}"
+            }
+        except OSError as e:
+            return {
+                "status": "ERROR",
+                "current": f"Could not run audit command: {e.filename or ''} {e.strerror or e}".strip(),
+                "expected": expected,
+                "evidence": f"Command: {audit_command}"
+            }
         
-        if not milestone_path.exists():
-            print(f"Warning: Milestone file {milestone_file} not found")
-            return []
+        lines = [line for line in stdout.splitlines() if line.strip()]
+        errors = [line for line in stderr.splitlines() if line.strip()]
+        if not lines and errors:
+            # A failing first stage leaves nothing for the rest of the pipeline to print
+            return {
+                "status": "ERROR",
+                "current": f"Audit command failed: {errors[0]}",
+                "expected": expected,
+                "evidence": f"Command: {audit_command} (exit status {returncode})"
+            }
+        
+        if not lines:
+            status = "PASS"
+            current = "No output (as expected)"
+            evidence = f"Command: {audit_command}"
+        else:
+            status = "FAIL"
+            current = f"Found {len(lines)} line(s): {lines[0][:100]}{'...' if len(lines) > 1 or len(lines[0]) > 100 else ''}"
+            shown = lines[:self.evidence_limit]
+            evidence = f"Command: {audit_command}, Output: {'; '.join(shown)}{'...' if len(lines) > len(shown) else ''}"
+        
+        return {
+            "status": status,
+            "current": current,
+            "expected": expected,
+            "evidence": evidence
+        }
+    
+    def milestone_bundle(self) -> MilestoneBundle:
+        """Compiled milestones, recompiled first if the milestone files changed"""
+        if self.bundle is None:
+            self.bundle = load_milestone_bundle(self.milestones_dir, [
+                self.milestones_dir.parent / MILESTONE_BUNDLE_FILE, self.output_dir / MILESTONE_BUNDLE_FILE])
+        return self.bundle
+    
+    def close_milestone_bundle(self) -> None:
+        """Close the bundle once reports are written (it is reopened if needed again)"""
+        if self.bundle is not None:
+            self.bundle.close()
+            self.bundle = None
+    
+    def load_milestone(self, milestone_file: str) -> List[Dict[str, Any]]:
+        """Load CIS controls from milestone file (execution fields only, see narrative())"""
+        if milestone_file in self.milestone_cache:
+            return self.milestone_cache[milestone_file]
         
         try:
-            with open(milestone_path, 'r') as f:
-                milestone_data = json.load(f)
-            return milestone_data.get('controls', [])
+            bundle = self.milestone_bundle()
         except Exception as e:
             print(f"Error loading milestone {milestone_file}: {e}")
             return []
+        controls = bundle.controls(milestone_file)
+        if controls is None:
+            if bundle.error(milestone_file) is not None:
+                print(f"Error loading milestone {milestone_file}: {bundle.error(milestone_file)}")
+            else:
+                print(f"Warning: Milestone file {milestone_file} not found")
+            return []
+        
+        # Resolve every control's check and compile ConfigFile and FileContent
+        # patterns up front; bad patterns are reported by the check
+        unresolved = {}
+        for control in controls:
+            method, _, _ = self.control_check(control)
+            control_type = control.get('type', 'Manual')
+            if method is None and control_type != 'Manual':
+                unresolved.setdefault(control_type, []).append(control.get('id', 'Unknown'))
+            if control_type in ('ConfigFile', 'FileContent') and control.get('pattern'):
+                try:
+                    compile_pattern(control['pattern'], re.MULTILINE)
+                except re.error:
+                    pass
+        for control_type, control_ids in unresolved.items():
+            print(f"Warning: {milestone_file}: no check for control type {control_type} "
+                  f"({', '.join(control_ids)}), reported as MANUAL")
+        self.milestone_cache[milestone_file] = controls
+        return controls
+    
+    def control_check(self, control: Dict[str, Any]) -> Tuple[Optional[str], tuple, tuple]:
+        """resolve_check(control), resolved once per control"""
+        entry = self.checks.get(id(control))
+        if entry is None or entry[0] is not control:
+            entry = self.checks[id(control)] = (control,) + resolve_check(control)
+        return entry[1:]
+    
+    def narrative(self, milestone_file: Optional[str], control_id: str) -> Dict[str, Any]:
+        """Narrative fields of a control (description, remediation, ...), read from the bundle when needed"""
+        if milestone_file is None:
+            return {}
+        return self.milestone_bundle().narrative(milestone_file, control_id)
     
-    def execute_control(self, control: Dict[str, Any]) -> Dict[str, Any]:
+    def _report_field(self, result: Dict[str, Any], field: str, default: str = '') -> str:
+        """A narrative field for the reports: what the check reported, else the control's own text"""
+        if field in result:
+            return result[field]
+        return self.narrative(result.get('milestone'), result['id']).get(field, default)
+    
+    def execute_control(self, control: Dict[str, Any], milestone_file: str = None) -> Dict[str, Any]:
         """Execute a single CIS control check"""
         control_id = control.get('id', 'Unknown')
         control_type = control.get('type', 'Manual')
@@ -2548,8 +5038,6 @@ class LinuxCISScanner:
             "title": control.get('title', ''),
             "section": control.get('section', ''),
             "cis_reference": control.get('cis_reference', ''),
-            "remediation": control.get('remediation', 'Refer to CIS Benchmark documentation'),
-            "description": control.get('description', ''),
             "profile": control.get('profile', 'Level1'),
             "status": "MANUAL",
             "actual_value": "",
@@ -2562,261 +5050,22 @@ class LinuxCISScanner:
             result["evidence"] = f"Skipped (Profile: {control.get('profile')})"
             return result
         
+        if self.root != '/' and control_type not in OFFLINE_CONTROL_TYPES:
+            result["status"] = "NOT_APPLICABLE"
+            source = f"--image {self.root}" if self.image is not None else f"--root {self.root}"
+            result["evidence"] = f"{control_type} checks the running system and cannot be evaluated offline ({source})"
+            return result
+        
         try:
-            if control_type == "FilePermission":
-                check_result = self.check_file_permissions(
-                    control.get('file_path', ''),
-                    control.get('expected_mode', ''),
-                    control.get('expected_owner'),
-                    control.get('expected_group')
-                )
-            elif control_type == "Service":
-                check_result = self.check_service_status(
-                    control.get('service_name', ''),
-                    control.get('expected_status', '')
-                )
-            elif control_type == "KernelParameter":
-                check_result = self.check_kernel_parameter(
-                    control.get('parameter', ''),
-                    control.get('expected_value', '')
-                )
-            elif control_type == "Package":
-                check_result = self.check_package_installed(
-                    control.get('package_name', ''),
-                    control.get('should_be_installed', True)
-                )
-            elif control_type == "ConfigFile":
-                check_result = self.check_config_file(
-                    control.get('file_path', ''),
-                    control.get('pattern', ''),
-                    control.get('expected_match', True)
-                )
-            elif control_type == "KernelModule":
-                check_result = self.check_kernel_module(
-                    control.get('module_name', ''),
-                    control.get('expected_status', '')
-                )
-            elif control_type == "MountOption":
-                check_result = self.check_mount_option(
-                    control.get('mount_point', ''),
-                    control.get('required_option', '')
-                )
-            elif control_type == "MountPoint":
-                check_result = self.check_mount_point(
-                    control.get('mount_point', ''),
-                    control.get('expected_status', '')
-                )
-            elif control_type == "BootParameter":
-                check_result = self.check_boot_parameters(
-                    control.get('parameters', []),
-                    control.get('config_file', '/etc/default/grub')
-                )
-            elif control_type == "AppArmorProfile":
-                check_result = self.check_apparmor_profiles(
-                    control.get('expected_modes', []),
-                    control.get('check_unconfined', False)
-                )
-            elif control_type == "CoreDumpRestriction":
-                check_result = self.check_core_dump_restriction(
-                    control.get('expected_setting', ''),
-                    control.get('limits_files', [])
-                )
-            elif control_type == "ServiceNotInUse":
-                check_result = self.check_service_not_in_use(
-                    control.get('service_names', []),
-                    control.get('package_names', [])
-                )
-            elif control_type == "MTALocalOnly":
-                check_result = self.check_mta_local_only(
-                    control.get('config_file', ''),
-                    control.get('expected_setting', '')
-                )
-            elif control_type == "WirelessInterface":
-                check_result = self.check_wireless_interface(
-                    control.get('expected_status', '')
-                )
-            elif control_type == "MultiKernelParameter":
-                check_result = self.check_multi_kernel_parameters(
-                    control.get('parameters', [])
-                )
-            elif control_type == "SingleFirewall":
-                check_result = self.check_single_firewall(
-                    control.get('firewall_utilities', [])
-                )
-            elif control_type == "UFWStatus":
-                check_result = self.check_ufw_status(
-                    control.get('expected_status', '')
-                )
-            elif control_type == "UFWLoopback":
-                check_result = self.check_ufw_loopback(
-                    control.get('expected_rules', [])
-                )
-            elif control_type == "UFWOpenPorts":
-                check_result = self.check_ufw_open_ports(
-                    control.get('check_open_ports', False)
-                )
-            elif control_type == "UFWDefaultPolicy":
-                check_result = self.check_ufw_default_policy(
-                    control.get('expected_policies', {})
-                )
-            elif control_type == "NftablesTable":
-                check_result = self.check_nftables_table(
-                    control.get('expected_families', [])
-                )
-            elif control_type == "NftablesBaseChains":
-                check_result = self.check_nftables_base_chains(
-                    control.get('required_hooks', [])
-                )
-            elif control_type == "SSHPrivateKeys":
-                check_result = self.check_ssh_private_keys(
-                    control.get('key_pattern', ''),
-                    control.get('expected_mode', ''),
-                    control.get('expected_owner', ''),
-                    control.get('expected_group', '')
-                )
-            elif control_type == "SSHPublicKeys":
-                check_result = self.check_ssh_public_keys(
-                    control.get('key_pattern', ''),
-                    control.get('expected_mode', ''),
-                    control.get('expected_owner', ''),
-                    control.get('expected_group', '')
-                )
-            elif control_type == "SSHDConfig":
-                check_result = self.check_sshd_config(
-                    control.get('config_file', ''),
-                    control.get('check_parameters', []),
-                    control.get('expected_values', {}),
-                    control.get('require_one_of', False),
-                    control.get('validate_crypto', False)
-                )
-            elif control_type == "SudoConfig":
-                check_result = self.check_sudo_config(
-                    control.get('config_files', []),
-                    control.get('required_setting', ''),
-                    control.get('prohibited_setting', '')
-                )
-            elif control_type == "PAMConfig":
-                check_result = self.check_pam_config(
-                    control.get('config_file', ''),
-                    control.get('required_setting', '')
-                )
-            elif control_type == "SingleLoggingSystem":
-                check_result = self.check_single_logging_system(
-                    control.get('logging_services', [])
-                )
-            elif control_type == "JournaldConfig":
-                check_result = self.check_journald_config(
-                    control.get('config_file', ''),
-                    control.get('parameter', ''),
-                    control.get('expected_value', '')
-                )
-            elif control_type == "RsyslogConfig":
-                check_result = self.check_rsyslog_config(
-                    control.get('config_files', []),
-                    control.get('prohibited_directives', [])
-                )
-            elif control_type == "LogFilePermissions":
-                check_result = self.check_log_file_permissions(
-                    control.get('log_directory', ''),
-                    control.get('expected_file_permissions', ''),
-                    control.get('expected_dir_permissions', '')
-                )
-            elif control_type == "MultiPackage":
-                check_result = self.check_multi_packages(
-                    control.get('package_names', []),
-                    control.get('should_be_installed', True)
-                )
-            elif control_type == "AuditdConfig":
-                check_result = self.check_auditd_config(
-                    control.get('config_file', ''),
-                    control.get('parameter', ''),
-                    control.get('expected_value', ''),
-                    control.get('check_configured', False)
-                )
-            elif control_type == "AuditRule":
-                check_result = self.check_audit_rule(
-                    control.get('rule_file', ''),
-                    control.get('expected_rules', [])
-                )
-            elif control_type == "AuditLogPermissions":
-                check_result = self.check_audit_log_permissions(
-                    control.get('log_directory', ''),
-                    control.get('expected_file_mode', ''),
-                    control.get('expected_owner', ''),
-                    control.get('expected_group', '')
-                )
-            elif control_type == "CronJob":
-                check_result = self.check_cron_job(
-                    control.get('cron_user', ''),
-                    control.get('expected_job', ''),
-                    control.get('job_description', '')
-                )
-            elif control_type == "AIDEConfig":
-                check_result = self.check_aide_config(
-                    control.get('config_file', ''),
-                    control.get('monitored_tools', [])
-                )
-            elif control_type == "WorldWritableFiles":
-                check_result = self.check_world_writable_files(
-                    control.get('search_paths', []),
-                    control.get('exclude_paths', [])
-                )
-            elif control_type == "OrphanedFiles":
-                check_result = self.check_orphaned_files(
-                    control.get('search_paths', []),
-                    control.get('exclude_paths', [])
-                )
-            elif control_type == "ShadowedPasswords":
-                check_result = self.check_shadowed_passwords(
-                    control.get('passwd_file', '')
-                )
-            elif control_type == "EmptyPasswords":
-                check_result = self.check_empty_passwords(
-                    control.get('shadow_file', '')
-                )
-            elif control_type == "GroupConsistency":
-                check_result = self.check_group_consistency(
-                    control.get('passwd_file', ''),
-                    control.get('group_file', '')
-                )
-            elif control_type == "EmptyGroup":
-                check_result = self.check_empty_group(
-                    control.get('group_name', ''),
-                    control.get('group_file', '')
-                )
-            elif control_type == "DuplicateUIDs":
-                check_result = self.check_duplicate_uids(
-                    control.get('passwd_file', '')
-                )
-            elif control_type == "DuplicateGIDs":
-                check_result = self.check_duplicate_gids(
-                    control.get('group_file', '')
-                )
-            elif control_type == "DuplicateUsernames":
-                check_result = self.check_duplicate_usernames(
-                    control.get('passwd_file', '')
-                )
-            elif control_type == "DuplicateGroupnames":
-                check_result = self.check_duplicate_groupnames(
-                    control.get('group_file', '')
-                )
-            elif control_type == "UserHomeDirs":
-                check_result = self.check_user_home_dirs(
-                    control.get('passwd_file', ''),
-                    control.get('min_uid', 1000)
-                )
-            elif control_type == "UserDotFiles":
-                check_result = self.check_user_dot_files(
-                    control.get('passwd_file', ''),
-                    control.get('min_uid', 1000),
-                    control.get('max_permissions', 'go-w')
-                )
+            method, args, _ = self.control_check(control)
+            if method is not None:
+                check_result = getattr(self, method)(*args)
             elif control_type == "Manual":
                 # Manual check
                 check_result = {
                     "status": "MANUAL",
                     "current": "Manual verification required",
-                    "expected": control.get('description', 'See CIS documentation'),
+                    "expected": self.narrative(milestone_file, control_id).get('description', 'See CIS documentation'),
                     "evidence": "This control requires manual verification"
                 }
             else:
@@ -2836,11 +5085,256 @@ class LinuxCISScanner:
         
         return result
     
+    def _incremental_config(self) -> Dict[str, Any]:
+        """Settings an incremental state must have been recorded with to be reused"""
+        with open(__file__, 'rb') as f:
+            scanner_digest = hashlib.sha256(f.read()).hexdigest()
+        return {"scanner": scanner_digest, "profile": self.profile, "evidence_limit": self.evidence_limit, "root": self.root}
+    
+    def _load_incremental_state(self) -> None:
+        """Load the previous run's state, or start a full scan if it is missing, stale or incompatible"""
+        self._previous_state = {}
+        self._next_state = {}
+        self._reused = set()
+        self._full_scan_at = datetime.datetime.now().timestamp()
+        if not self.incremental:
+            return
+        
+        try:
+            with open(self.output_dir / INCREMENTAL_STATE_FILE, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        if (state.get("version") != INCREMENTAL_STATE_VERSION or state.get("config") != self._incremental_config()
+                or self._full_scan_at - state.get("full_scan_at", 0) > INCREMENTAL_MAX_AGE):
+            return
+        self._previous_state = state.get("controls", {})
+        self._next_state = dict(self._previous_state)
+        self._full_scan_at = state["full_scan_at"]
+    
+    def _save_incremental_state(self) -> None:
+        """Write the control results and input fingerprints for the next --incremental run"""
+        state = {
+            "version": INCREMENTAL_STATE_VERSION,
+            "config": self._incremental_config(),
+            "full_scan_at": self._full_scan_at,
+            "controls": self._next_state,
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        state_path = self.output_dir / INCREMENTAL_STATE_FILE
+        temp_path = state_path.with_name(state_path.name + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, state_path)
+    
+    def _evaluate_control(self, milestone_file: str, control: Dict[str, Any]) -> Dict[str, Any]:
+        """execute_control, recording its inputs and, with --incremental, reusing unchanged results"""
+        state_key = f"{milestone_file}:{control.get('id', 'Unknown')}"
+        if not self.incremental:
+            result, inputs = self.context.record_inputs(self.execute_control, control, milestone_file)
+            self._control_inputs[state_key] = (milestone_file, control, inputs)
+            return result
+        
+        control_digest = stable_digest(control)
+        previous = self._previous_state.get(state_key)
+        if (previous and previous["control"] == control_digest and previous["inputs"]
+                and all(self._input_unchanged(key, digest) for key, digest in previous["inputs"])):
+            self._reused.add(state_key)
+            inputs = set(fact_key_from_json(key) for key, _ in previous["inputs"])
+            self._control_inputs[state_key] = (milestone_file, control, inputs)
+            return previous["result"]
+        
+        result, inputs = self.context.record_inputs(self.execute_control, control, milestone_file)
+        self._control_inputs[state_key] = (milestone_file, control, inputs)
+        fingerprints = []
+        if control.get('type', 'Manual') in INCREMENTAL_CONTROL_TYPES:
+            fingerprints = [[key, self.context.fingerprint(key)] for key in inputs]
+        # An input that cannot be fingerprinted cannot be compared next run either
+        if fingerprints and all(digest is not None for _, digest in fingerprints):
+            self._next_state[state_key] = {
+                "control": control_digest,
+                "result": result,
+                "inputs": fingerprints,
+            }
+        else:
+            self._next_state.pop(state_key, None)
+        return result
+    
+    def _input_unchanged(self, key: Any, digest: Optional[str]) -> bool:
+        """Whether a recorded input still has its fingerprint (one that cannot be taken counts as changed)"""
+        current = self.context.fingerprint(fact_key_from_json(key))
+        return current is not None and current == digest
+    
+    def watch(self, milestone_files: List[str] = None, interval: int = WATCH_INTERVAL,
+              drift_log: str = None, on_change=None) -> None:
+        """Scan once, then re-evaluate controls as their inputs change and log status drift
+        
+        Files, package databases, modprobe.d and systemd unit directories read by
+        a control are watched with inotify; controls that also depend on runtime
+        state are re-checked every `interval` seconds. Every status change is
+        appended to drift_log as one JSON object per line. on_change() is called
+        after each batch that changed a status. Runs until interrupted.
+        """
+        self.scan_milestones(milestone_files)
+        if on_change is not None:
+            on_change()
+        
+        drift_path = Path(drift_log) if drift_log else self.output_dir / DRIFT_LOG_FILE
+        watcher = InotifyWatcher()
+        print(f"👀 Watching {len(self._control_inputs)} controls, drift events: {drift_path}")
+        
+        try:
+            file_interest, dir_interest, polled = self._arm_watches(watcher)
+            next_poll = time.monotonic() + interval
+            while True:
+                changed = watcher.read(next_poll - time.monotonic())
+                if changed:
+                    # Let a burst of writes settle before re-checking
+                    while True:
+                        more = watcher.read(WATCH_DEBOUNCE)
+                        if not more:
+                            break
+                        changed.extend(more)
+                    if more is None:
+                        changed = None
+                
+                if changed is None:
+                    affected = set(self._control_inputs)
+                else:
+                    affected = set()
+                    for path in changed:
+                        affected |= file_interest.get(path, set())
+                        affected |= dir_interest.get(os.path.dirname(path), set())
+                        affected |= dir_interest.get(path, set())
+                if time.monotonic() >= next_poll:
+                    affected |= polled
+                    next_poll = time.monotonic() + interval
+                if not affected:
+                    continue
+                
+                if self._reevaluate(affected, drift_path) and on_change is not None:
+                    on_change()
+                file_interest, dir_interest, polled = self._arm_watches(watcher)
+        finally:
+            watcher.close()
+    
+    def _arm_watches(self, watcher: InotifyWatcher) -> Tuple[Dict[str, set], Dict[str, set], set]:
+        """Map watched paths to the controls that read them and make sure each directory is watched"""
+        file_interest, dir_interest, polled = {}, {}, set()
+        for state_key, (milestone_file, control, inputs) in self._control_inputs.items():
+            for key in inputs:
+                files, dirs, needs_polling = watch_targets(key)
+                for path in files:
+                    file_interest.setdefault(path, set()).add(state_key)
+                    watcher.add_directory(os.path.dirname(path))
+                for path in dirs:
+                    dir_interest.setdefault(path, set()).add(state_key)
+                    if not watcher.add_directory(path):
+                        # Not there yet: watch the parent so its creation is noticed
+                        dir_interest.setdefault(os.path.dirname(path), set()).add(state_key)
+                        watcher.add_directory(os.path.dirname(path))
+                if needs_polling:
+                    polled.add(state_key)
+        return file_interest, dir_interest, polled
+    
+    def _reevaluate(self, state_keys: set, drift_path: Path) -> bool:
+        """Re-run the given controls on a fresh snapshot and log those whose status changed"""
+        self.context = ScanContext(self._run_command, self.profiler, self.throttle, self.root, self.image,
+                                   self._run_audit_command)
+        drifted = False
+        replacements = {}
+        for state_key in [key for key in self._control_inputs if key in state_keys]:
+            milestone_file, control, _ = self._control_inputs[state_key]
+            result = self._evaluate_control(milestone_file, control)
+            old_status = self._result_status[state_key]
+            self._result_status[state_key] = result["status"]
+            replacements[state_key] = result
+            if result["status"] == old_status:
+                continue
+            
+            drifted = True
+            event = {
+                "timestamp": datetime.datetime.now().isoformat(),
+                "hostname": self.system_info['hostname'],
+                "milestone": milestone_file,
+                "control": result["id"],
+                "title": result["title"],
+                "old_status": old_status,
+                "new_status": result["status"],
+                "evidence": result.get("evidence", result.get("actual_value", "")),
+            }
+            drift_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(drift_path, 'a') as f:
+                f.write(json.dumps(event) + '\n')
+            print(f"⚡ {result['id']}: {old_status} -> {result['status']}", flush=True)
+        
+        if drifted:
+            self.results.update(replacements)
+        if self.incremental:
+            self._save_incremental_state()
+        return drifted
+    
+    def prefetch(self, milestone_files: List[str], executor: Executor, methods: Optional[Tuple[str, ...]] = None) -> None:
+        """Queue the facts declared by the controls about to run (see CONTROL_CHECKS) on the pool
+        
+        Submitted ahead of the controls, so distinct facts (package index,
+        unit states, kernel module index, account databases, audit commands...)
+        load side by side instead of one at a time as workers first ask for
+        them. methods limits this to some ScanContext methods. Failures are
+        left for the check reading the fact to report.
+        """
+        wanted = {}
+        for milestone_file in milestone_files:
+            for control in self.load_milestone(milestone_file):
+                if self.profile == "Level1" and control.get('profile') == "Level2":
+                    continue
+                if self.root != '/' and control.get('type', 'Manual') not in OFFLINE_CONTROL_TYPES:
+                    continue
+                for fact in self.control_check(control)[2]:
+                    if methods is None or fact[0] in methods:
+                        wanted.setdefault(fact, None)
+        
+        def gather(method, value):
+            try:
+                if value is None:
+                    getattr(self.context, method)()
+                else:
+                    getattr(self.context, method)(value)
+            except Exception:
+                pass
+        
+        for method, value in wanted:
+            executor.submit(gather, method, value)
+    
+    def _measured_control(self, milestone_file: str, control: Dict[str, Any]) -> Dict[str, Any]:
+        """_evaluate_control, with its cost recorded when --profile-scan is on"""
+        if self.profiler is None:
+            return self._evaluate_control(milestone_file, control)
+        return self.profiler.measure(milestone_file, control, self._evaluate_control, milestone_file, control)
+    
+    def _execute_controls(self, milestone_file: str, controls: List[Dict[str, Any]],
+                          executor: Optional[Executor] = None) -> Iterator[Dict[str, Any]]:
+        """Execute controls, optionally on a worker pool, yielding results in input order"""
+        if executor is None:
+            for control in controls:
+                yield self._measured_control(milestone_file, control)
+            return
+        
+        futures = [executor.submit(self._measured_control, milestone_file, control) for control in controls]
+        for future in futures:
+            yield future.result()
+    
     def scan_milestones(self, milestone_files: List[str] = None) -> None:
         """Scan specified milestone files or all available"""
         if milestone_files is None:
             milestone_files = [f for f in os.listdir(self.milestones_dir) if f.endswith('.json')]
         
+        # Fresh snapshot for every scan
+        self.context = ScanContext(self._run_command, self.profiler, self.throttle, self.root, self.image,
+                                   self._run_audit_command)
+        self._load_incremental_state()
+        
         # Color codes
         GREEN = '\033[92m'
         BLUE = '\033[94m'
@@ -2864,33 +5358,66 @@ class LinuxCISScanner:
         print(f"{BLUE}📋 Profile:{RESET} {YELLOW}{self.profile}{RESET}")
         print(f"{BLUE}🐧 Distribution:{RESET} {GREEN}{self.system_info['distribution']}{RESET}")
         print(f"{BLUE}📁 Milestones:{RESET} {CYAN}{len(milestone_files)}{RESET}")
+        if self.image is not None:
+            print(f"{BLUE}📦 Image:{RESET} {CYAN}{self.root}{RESET} ({self.image.layers} layers, nothing extracted)")
+        elif self.root != '/':
+            print(f"{BLUE}💿 Offline root:{RESET} {CYAN}{self.root}{RESET}")
         print(f"{CYAN}─" * 60 + f"{RESET}")
         
-        for milestone_file in milestone_files:
-            print(f"{BOLD}{BLUE}📄 Processing {milestone_file}...{RESET}")
-            controls = self.load_milestone(milestone_file)
-            
-            for control in controls:
-                result = self.execute_control(control)
-                self.results.append(result)
-                
-                if result["status"] == "PASS":
-                    status_symbol = f"{GREEN}✓{RESET}"
-                elif result["status"] == "FAIL":
-                    status_symbol = f"{RED}✗{RESET}"
-                elif result["status"] == "MANUAL":
-                    status_symbol = f"{YELLOW}⚠{RESET}"
-                else:
-                    status_symbol = f"{CYAN}?{RESET}"
+        # Controls are independent, so with --jobs > 1 they run on a shared
+        # thread pool (checks are dominated by subprocess wait time). Results
+        # are still consumed in milestone order, keeping output deterministic.
+        executor = ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        audit_executor = None
+        # With --profile-scan, facts stay charged to the first control reading them
+        if executor is not None and self.profiler is None:
+            self.prefetch(milestone_files, executor)
+        elif self.profiler is None and self.throttle is None:
+            # Audit commands are independent of each other, so they run side by side even without --jobs
+            audit_executor = ThreadPoolExecutor(max_workers=AUDIT_COMMAND_WORKERS)
+            self.prefetch(milestone_files, audit_executor, ('audit_command',))
+        
+        self.results.open()
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            for milestone_file in milestone_files:
+                print(f"{BOLD}{BLUE}📄 Processing {milestone_file}...{RESET}")
+                controls = self.load_milestone(milestone_file)
                 
-                print(f"  {status_symbol} {CYAN}{result['id']}{RESET}: {result['title'][:50]}...")
+                for result in self._execute_controls(milestone_file, controls, executor):
+                    self.results.write(milestone_file, result)
+                    self._result_status[f"{milestone_file}:{result['id']}"] = result["status"]
+                    
+                    if result["status"] == "PASS":
+                        status_symbol = f"{GREEN}✓{RESET}"
+                    elif result["status"] == "FAIL":
+                        status_symbol = f"{RED}✗{RESET}"
+                    elif result["status"] == "MANUAL":
+                        status_symbol = f"{YELLOW}⚠{RESET}"
+                    else:
+                        status_symbol = f"{CYAN}?{RESET}"
+                    
+                    print(f"  {status_symbol} {CYAN}{result['id']}{RESET}: {result['title'][:50]}...")
+        finally:
+            self.results.close()
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if audit_executor is not None:
+                audit_executor.shutdown(wait=True)
+        
+        if self.profiler is not None:
+            self.profiler.stop()
+        
+        if self.incremental:
+            self._save_incremental_state()
         
         print(f"{CYAN}─" * 60 + f"{RESET}")
         
         # Summary with colors
-        pass_count = sum(1 for r in self.results if r["status"] == "PASS")
-        fail_count = sum(1 for r in self.results if r["status"] == "FAIL")
-        manual_count = sum(1 for r in self.results if r["status"] == "MANUAL")
+        pass_count = self.results.counts.get("PASS", 0)
+        fail_count = self.results.counts.get("FAIL", 0)
+        manual_count = self.results.counts.get("MANUAL", 0)
         
         success_rate = round((pass_count / len(self.results)) * 100, 1) if self.results else 0
         
@@ -2903,14 +5430,20 @@ class LinuxCISScanner:
         print(f"Failed: {RED}{fail_count}{RESET}")
         print(f"Manual: {YELLOW}{manual_count}{RESET}")
         print(f"Success Rate: {YELLOW}{success_rate}%{RESET}")
+        if self.root != '/':
+            print(f"Not applicable offline: {CYAN}{self.results.counts.get('NOT_APPLICABLE', 0)}{RESET}")
+        if self.incremental:
+            print(f"Reused: {CYAN}{len(self._reused)}{RESET} unchanged results")
+        if self.throttle is not None:
+            print(f"Throttled: {CYAN}{self.throttle.throttled:.1f}s{RESET} waiting for load to drop")
         print(f"{CYAN}============================================================={RESET}")
         print()
     
     def generate_html_report(self) -> str:
         """Generate HTML compliance report"""
-        pass_count = sum(1 for r in self.results if r["status"] == "PASS")
-        fail_count = sum(1 for r in self.results if r["status"] == "FAIL")
-        manual_count = sum(1 for r in self.results if r["status"] == "MANUAL")
+        pass_count = self.results.counts.get("PASS", 0)
+        fail_count = self.results.counts.get("FAIL", 0)
+        manual_count = self.results.counts.get("MANUAL", 0)
         
         html_content = f"""
 <!DOCTYPE html>
@@ -3005,6 +5538,81 @@ class LinuxCISScanner:
         
         return str(report_path)
     
+    def generate_profile_report(self) -> str:
+        """Write the --profile-scan timing table and a summary of where scan time went"""
+        import csv
+        
+        records = sorted(self.profiler.records, key=lambda r: r["wall_time"], reverse=True)
+        
+        with open(self.output_dir / PROFILE_CSV_FILE, 'w', newline='') as csvfile:
+            fieldnames = ['Id', 'Milestone', 'Type', 'WallTime', 'CpuTime', 'SubprocessTime', 'Subprocesses', 'BytesRead', 'Commands']
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            
+            writer.writeheader()
+            for r in records:
+                writer.writerow({
+                    'Id': r['id'],
+                    'Milestone': r['milestone'],
+                    'Type': r['type'],
+                    'WallTime': f"{r['wall_time']:.6f}",
+                    'CpuTime': f"{r['cpu_time']:.6f}",
+                    'SubprocessTime': f"{r['subprocess_time']:.6f}",
+                    'Subprocesses': r['subprocesses'],
+                    'BytesRead': r['bytes_read'],
+                    'Commands': '; '.join(command for command, _ in r['commands']),
+                })
+        
+        wall_total = sum(r["wall_time"] for r in records)
+        subprocess_total = sum(r["subprocess_time"] for r in records)
+        python_total = max(0.0, wall_total - subprocess_total)
+        
+        def share(seconds):
+            return f"{seconds:.3f}s ({round(seconds / wall_total * 100, 1) if wall_total else 0}%)"
+        
+        by_type = {}
+        for r in records:
+            entry = by_type.setdefault(r["type"], {"controls": 0, "wall": 0.0, "max": 0.0, "subprocesses": 0})
+            entry["controls"] += 1
+            entry["wall"] += r["wall_time"]
+            entry["max"] = max(entry["max"], r["wall_time"])
+            entry["subprocesses"] += r["subprocesses"]
+        
+        commands = sorted(((elapsed, command, r["id"]) for r in records for command, elapsed in r["commands"]), reverse=True)
+        
+        lines = [
+            f"Vijenex CIS scan profile - {self.system_info['hostname']} - {self.system_info['scan_date']}",
+            "",
+            f"Controls:              {len(records)}",
+            f"Scan elapsed time:     {self.profiler.elapsed:.3f}s (jobs: {self.jobs})",
+            f"Control time:          {wall_total:.3f}s",
+            f"  in subprocesses:     {share(subprocess_total)}",
+            f"  in Python:           {share(python_total)}",
+            f"Python CPU time:       {sum(r['cpu_time'] for r in records):.3f}s",
+            f"Subprocesses spawned:  {sum(r['subprocesses'] for r in records)}",
+            f"Bytes read:            {sum(r['bytes_read'] for r in records)}",
+            "",
+            f"Slowest controls (top {PROFILE_TOP})",
+            f"{'Wall(s)':>9} {'CPU(s)':>9} {'Subproc(s)':>10} {'Procs':>5} {'Bytes':>9}  {'Id':<12} Type",
+        ]
+        for r in records[:PROFILE_TOP]:
+            lines.append(f"{r['wall_time']:9.4f} {r['cpu_time']:9.4f} {r['subprocess_time']:10.4f} {r['subprocesses']:5d} "
+                         f"{r['bytes_read']:9d}  {r['id']:<12} {r['type']}")
+        
+        lines += ["", "Slowest check types", f"{'Total(s)':>9} {'Mean(s)':>9} {'Max(s)':>9} {'Controls':>8} {'Procs':>5}  Type"]
+        for check_type, entry in sorted(by_type.items(), key=lambda item: item[1]["wall"], reverse=True):
+            lines.append(f"{entry['wall']:9.4f} {entry['wall'] / entry['controls']:9.4f} {entry['max']:9.4f} "
+                         f"{entry['controls']:8d} {entry['subprocesses']:5d}  {check_type}")
+        
+        lines += ["", f"Slowest commands (top {PROFILE_TOP})", f"{'Wall(s)':>9}  {'Control':<12} Command"]
+        for elapsed, command, control_id in commands[:PROFILE_TOP]:
+            lines.append(f"{elapsed:9.4f}  {control_id:<12} {command}")
+        
+        report_path = self.output_dir / PROFILE_REPORT_FILE
+        with open(report_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        
+        return str(report_path)
+    
     def generate_csv_report(self) -> str:
         """Generate CSV compliance report"""
         import csv
@@ -3023,46 +5631,256 @@ class LinuxCISScanner:
                     'Section': result['section'],
                     'Status': result['status'],
                     'CISReference': result.get('cis_reference', 'Refer to CIS Benchmark documentation'),
-                    'Remediation': result.get('remediation', 'Refer to CIS Benchmark documentation'),
-                    'Description': result.get('description', 'Security control verification')
+                    'Remediation': self._report_field(result, 'remediation', 'Refer to CIS Benchmark documentation'),
+                    'Description': self._report_field(result, 'description', 'Security control verification')
                 })
         
         return str(report_path)
 
+# --batch: one report directory per root plus this combined summary
+BATCH_SUMMARY_FILE = 'vijenex-cis-batch-summary.csv'
+BATCH_SCAN_LOG = 'vijenex-cis-scan.log'
+BATCH_SUMMARY_FIELDS = ['Root', 'ReportDir', 'Distribution', 'Total', 'Passed', 'Failed', 'Manual',
+                        'NotApplicable', 'Errors', 'SuccessRate', 'Status']
+# Hex digits of the real path's digest that end each root's report directory name
+BATCH_DIR_DIGEST_LENGTH = 8
+
+# Milestones parsed (and their patterns compiled and checks resolved) by the
+# --batch parent before the worker pool forks, and the bundle holding their
+# narrative text; every worker inherits them instead of re-reading
+_batch_milestones = {}
+_batch_checks = {}
+_batch_bundle = None
+
+def batch_report_dir(output_dir: Path, root: str) -> Path:
+    """Report directory for one --batch root: its real path flattened into a name
+    
+    Flattening alone is ambiguous (/srv/a/b_c and /srv/a_b/c), so a short
+    digest of the real path keeps every root's directory its own.
+    """
+    real_path = os.path.realpath(root)
+    digest = hashlib.sha256(real_path.encode('utf-8', errors='surrogateescape')).hexdigest()[:BATCH_DIR_DIGEST_LENGTH]
+    return output_dir / f"{real_path.strip('/').replace('/', '_') or 'root'}-{digest}"
+
+def unique_batch_roots(roots: List[str]) -> List[str]:
+    """--batch roots with later spellings of an already listed directory (img, ./img, links to it) dropped"""
+    unique = {}
+    for root in roots:
+        unique.setdefault(os.path.realpath(root), root)
+    return list(unique.values())
+
+def _scan_batch_root(root: str, report_dir: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker process: scan one root with the inherited milestones and write its reports"""
+    row = {'Root': root, 'ReportDir': report_dir}
+    try:
+        Path(report_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(report_dir) / BATCH_SCAN_LOG, 'w') as log, contextlib.redirect_stdout(log):
+            scanner = LinuxCISScanner(report_dir, options['profile'], options['jobs'], options['evidence_limit'],
+                                      options['incremental'], options['profile_scan'], options['low_impact'],
+                                      options['max_load'], options['max_io_util'], root)
+            scanner.milestone_cache = _batch_milestones
+            scanner.checks = _batch_checks
+            scanner.bundle = _batch_bundle
+            scanner.scan_milestones(list(_batch_milestones))
+            if options['format'] in ['html', 'both']:
+                scanner.generate_html_report()
+            if options['format'] in ['csv', 'both']:
+                scanner.generate_csv_report()
+            if options['profile_scan']:
+                scanner.generate_profile_report()
+        counts = scanner.results.counts
+        total = len(scanner.results)
+        row.update({
+            'Distribution': scanner.system_info['distribution'],
+            'Total': total,
+            'Passed': counts.get('PASS', 0),
+            'Failed': counts.get('FAIL', 0),
+            'Manual': counts.get('MANUAL', 0),
+            'NotApplicable': counts.get('NOT_APPLICABLE', 0),
+            'Errors': counts.get('ERROR', 0),
+            'SuccessRate': round((counts.get('PASS', 0) / total) * 100, 1) if total else 0,
+            'Status': 'OK'
+        })
+    except Exception as e:
+        row['Status'] = f"Error: {e}"
+    return row
+
+def run_batch(roots: List[str], output_dir: Path, milestones: Dict[str, List[Dict[str, Any]]],
+              checks: Dict[int, tuple], bundle: MilestoneBundle, workers: int, options: Dict[str, Any]) -> str:
+    """Scan every root in a pool of forked worker processes; returns the summary CSV path"""
+    import csv
+    global _batch_milestones, _batch_checks, _batch_bundle
+    
+    _batch_milestones = milestones
+    _batch_checks = checks
+    _batch_bundle = bundle
+    rows = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        futures = {pool.submit(_scan_batch_root, root, str(batch_report_dir(output_dir, root)), options): root
+                   for root in roots}
+        for done, future in enumerate(as_completed(futures), 1):
+            root = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                # The worker process itself died (OOM kill, signal)
+                row = {'Root': root, 'ReportDir': str(batch_report_dir(output_dir, root)), 'Status': f"Error: {e}"}
+            rows[root] = row
+            detail = f"{row['Passed']}/{row['Total']} passed" if row['Status'] == 'OK' else row['Status']
+            print(f"[{done}/{len(roots)}] {root}: {detail}")
+    
+    summary_path = output_dir / BATCH_SUMMARY_FILE
+    with open(summary_path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=BATCH_SUMMARY_FIELDS, restval='')
+        writer.writeheader()
+        for root in roots:
+            writer.writerow(rows[root])
+    
+    return str(summary_path)
+
 def main():
-    parser = argparse.ArgumentParser(description='Vijenex CIS - Ubuntu 22.04 LTS Security Compliance Scanner')
+    parser = argparse.ArgumentParser(description='Vijenex CIS - Ubuntu 22.04 LTS Security Compliance Scanner',
+                                     fromfile_prefix_chars='@')
     parser.add_argument('--output-dir', help='Output directory for reports (default: ../reports)')
     parser.add_argument('--profile', choices=['Level1', 'Level2'], default='Level1', help='CIS profile level')
     parser.add_argument('--milestones', nargs='+', help='Specific milestone files to scan')
     parser.add_argument('--format', choices=['html', 'csv', 'both'], default='both', help='Report format')
     parser.add_argument('--cleanup', action='store_true', help='Delete scanner files after scan (keeps reports only)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of controls to execute in parallel (default: 1)')
+    parser.add_argument('--evidence-limit', type=int, default=TREE_EVIDENCE_LIMIT,
+                        help=f'Paths listed as evidence by filesystem tree checks (default: {TREE_EVIDENCE_LIMIT})')
+    parser.add_argument('--incremental', action='store_true', help='Re-evaluate only controls whose inputs changed since the last run')
+    parser.add_argument('--watch', action='store_true', help='Keep running and re-check controls when their inputs change, logging drift as JSON Lines')
+    parser.add_argument('--watch-interval', type=int, default=WATCH_INTERVAL,
+                        help=f'Seconds between re-checks of controls that depend on runtime state in --watch mode (default: {WATCH_INTERVAL})')
+    parser.add_argument('--profile-scan', action='store_true', help='Write per-control timing and subprocess statistics next to the reports')
+    parser.add_argument('--low-impact', action='store_true',
+                        help='Run commands and tree walks at idle IO and lowest CPU priority, pausing filesystem walks while the host is busy')
+    parser.add_argument('--max-load', type=float, default=LOW_IMPACT_MAX_LOAD,
+                        help=f'--low-impact: 1-minute load average per CPU above which walks pause (default: {LOW_IMPACT_MAX_LOAD})')
+    parser.add_argument('--max-io-util', type=float, default=LOW_IMPACT_MAX_IO_UTIL,
+                        help=f'--low-impact: busiest-disk utilisation percent above which walks pause (default: {LOW_IMPACT_MAX_IO_UTIL})')
+    parser.add_argument('--root', default='/',
+                        help='Evaluate file-based controls against a mounted image or unpacked rootfs instead of this host')
+    parser.add_argument('--image', metavar='ARCHIVE',
+                        help='Evaluate file-based controls against a docker save / OCI image archive without extracting it (- reads stdin)')
+    parser.add_argument('--batch', nargs='+', metavar='ROOT',
+                        help='Scan several rootfs directories in parallel, one report directory each (@FILE reads them from a file)')
+    parser.add_argument('--batch-workers', type=int, default=os.cpu_count() or 1,
+                        help='--batch: roots scanned at the same time (default: number of CPUs)')
+    parser.add_argument('--compile-milestones', action='store_true',
+                        help=f'Validate the milestones and compile them into {MILESTONE_BUNDLE_FILE}, then exit')
+    parser.add_argument('--drift-log', help=f'Drift event log for --watch (default: <output-dir>/{DRIFT_LOG_FILE})')
     
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.watch_interval < 1:
+        parser.error("--watch-interval must be at least 1")
+    if args.max_load <= 0 or args.max_io_util <= 0:
+        parser.error("--max-load and --max-io-util must be positive")
+    if args.evidence_limit < 0:
+        parser.error("--evidence-limit must not be negative")
+    if not os.path.isdir(args.root):
+        parser.error(f"--root {args.root} is not a directory")
+    if args.watch and os.path.abspath(args.root) != '/':
+        parser.error("--watch cannot be combined with --root")
+    if args.image:
+        if args.watch or args.incremental or args.batch or os.path.abspath(args.root) != '/':
+            parser.error("--image cannot be combined with --watch, --incremental, --batch or --root")
+        if args.image != '-' and not os.path.isfile(args.image):
+            parser.error(f"--image {args.image} is not a file")
+    if args.batch:
+        if args.watch or os.path.abspath(args.root) != '/':
+            parser.error("--batch cannot be combined with --watch or --root")
+        if args.batch_workers < 1:
+            parser.error("--batch-workers must be at least 1")
+        missing = [root for root in args.batch if not os.path.isdir(root)]
+        if missing:
+            parser.error(f"--batch roots are not directories: {' '.join(missing)}")
+    
+    if args.compile_milestones:
+        milestones_dir = Path(__file__).parent.parent / "milestones"
+        stamps, sources = milestone_sources(milestones_dir)
+        header, data, problems = compile_milestones(stamps, sources)
+        for problem in problems:
+            print(f"Error: milestone {problem}")
+        if problems:
+            sys.exit(1)
+        bundle_path = milestones_dir.parent / MILESTONE_BUNDLE_FILE
+        write_milestone_bundle(bundle_path, header, data)
+        print(f"Compiled {len(sources)} milestones into {bundle_path}")
+        return
+    
     # Check if running as root
     if os.geteuid() != 0:
         print("Warning: Running without root privileges. Some checks may fail.")
         print("For complete scanning, run with: sudo vijenex-cis")
         print()
     
-    scanner = LinuxCISScanner(args.output_dir, args.profile)
-    scanner.scan_milestones(args.milestones)
-    
     GREEN = '\033[92m'
     BLUE = '\033[94m'
     YELLOW = '\033[93m'
     BOLD = '\033[1m'
     RESET = '\033[0m'
     
-    print(f"\n{BOLD}{BLUE}📊 Generating reports...{RESET}")
+    if args.batch:
+        # Parse and compile the milestones once; the forked workers share them
+        loader = LinuxCISScanner(args.output_dir, args.profile)
+        milestone_files = args.milestones or [f for f in os.listdir(loader.milestones_dir) if f.endswith('.json')]
+        milestones = {milestone_file: loader.load_milestone(milestone_file) for milestone_file in milestone_files}
+        options = {'profile': args.profile, 'jobs': args.jobs, 'evidence_limit': args.evidence_limit,
+                   'incremental': args.incremental, 'profile_scan': args.profile_scan, 'format': args.format,
+                   'low_impact': args.low_impact, 'max_load': args.max_load, 'max_io_util': args.max_io_util}
+        roots = unique_batch_roots(args.batch)
+        print(f"{BOLD}{BLUE}📦 Batch scan of {len(roots)} roots with {min(args.batch_workers, len(roots))} workers{RESET}")
+        summary = run_batch(roots, loader.output_dir, milestones, loader.checks,
+                            loader.bundle, args.batch_workers, options)
+        loader.close_milestone_bundle()
+        print(f"{GREEN}📊 Batch summary:{RESET} {summary}")
+        if args.cleanup and not os.path.exists('/usr/share/vijenex-cis'):
+            cleanup_scanner_files(loader.output_dir)
+        return
+    
+    image = None
+    if args.image:
+        print(f"{BOLD}{BLUE}📦 Indexing image {args.image}...{RESET}")
+        try:
+            image = index_image(args.image)
+        except (OSError, tarfile.TarError, ValueError) as e:
+            parser.error(f"--image {args.image}: {e}")
+    
+    scanner = LinuxCISScanner(args.output_dir, args.profile, args.jobs, args.evidence_limit, args.incremental,
+                              args.profile_scan, args.low_impact, args.max_load, args.max_io_util, args.root, image)
+    
+    def write_reports():
+        print(f"\n{BOLD}{BLUE}📊 Generating reports...{RESET}")
+        
+        if args.format in ['html', 'both']:
+            html_report = scanner.generate_html_report()
+            print(f"{GREEN}📄 HTML report:{RESET} {html_report}")
+        
+        if args.format in ['csv', 'both']:
+            csv_report = scanner.generate_csv_report()
+            print(f"{GREEN}📊 CSV report:{RESET} {csv_report}")
+        
+        if args.profile_scan:
+            profile_report = scanner.generate_profile_report()
+            print(f"{GREEN}⏱️  Profile report:{RESET} {profile_report}")
     
-    if args.format in ['html', 'both']:
-        html_report = scanner.generate_html_report()
-        print(f"{GREEN}📄 HTML report:{RESET} {html_report}")
+    if args.watch:
+        try:
+            scanner.watch(args.milestones, args.watch_interval, args.drift_log, on_change=write_reports)
+        except KeyboardInterrupt:
+            print(f"\n{BOLD}{GREEN}Watch stopped{RESET}")
+        finally:
+            scanner.close_milestone_bundle()
+        return
     
-    if args.format in ['csv', 'both']:
-        csv_report = scanner.generate_csv_report()
-        print(f"{GREEN}📊 CSV report:{RESET} {csv_report}")
+    scanner.scan_milestones(args.milestones)
+    write_reports()
+    scanner.close_milestone_bundle()
     
     print(f"\n{BOLD}{GREEN}🎉 Vijenex CIS scan completed successfully!{RESET}")
     
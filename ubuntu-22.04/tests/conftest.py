@@ -0,0 +1,16 @@
+"""Shared fixtures: the scanner script loaded as a module (its name has a dash, so it cannot be imported)"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'scripts' / 'vijenex-cis.py'
+
+
+@pytest.fixture(scope='session')
+def cis():
+    spec = importlib.util.spec_from_file_location('vijenex_cis', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,75 @@
+"""parse_audit_command: audit pipelines run without a shell, allow-listed programs used read-only"""
+
+import pytest
+
+
+@pytest.mark.parametrize('command, stages', [
+    ("df -P", [(['df', '-P'], False)]),
+    ("find / -xdev -type f -perm -0002 2>/dev/null | head -n 5",
+     [(['find', '/', '-xdev', '-type', 'f', '-perm', '-0002'], True), (['head', '-n', '5'], False)]),
+    ("awk -F: '($3 == 0) { print $1 }' /etc/passwd", [(['awk', '-F:', '($3 == 0) { print $1 }', '/etc/passwd'], False)]),
+    ('grep -E "^\\$x" a\\ b', [(['grep', '-E', '^$x', 'a b'], False)]),
+    ("cut -d: -f1 /etc/group | sort | uniq -d",
+     [(['cut', '-d:', '-f1', '/etc/group'], False), (['sort'], False), (['uniq', '-d'], False)]),
+])
+def test_accepted_pipelines(cis, command, stages):
+    assert cis.parse_audit_command(command) == stages
+
+
+@pytest.mark.parametrize('command', [
+    "awk '$3 >= 1000 && $3 != 65534 { print $1 }' /etc/passwd",
+    "awk '/a|b/ || $1 == \"x>y\" { print }' /etc/passwd",
+    "awk -v n=3 -- '{ print $n / 2 }' /etc/passwd",
+    "sort -u -k1,1 -t:",
+    "uniq -c -f 1",
+    "ss -tuln",
+    "iptables -L -n -v",
+    "ip6tables -S",
+    "iptables -t nat -nL",
+    "nft list ruleset",
+    "nft -a list table inet filter",
+    "ufw status verbose",
+    "find /home -nouser -print0 | xargs -0 -n 1 stat -c %U",
+])
+def test_read_only_uses_are_accepted(cis, command):
+    cis.parse_audit_command(command)
+
+
+@pytest.mark.parametrize('command', [
+    "ls; rm -rf /", "ls && id", "ls || id", "ls > /tmp/out", "ls < /etc/passwd", "ls &",
+    "echo $(id)", "ls `id`", 'grep "$HOME" /etc/passwd', "ls $HOME", "ls *", "ls ~",
+    "ls |", "| ls", "ls 'unterminated", "",
+])
+def test_shell_syntax_is_rejected(cis, command):
+    with pytest.raises(ValueError):
+        cis.parse_audit_command(command)
+
+
+@pytest.mark.parametrize('command', [
+    "rm -rf /tmp/x", "bash -c id", "/usr/bin/find /", "find / | sh", "xargs", "find / | xargs rm",
+    "find / | xargs -0 xargs rm",
+])
+def test_programs_outside_the_allow_list_are_rejected(cis, command):
+    with pytest.raises(ValueError):
+        cis.parse_audit_command(command)
+
+
+@pytest.mark.parametrize('command', [
+    # find actions
+    "find / -exec rm {} +", "find / -delete", "find / -fprint /tmp/out", "find / | xargs find / -delete",
+    # awk programs that run commands or write files, and option smuggling
+    "awk 'BEGIN { system(\"id\") }'", "awk '{ print | \"sh\" }'", "awk '{ print > \"/tmp/out\" }'",
+    "awk '{ print >> \"/tmp/out\" }'", "awk '{ \"id\" | getline x }'", "awk -f /tmp/prog.awk",
+    "awk -i inplace '{ print }' /etc/passwd", "awk -- 'BEGIN { system(\"id\") }'",
+    # sort and uniq writing files
+    "sort -o /etc/passwd", "sort -uo/etc/passwd", "sort --output=/tmp/x", "sort --compress-program=sh",
+    "uniq /etc/passwd /tmp/out",
+    # sockets and firewall changes
+    "ss -K dst 10.0.0.1", "ss --kill", "ss -D /tmp/dump",
+    "iptables -F", "iptables -A INPUT -j DROP", "iptables -L -F", "iptables -n",
+    "nft flush ruleset", "nft add table inet x", "nft list ruleset -f /tmp/rules", "nft 'list ruleset; flush ruleset'",
+    "ufw disable", "ufw reset", "ufw",
+])
+def test_writing_uses_are_rejected(cis, command):
+    with pytest.raises(ValueError):
+        cis.parse_audit_command(command)
@@ -0,0 +1,35 @@
+"""--batch helpers: one report directory per distinct root"""
+
+import os
+from pathlib import Path
+
+
+def test_report_dirs_do_not_collide(cis, tmp_path):
+    first = tmp_path / 'a' / 'b_c'
+    second = tmp_path / 'a_b' / 'c'
+    first.mkdir(parents=True)
+    second.mkdir(parents=True)
+
+    first_dir = cis.batch_report_dir(Path('/out'), str(first))
+    second_dir = cis.batch_report_dir(Path('/out'), str(second))
+    assert first_dir != second_dir
+    assert first_dir.parent == Path('/out')
+    assert first_dir.name.startswith(str(first).strip('/').replace('/', '_') + '-')
+
+
+def test_report_dir_follows_the_real_path(cis, tmp_path):
+    (tmp_path / 'img').mkdir()
+    os.symlink('img', str(tmp_path / 'link'))
+    expected = cis.batch_report_dir(Path('/out'), str(tmp_path / 'img'))
+    assert cis.batch_report_dir(Path('/out'), str(tmp_path / 'link')) == expected
+    assert cis.batch_report_dir(Path('/out'), str(tmp_path / 'img') + '/.') == expected
+    assert cis.batch_report_dir(Path('/out'), '/').name.startswith('root-')
+
+
+def test_unique_batch_roots(cis, tmp_path, monkeypatch):
+    (tmp_path / 'img').mkdir()
+    (tmp_path / 'other').mkdir()
+    os.symlink('img', str(tmp_path / 'link'))
+    monkeypatch.chdir(tmp_path)
+    roots = ['img', './img', str(tmp_path / 'img') + '/', 'link', 'other', 'img']
+    assert cis.unique_batch_roots(roots) == ['img', 'other']
@@ -0,0 +1,63 @@
+"""CONTROL_CHECKS: every shipped control type resolves to a check; FileContent"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+MILESTONES_DIR = Path(__file__).resolve().parent.parent / 'milestones'
+
+
+def test_shipped_milestones_resolve(cis):
+    unresolved = set()
+    for milestone in MILESTONES_DIR.glob('milestone-*.json'):
+        if milestone.name == 'milestone-template.json':
+            continue
+        for control in json.loads(milestone.read_text()).get('controls', []):
+            method, _, _ = cis.resolve_check(control)
+            if method is None and control.get('type', 'Manual') != 'Manual':
+                unresolved.add((milestone.name, control.get('type')))
+    assert unresolved == set()
+
+
+@pytest.fixture
+def scanner(cis, tmp_path):
+    root = tmp_path / 'root'
+    (root / 'etc' / 'dconf').mkdir(parents=True)
+    (root / 'etc' / 'motd').write_text('Welcome to Ubuntu 22.04\n')
+    (root / 'etc' / 'issue').write_text('Authorized uses only.\n')
+    (root / 'etc' / 'dconf' / 'gdm').write_text('[org/gnome/login-screen]\nbanner-message-enable=true\n')
+    return cis.LinuxCISScanner(str(tmp_path / 'reports'), root=str(root))
+
+
+PATTERN = r'(Linux|Ubuntu|kernel|release|version|\d+\.\d+)'
+
+
+@pytest.mark.parametrize('file_path, pattern, expected_result, status', [
+    ('/etc/motd', PATTERN, 'not_found', 'FAIL'),
+    ('/etc/issue', PATTERN, 'not_found', 'PASS'),
+    # A removed file cannot contain the pattern, nor provide it
+    ('/etc/issue.net', PATTERN, 'not_found', 'PASS'),
+    ('/etc/issue.net', PATTERN, 'found', 'FAIL'),
+    # Several files: found in any of them
+    ('/etc/dconf/missing /etc/dconf/gdm', r'banner-message-enable\s*=\s*true', 'found', 'PASS'),
+    ('/etc/issue /etc/motd', PATTERN, 'not_found', 'FAIL'),
+    ('/tmp/outside', PATTERN, 'found', 'FAIL'),
+    ('/etc/motd', PATTERN, 'present', 'ERROR'),
+])
+def test_file_content(scanner, file_path, pattern, expected_result, status):
+    assert scanner.check_file_content(file_path, pattern, expected_result)['status'] == status
+
+
+def test_unknown_types_are_reported_at_load(cis, scanner, capsys, monkeypatch):
+    controls = [{'id': '9.9.1', 'type': 'Unheard'}, {'id': '9.9.2', 'type': 'Unheard'}, {'id': '9.9.3', 'type': 'Manual'}]
+
+    class Bundle:
+        def controls(self, milestone_file):
+            return controls
+
+    monkeypatch.setattr(scanner, 'milestone_bundle', lambda: Bundle())
+    assert scanner.load_milestone('milestone-test.json') == controls
+    out = capsys.readouterr().out
+    assert 'Unheard (9.9.1, 9.9.2)' in out
+    assert out.count('Warning') == 1
@@ -0,0 +1,124 @@
+"""ImageIndex: layers merged with their whiteouts, without extracting the image"""
+
+import errno
+import io
+import json
+import stat
+import tarfile
+
+import pytest
+
+
+def entry(path, mode=stat.S_IFREG | 0o644, content=None, linkname='', hardlink=False):
+    size = len(content) if content is not None else 0
+    return ('entry', path, mode, 0, 0, size, 0, linkname, content, hardlink)
+
+
+def directory(path):
+    return entry(path, stat.S_IFDIR | 0o755)
+
+
+@pytest.fixture
+def image(cis):
+    image = cis.ImageIndex('test')
+    image.add_layer([
+        directory('/etc'),
+        entry('/etc/passwd', content=b'root:x:0:0::/root:/bin/bash\n'),
+        entry('/etc/motd', content=b'hello\n'),
+        directory('/etc/cron.d'),
+        entry('/etc/cron.d/a', content=b'a\n'),
+        entry('/etc/cron.d/b', content=b'b\n'),
+        directory('/opt/app'),
+        entry('/opt/app/bin', mode=stat.S_IFREG | 0o755),
+    ])
+    return image
+
+
+def test_whiteout_removes_lower_file(image):
+    image.add_layer([('whiteout', '/etc/motd')])
+    assert not image.exists('/etc/motd')
+    assert image.listdir('/etc') == ['cron.d', 'passwd']
+
+
+def test_whiteout_removes_lower_directory_tree(image):
+    image.add_layer([('whiteout', '/opt/app')])
+    assert not image.exists('/opt/app/bin')
+    assert image.listdir('/opt') == []
+
+
+def test_whiteout_only_hides_lower_layers(image):
+    image.add_layer([entry('/etc/motd', content=b'replaced\n'), ('whiteout', '/etc/motd')])
+    assert image.read('/etc/motd') == 'replaced\n'
+
+
+def test_opaque_directory_hides_lower_contents(image):
+    image.add_layer([('opaque', '/etc/cron.d'), entry('/etc/cron.d/c', content=b'c\n')])
+    assert image.listdir('/etc/cron.d') == ['c']
+    assert image.isdir('/etc/cron.d')
+    assert image.read('/etc/passwd').startswith('root:')
+
+
+def test_file_replaced_by_directory(image):
+    image.add_layer([directory('/etc/motd'), entry('/etc/motd/part', content=b'p\n')])
+    assert image.isdir('/etc/motd')
+    assert image.read('/etc/motd/part') == 'p\n'
+
+
+def test_missing_parents_and_hard_links(image):
+    image.add_layer([entry('/usr/lib/os-release', content=b'ID=ubuntu\n'),
+                     entry('/etc/os-release', linkname='usr/lib/os-release', hardlink=True)])
+    assert image.isdir('/usr/lib')
+    assert image.read('/etc/os-release') == 'ID=ubuntu\n'
+
+
+def test_contents_not_kept(image):
+    # Outside IMAGE_CONTENT_PATHS only the size is indexed
+    image.add_layer([('entry', '/opt/app/data', stat.S_IFREG | 0o644, 0, 0, 10, 0, '', None, False)])
+    with pytest.raises(OSError) as error:
+        image.read('/opt/app/data')
+    assert error.value.errno == errno.ENODATA
+    assert image.read('/opt/app/bin') == ''
+
+
+def test_missing_paths_raise_like_os(image):
+    with pytest.raises(FileNotFoundError):
+        image.lstat('/nope')
+    with pytest.raises(NotADirectoryError):
+        image.listdir('/etc/passwd')
+    with pytest.raises(IsADirectoryError):
+        image.read('/etc')
+
+
+def layer_tar(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as layer:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            if data is None:
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                layer.addfile(info)
+            else:
+                info.size = len(data)
+                layer.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def test_index_docker_save_archive(cis, tmp_path):
+    lower = layer_tar([('etc/', None), ('etc/motd', b'hello\n'), ('etc/cron.d/', None),
+                       ('etc/cron.d/a', b'a\n'), ('etc/hosts', b'127.0.0.1 localhost\n')])
+    upper = layer_tar([('etc/.wh.motd', b''), ('etc/cron.d/.wh..wh..opq', b''), ('etc/cron.d/b', b'b\n')])
+    manifest = json.dumps([{'Config': 'config.json', 'Layers': ['l1/layer.tar', 'l2/layer.tar']}]).encode()
+    archive = tmp_path / 'image.tar'
+    # The manifest comes last, as in many docker save archives
+    with tarfile.open(str(archive), mode='w') as tar:
+        for name, data in (('l2/layer.tar', upper), ('l1/layer.tar', lower), ('manifest.json', manifest)):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    image = cis.index_image(str(archive))
+    assert image.layers == 2
+    assert not image.exists('/etc/motd')
+    assert image.listdir('/etc/cron.d') == ['b']
+    assert image.read('/etc/hosts') == '127.0.0.1 localhost\n'
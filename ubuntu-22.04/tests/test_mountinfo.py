@@ -0,0 +1,44 @@
+"""parse_mountinfo: /proc/self/mountinfo indexed by mount point"""
+
+MOUNTINFO = (
+    "22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw,errors=remount-ro\n"
+    "30 22 0:25 / /tmp rw,nosuid,nodev shared:5 - tmpfs tmpfs rw,size=1024k\n"
+    "31 22 8:2 / /mnt/backup\\040disk rw,noexec - ext4 /dev/disk/by-label/my\\040backup rw\n"
+    "32 22 8:1 /srv/tab\\011dir /srv/bind ro,relatime - ext4 /dev/sda1 rw\n"
+)
+
+
+def test_octal_escapes_are_decoded(cis):
+    mounts = cis.parse_mountinfo(MOUNTINFO)
+    assert '/mnt/backup disk' in mounts
+    assert '/mnt/backup\\040disk' not in mounts
+    assert mounts['/mnt/backup disk']['device'] == '/dev/disk/by-label/my backup'
+    assert mounts['/srv/bind']['root'] == '/srv/tab\tdir'
+
+
+def test_fields(cis):
+    tmp = cis.parse_mountinfo(MOUNTINFO)['/tmp']
+    assert tmp['mount_id'] == '30'
+    assert tmp['parent_id'] == '22'
+    assert tmp['fstype'] == 'tmpfs'
+    assert tmp['propagation'] == ('shared:5',)
+    # Per-mount flags first, then superblock options other than rw/ro
+    assert tmp['options'] == ('rw', 'nosuid', 'nodev', 'size=1024k')
+
+
+def test_bind_mount_root(cis):
+    mounts = cis.parse_mountinfo(MOUNTINFO)
+    assert cis.is_bind_mount(mounts['/srv/bind'])
+    assert not cis.is_bind_mount(mounts['/tmp'])
+
+
+def test_later_entry_wins_for_overmounted_path(cis):
+    content = MOUNTINFO + "40 30 0:30 / /tmp rw,noexec - tmpfs other rw\n"
+    tmp = cis.parse_mountinfo(content)['/tmp']
+    assert tmp['mount_id'] == '40'
+    assert tmp['device'] == 'other'
+
+
+def test_malformed_lines_are_skipped(cis):
+    content = "garbage\n1 2 3 - ext4\n" + MOUNTINFO
+    assert sorted(cis.parse_mountinfo(content)) == ['/', '/mnt/backup disk', '/srv/bind', '/tmp']
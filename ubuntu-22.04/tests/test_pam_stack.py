@@ -0,0 +1,103 @@
+"""parse_pam_stack / PAMStack: a PAM service's stack with includes expanded"""
+
+import errno
+import os
+
+import pytest
+
+
+@pytest.fixture
+def parse(cis, monkeypatch):
+    monkeypatch.setattr(cis, 'PAM_DIR', '/pam')
+
+    def parse(files, service='sshd'):
+        def read_file(path):
+            try:
+                return files[os.path.basename(path)]
+            except KeyError:
+                raise FileNotFoundError(errno.ENOENT, 'No such file or directory', path)
+        return cis.parse_pam_stack(os.path.join('/pam', service), read_file)
+    return parse
+
+
+def test_entries_and_syntax(parse):
+    entries = parse({'sshd': (
+        "# comment\n"
+        "auth [success=1 default=ignore] pam_unix.so nullok # trailing\n"
+        "-auth optional /usr/lib/security/pam_systemd_home.so\n"
+        "password requisite pam_pwquality.so retry=3 \\\n"
+        "    minlen=14\n"
+        "account required\n"
+    )})
+    assert entries == (
+        ('auth', '[success=1 default=ignore]', 'pam_unix.so', ('nullok',)),
+        ('auth', 'optional', 'pam_systemd_home.so', ()),
+        ('password', 'requisite', 'pam_pwquality.so', ('retry=3', 'minlen=14')),
+    )
+
+
+def test_at_include_pulls_in_every_type(parse):
+    entries = parse({
+        'sshd': "@include common-auth\n@include common-account\nsession required pam_limits.so\n",
+        'common-auth': "auth required pam_faillock.so preauth\nauth sufficient pam_unix.so\n",
+        'common-account': "account required pam_unix.so\nsession required pam_env.so\n",
+    })
+    assert [(entry[0], entry[2]) for entry in entries] == [
+        ('auth', 'pam_faillock.so'), ('auth', 'pam_unix.so'), ('account', 'pam_unix.so'),
+        ('session', 'pam_env.so'), ('session', 'pam_limits.so'),
+    ]
+
+
+def test_include_and_substack_take_only_their_type(parse):
+    entries = parse({
+        'sshd': "auth substack system-auth\npassword include system-auth\n",
+        'system-auth': (
+            "auth required pam_env.so\n"
+            "account required pam_unix.so\n"
+            "password sufficient pam_unix.so sha512\n"
+        ),
+    })
+    assert entries == (
+        ('auth', 'required', 'pam_env.so', ()),
+        ('password', 'sufficient', 'pam_unix.so', ('sha512',)),
+    )
+
+
+def test_missing_include_contributes_nothing(parse):
+    entries = parse({'sshd': "@include gone\nauth include gone-too\nauth required pam_deny.so\n"})
+    assert entries == (('auth', 'required', 'pam_deny.so', ()),)
+
+
+def test_include_loop_is_expanded_once(parse):
+    entries = parse({
+        'sshd': "auth include a\n",
+        'a': "auth required pam_a.so\nauth include b\n",
+        'b': "auth required pam_b.so\nauth substack a\nauth include sshd\n",
+    })
+    assert [entry[2] for entry in entries] == ['pam_a.so', 'pam_b.so']
+
+
+def test_depth_limit(cis, parse):
+    files = {f's{level}': f"auth required pam_{level}.so\nauth substack s{level + 1}\n" for level in range(40)}
+    files['sshd'] = files.pop('s0')
+    entries = parse(files)
+    assert len(entries) == cis.PAM_INCLUDE_DEPTH + 1
+
+
+def test_pam_stack_lookups(cis, parse):
+    stack = cis.PAMStack(parse({
+        'sshd': (
+            "auth required pam_faillock.so preauth deny=5\n"
+            "auth [success=1 default=ignore] pam_unix.so\n"
+            "auth [default=die] pam_faillock.so authfail deny=3\n"
+            "password sufficient pam_unix.so use_authtok yescrypt\n"
+        ),
+    }))
+    assert [entry[2] for entry in stack.stack('auth')] == ['pam_faillock.so', 'pam_unix.so', 'pam_faillock.so']
+    assert len(stack.module('pam_unix.so')) == 2
+    assert stack.module('pam_unix.so', 'password')[0][1] == 'sufficient'
+    assert stack.arguments('pam_faillock.so') == {'preauth': '', 'deny': '3', 'authfail': ''}
+    assert stack.contains('password', 'sufficient', 'pam_unix.so', ('yescrypt',))
+    assert stack.contains('auth', '[success=1  default=ignore]', 'pam_unix.so')
+    assert not stack.contains('password', 'required', 'pam_unix.so')
+    assert repr(stack) == f"PAMStack({stack.entries!r})"
@@ -0,0 +1,68 @@
+"""resolve_in_root: symlinks inside an alternate root resolve as under chroot and never leave it"""
+
+import errno
+import os
+import stat
+
+import pytest
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / 'usr' / 'bin').mkdir(parents=True)
+    (tmp_path / 'usr' / 'bin' / 'real').write_text('x')
+    (tmp_path / 'etc' / 'alternatives').mkdir(parents=True)
+    return tmp_path
+
+
+def test_absolute_target_is_taken_from_root(cis, root):
+    os.symlink('/usr/bin/real', str(root / 'etc' / 'alternatives' / 'tool'))
+    assert cis.resolve_in_root(str(root), '/etc/alternatives/tool') == str(root / 'usr' / 'bin' / 'real')
+
+
+def test_absolute_target_outside_root_stays_inside(cis, root):
+    os.symlink('/etc/passwd', str(root / 'etc' / 'passwd-link'))
+    assert cis.resolve_in_root(str(root), '/etc/passwd-link') == str(root / 'etc' / 'passwd')
+
+
+def test_dotdot_cannot_climb_above_root(cis, root):
+    os.symlink('../../../../../../etc/shadow', str(root / 'etc' / 'alternatives' / 'up'))
+    assert cis.resolve_in_root(str(root), '/etc/alternatives/up') == str(root / 'etc' / 'shadow')
+    assert cis.resolve_in_root(str(root), '/../../etc/hosts') == str(root / 'etc' / 'hosts')
+
+
+def test_relative_target_and_linked_directory(cis, root):
+    os.symlink('bin', str(root / 'usr' / 'sbin'))
+    os.symlink('usr/bin', str(root / 'bin'))
+    assert cis.resolve_in_root(str(root), '/bin/real') == str(root / 'usr' / 'bin' / 'real')
+    assert cis.resolve_in_root(str(root), '/usr/sbin/real') == str(root / 'usr' / 'bin' / 'real')
+
+
+def test_missing_components_are_kept(cis, root):
+    assert cis.resolve_in_root(str(root), '/etc/ssh/sshd_config') == str(root / 'etc' / 'ssh' / 'sshd_config')
+
+
+def test_symlink_loop_raises_eloop(cis, root):
+    os.symlink('b', str(root / 'a'))
+    os.symlink('a', str(root / 'b'))
+    with pytest.raises(OSError) as error:
+        cis.resolve_in_root(str(root), '/a')
+    assert error.value.errno == errno.ELOOP
+
+
+def test_logical_path_reverses_it(cis, root):
+    os.symlink('/usr/bin/real', str(root / 'etc' / 'alternatives' / 'tool'))
+    host_path = cis.resolve_in_root(str(root), '/etc/alternatives/tool')
+    assert cis.logical_path(str(root), host_path) == '/usr/bin/real'
+    assert cis.logical_path(str(root), str(root)) == '/'
+
+
+def test_resolves_inside_an_image_index(cis):
+    image = cis.ImageIndex('test')
+    image.add_layer([
+        ('entry', '/usr/bin/real', stat.S_IFREG | 0o755, 0, 0, 0, 0, '', None, False),
+        ('entry', '/etc/alternatives/tool', stat.S_IFLNK | 0o777, 0, 0, 0, 0, '../../usr/bin/real', None, False),
+        ('entry', '/escape', stat.S_IFLNK | 0o777, 0, 0, 0, 0, '/../../../usr/bin/real', None, False),
+    ])
+    assert cis.resolve_in_root('/', '/etc/alternatives/tool', image.readlink) == '/usr/bin/real'
+    assert image.resolve('/escape') == '/usr/bin/real'
@@ -0,0 +1,111 @@
+"""parse_sshd_config / parse_sshd_t: effective global sshd settings"""
+
+import errno
+import fnmatch
+
+import pytest
+
+
+def parse(cis, files, config_file='/etc/ssh/sshd_config'):
+    def read_file(path):
+        try:
+            return files[path]
+        except KeyError:
+            raise FileNotFoundError(errno.ENOENT, 'No such file or directory', path)
+
+    def glob_func(pattern):
+        return [path for path in files if fnmatch.fnmatch(path, pattern)]
+
+    return cis.parse_sshd_config(config_file, read_file, glob_func)
+
+
+def test_first_value_wins(cis):
+    settings = parse(cis, {'/etc/ssh/sshd_config': (
+        "PermitRootLogin no\n"
+        "permitrootlogin yes\n"
+        "MaxAuthTries=4\n"
+        "MaxAuthTries 10\n"
+    )})
+    assert settings['permitrootlogin'] == 'no'
+    assert settings['maxauthtries'] == '4'
+
+
+def test_include_is_expanded_in_place(cis):
+    settings = parse(cis, {
+        '/etc/ssh/sshd_config': (
+            "Include sshd_config.d/*.conf\n"
+            "PermitRootLogin yes\n"
+            "X11Forwarding yes\n"
+        ),
+        # Relative to the directory of sshd_config, globs in sorted order
+        '/etc/ssh/sshd_config.d/50-cloud.conf': "X11Forwarding no\nLogLevel VERBOSE\n",
+        '/etc/ssh/sshd_config.d/10-hardening.conf': "PermitRootLogin no\nLogLevel INFO\n",
+    })
+    assert settings['permitrootlogin'] == 'no'
+    assert settings['x11forwarding'] == 'no'
+    assert settings['loglevel'] == 'INFO'
+
+
+def test_missing_include_is_ignored(cis):
+    settings = parse(cis, {'/etc/ssh/sshd_config': "Include /etc/ssh/missing.conf\nMaxSessions 4\n"})
+    assert settings['maxsessions'] == '4'
+
+
+def test_include_loop_raises(cis):
+    with pytest.raises(ValueError):
+        parse(cis, {'/etc/ssh/sshd_config': "Include /etc/ssh/sshd_config\n"})
+
+
+def test_match_blocks_are_left_out(cis):
+    settings = parse(cis, {
+        '/etc/ssh/sshd_config': (
+            "Include /etc/ssh/sshd_config.d/*.conf\n"
+            "Match User backup\n"
+            "    PermitRootLogin yes\n"
+            "    X11Forwarding yes\n"
+            "Match all\n"
+            "    MaxAuthTries 2\n"
+        ),
+        # A Match block ends with the file that opens it
+        '/etc/ssh/sshd_config.d/10-match.conf': "Match Address 10.0.0.0/8\n  Banner /etc/issue.net\n",
+        '/etc/ssh/sshd_config.d/20-global.conf': "Banner none\n",
+    })
+    assert settings['permitrootlogin'] == 'prohibit-password'
+    assert settings['x11forwarding'] == 'no'
+    assert settings['maxauthtries'] == '6'
+    assert settings['banner'] == 'none'
+
+
+def test_values_comments_and_multi_valued_keywords(cis):
+    settings = parse(cis, {'/etc/ssh/sshd_config': (
+        "# A comment\n"
+        "AllowUsers alice   # trailing comment\n"
+        "AllowUsers bob\n"
+        'Banner "/etc/issue.net"\n'
+        "LoginGraceTime 1m\n"
+        "ClientAliveInterval 5m30s\n"
+    )})
+    assert settings['allowusers'] == 'alice bob'
+    assert settings['banner'] == '/etc/issue.net'
+    assert settings['logingracetime'] == '60'
+    assert settings['clientaliveinterval'] == '330'
+
+
+def test_defaults_fill_unset_keywords(cis):
+    settings = parse(cis, {'/etc/ssh/sshd_config': "MACs hmac-sha2-512\n"})
+    assert settings['macs'] == 'hmac-sha2-512'
+    assert settings['maxstartups'] == '10:30:100'
+    # Unset crypto keywords are judged on OpenSSH's compiled-in lists
+    assert settings['ciphers'] == cis.SSHD_DEFAULTS['ciphers']
+    assert 'diffie-hellman-group14-sha256' in settings['kexalgorithms'].split(',')
+
+
+def test_sshd_seconds(cis):
+    assert cis.sshd_seconds('90') == '90'
+    assert cis.sshd_seconds('1h2m3s') == '3723'
+    assert cis.sshd_seconds('soon') == 'soon'
+
+
+def test_parse_sshd_t(cis):
+    settings = cis.parse_sshd_t("permitrootlogin no\nallowusers alice\nallowusers bob\n\nbanner none\n")
+    assert settings == {'permitrootlogin': 'no', 'allowusers': 'alice bob', 'banner': 'none'}
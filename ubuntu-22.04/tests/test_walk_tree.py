@@ -0,0 +1,146 @@
+"""walk_tree: one pass over a filesystem like `find -xdev` with excluded paths pruned"""
+
+import os
+import stat
+
+import pytest
+
+KNOWN = frozenset({os.getuid()}), frozenset({os.getgid()})
+
+
+class MountedFS:
+    """os with everything at or below `mount` reported on another device"""
+
+    def __init__(self, mount):
+        self.mount = str(mount)
+
+    def _on_device(self, path, st):
+        if path != self.mount and not path.startswith(self.mount + os.sep):
+            return st
+        fields = list(st[:10])
+        fields[2] = st.st_dev + 1
+        return os.stat_result(fields)
+
+    def lstat(self, path):
+        return self._on_device(path, os.lstat(path))
+
+    def scandir(self, path):
+        with os.scandir(path) as entries:
+            return Entries(Entry(self, entry.path) for entry in entries)
+
+
+class Entry:
+    def __init__(self, fs, path):
+        self.fs = fs
+        self.path = path
+
+    def stat(self, follow_symlinks=True):
+        return self.fs._on_device(self.path, os.stat(self.path, follow_symlinks=follow_symlinks))
+
+
+class Entries(list):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def make(path, mode, directory=False):
+    if directory:
+        path.mkdir()
+    else:
+        path.write_text('x')
+    os.chmod(path, mode)
+    return str(path)
+
+
+def test_predicates(cis, tmp_path):
+    writable = make(tmp_path / 'writable', 0o666)
+    make(tmp_path / 'private', 0o644)
+    open_dir = make(tmp_path / 'open', 0o777, directory=True)
+    make(tmp_path / 'sticky', 0o1777, directory=True)
+    suid = make(tmp_path / 'suid', 0o4755)
+    sgid = make(tmp_path / 'sgid', 0o2755)
+    nested = make(tmp_path / 'open' / 'nested', 0o602)
+
+    result = cis.walk_tree(str(tmp_path), [], *KNOWN)
+    count, paths = result['world_writable_files']
+    assert (count, set(paths)) == (2, {writable, nested})
+    assert result['world_writable_dirs'] == (1, (open_dir,))
+    assert result['suid'] == (1, (suid,))
+    assert result['sgid'] == (1, (sgid,))
+    assert result['unowned'] == (0, ())
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="needs root to chown")
+def test_unknown_owner_and_group(cis, tmp_path):
+    orphan = make(tmp_path / 'orphan', 0o644)
+    os.chown(orphan, 4242, os.getgid())
+    stray = make(tmp_path / 'stray', 0o644)
+    os.chown(stray, os.getuid(), 4242)
+
+    result = cis.walk_tree(str(tmp_path), [], *KNOWN)
+    assert result['nouser'] == (1, (orphan,))
+    assert result['nogroup'] == (1, (stray,))
+    assert result['unowned'][0] == 2
+
+
+def test_symlinks_are_not_followed(cis, tmp_path):
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    make(outside / 'writable', 0o666)
+    tree = tmp_path / 'tree'
+    tree.mkdir()
+    os.symlink(str(outside), str(tree / 'dir-link'))
+    os.symlink(str(outside / 'writable'), str(tree / 'file-link'))
+
+    assert cis.walk_tree(str(tree), [], *KNOWN)['world_writable_files'] == (0, ())
+
+
+def test_excluded_paths_are_pruned(cis, tmp_path):
+    skipped = tmp_path / 'proc'
+    skipped.mkdir()
+    make(skipped / 'writable', 0o666)
+    kept = make(tmp_path / 'writable', 0o666)
+
+    result = cis.walk_tree(str(tmp_path), [str(skipped)], *KNOWN)
+    assert result['world_writable_files'] == (1, (kept,))
+    assert cis.walk_tree(str(tmp_path), [str(tmp_path)], *KNOWN)['world_writable_files'] == (0, ())
+
+
+def test_other_filesystems_are_reported_but_not_descended(cis, tmp_path):
+    mount = make(tmp_path / 'mnt', 0o777, directory=True)
+    make(tmp_path / 'mnt' / 'writable', 0o666)
+    kept = make(tmp_path / 'writable', 0o666)
+
+    result = cis.walk_tree(str(tmp_path), [], *KNOWN, fs=MountedFS(mount))
+    assert result['world_writable_dirs'] == (1, (mount,))
+    assert result['world_writable_files'] == (1, (kept,))
+    # Without the mount the file below is found
+    assert cis.walk_tree(str(tmp_path), [], *KNOWN)['world_writable_files'][0] == 2
+
+
+def test_evidence_is_limited_but_counts_are_not(cis, tmp_path):
+    for index in range(5):
+        make(tmp_path / f'w{index}', 0o666)
+
+    count, paths = cis.walk_tree(str(tmp_path), [], *KNOWN, evidence_limit=2)['world_writable_files']
+    assert count == 5
+    assert len(paths) == 2
+
+
+def test_missing_root(cis, tmp_path):
+    result = cis.walk_tree(str(tmp_path / 'missing'), [], *KNOWN)
+    assert all(result[name] == (0, ()) for name in cis.TREE_PREDICATES)
+
+
+def test_walks_an_image_index(cis):
+    image = cis.ImageIndex('test')
+    image.add_layer([
+        ('entry', '/tmp', stat.S_IFDIR | 0o1777, 0, 0, 0, 0, '', None, False),
+        ('entry', '/var/tmp/drop', stat.S_IFREG | 0o666, 0, 0, 1, 0, '', None, False),
+    ])
+    result = cis.walk_tree('/', [], frozenset({0}), frozenset({0}), fs=image)
+    assert result['world_writable_files'] == (1, ('/var/tmp/drop',))
+    assert result['world_writable_dirs'] == (0, ())